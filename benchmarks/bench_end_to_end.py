@@ -0,0 +1,167 @@
+"""Benchmark the scraper and API end to end against the local fixture server.
+
+Run from the repository root:
+
+    python benchmarks/bench_end_to_end.py [--jobs 250] [--latency-ms 20] [--jitter-ms 5]
+        [--error-rate 0] [--throttle-rate 0] [--repeat 3] [--json out.json] [--baseline old.json]
+
+Starts benchmarks/fixture_server.py in a subprocess, so peak RSS covers
+only the code under test. It then drives get_job_ids, get_job_details,
+POST /search/ and POST /download-csv/ in turn. For each scenario it prints
+throughput, p50/p99 latency and the process's peak RSS so far.
+With --baseline, throughput is compared against an earlier --json run.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.bench_settings'
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.test import Client  # noqa: E402
+
+from jobApp.scraper import DEFAULT_HEADERS, create_linkedin_url, get_job_details, get_job_ids  # noqa: E402
+
+KEYWORDS = 'python'
+LOCATION = 'germany'
+
+
+def start_fixture_server(args):
+    """Launch the fixture server on a free port and return (process, base URL)."""
+    command = [
+        sys.executable, str(ROOT / 'benchmarks' / 'fixture_server.py'), '--port', '0',
+        '--jobs', str(args.jobs), '--latency-ms', str(args.latency_ms), '--jitter-ms', str(args.jitter_ms),
+        '--error-rate', str(args.error_rate), '--throttle-rate', str(args.throttle_rate), '--seed', '1',
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    banner = process.stdout.readline()
+    return process, banner.rsplit(' ', 1)[-1].strip()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_scenario(operation, repeat, concurrency=1):
+    """Call `operation` `repeat` times; it returns the number of items it handled."""
+    latencies = []
+
+    def timed_call(_):
+        start = time.perf_counter()
+        items = operation()
+        latencies.append(time.perf_counter() - start)
+        return items
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        items = sum(executor.map(timed_call, range(repeat)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'operations': repeat,
+        'items': items,
+        'items_per_second': items / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--jobs', type=int, default=250, help='search results served by the fixture server')
+    arg_parser.add_argument('--latency-ms', type=float, default=20.0)
+    arg_parser.add_argument('--jitter-ms', type=float, default=5.0)
+    arg_parser.add_argument('--error-rate', type=float, default=0.0)
+    arg_parser.add_argument('--throttle-rate', type=float, default=0.0)
+    arg_parser.add_argument('--repeat', type=int, default=3, help='runs of each whole-search scenario')
+    arg_parser.add_argument('--json', help='write the results to this file')
+    arg_parser.add_argument('--baseline', help='compare throughput with an earlier --json file')
+    args = arg_parser.parse_args()
+
+    call_command('migrate', verbosity=0)
+    server, base_url = start_fixture_server(args)
+    settings.LINKEDIN_BASE_URL = base_url
+    try:
+        search_url = create_linkedin_url(KEYWORDS, LOCATION)
+        job_ids = [card['job_id'] for card in get_job_ids(search_url, DEFAULT_HEADERS, args.jobs)]
+        remaining = iter(job_ids * args.repeat)
+        client = Client()
+        found_jobs = []
+
+        def listing():
+            return len(get_job_ids(search_url, DEFAULT_HEADERS, args.jobs))
+
+        def detail():
+            return 1 if get_job_details(next(remaining), DEFAULT_HEADERS) else 0
+
+        def search():
+            response = client.post(
+                '/search/', {'keywords': KEYWORDS, 'location': LOCATION, 'job_limit': args.jobs},
+                content_type='application/json',
+            )
+            found_jobs[:] = response.json()['jobs']
+            return len(found_jobs)
+
+        def download():
+            response = client.post('/download-csv/', found_jobs, content_type='application/json')
+            for _ in response.streaming_content:
+                pass
+            return len(found_jobs)
+
+        results = {
+            'get_job_ids': run_scenario(listing, args.repeat),
+            'get_job_details': run_scenario(detail, len(job_ids) * args.repeat, settings.LINKEDIN_MAX_WORKERS),
+            '/search/': run_scenario(search, args.repeat),
+            '/download-csv/': run_scenario(download, args.repeat),
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+
+    print(f"fixture server: {args.jobs} jobs, {args.latency_ms:g}±{args.jitter_ms:g} ms, "
+          f"{args.error_rate:.0%} errors, {args.throttle_rate:.0%} throttled")
+    print(f"{'scenario':<18}{'ops':>6}{'items':>8}{'items/s':>11}{'p50 ms':>10}{'p99 ms':>10}{'RSS MB':>9}"
+          + (f"{'vs base':>10}" if baseline else ''))
+    for name, result in results.items():
+        line = (f"{name:<18}{result['operations']:>6}{result['items']:>8}{result['items_per_second']:>11.1f}"
+                f"{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}{result['peak_rss_mb']:>9.1f}")
+        if name in baseline and baseline[name]['items_per_second']:
+            change = result['items_per_second'] / baseline[name]['items_per_second'] - 1
+            line += f"{change:>+10.1%}"
+        print(line)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'arguments': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
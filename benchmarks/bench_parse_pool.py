@@ -0,0 +1,79 @@
+"""Compare thread and process parsing of posting pages.
+
+Run from the repository root:
+
+    python benchmarks/bench_parse_pool.py [--pages 3000] [--workers N]
+
+Parses the job_posting_*.html fixtures, repeated up to --pages, in four
+ways: inline in one thread, from a pool of fetch-style threads, through
+the process pool one page per task (as get_job_details does), and through
+the process pool in chunks (as reparse_raw_responses does). Process
+parsing only pays off with more than one CPU; the script prints the count.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+sys.path.insert(0, str(ROOT))
+
+from django.conf import settings  # noqa: E402
+
+settings.configure(
+    LINKEDIN_PARSE_MODE='thread', LINKEDIN_PARSE_WORKERS=None, LINKEDIN_PARSE_CHUNK_SIZE=16,
+    # parsepool counts field outcomes for jobApp.fieldstats
+    LINKEDIN_FIELD_STATS_WINDOW=500, LINKEDIN_FIELD_ALERT_RATIO=0.5,
+)
+
+from jobApp import parsepool  # noqa: E402
+from jobApp.parsers import parse_job_details  # noqa: E402
+
+
+def timed(label, func, pages):
+    start = time.perf_counter()
+    results = func(pages)
+    elapsed = time.perf_counter() - start
+    assert len(results) == len(pages)
+    print(f"{label:<34}{len(pages) / elapsed:>12,.0f}{elapsed * 1000:>12.0f}")
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--pages', type=int, default=3000)
+    arg_parser.add_argument('--workers', type=int, default=os.cpu_count())
+    arg_parser.add_argument('--threads', type=int, default=8, help='fetch threads calling the parser')
+    args = arg_parser.parse_args()
+
+    fixtures = [path.read_bytes() for path in sorted(FIXTURES.glob('job_posting_*.html'))]
+    pages = [(str(4200000000 + i), content) for i, content in enumerate(islice(cycle(fixtures), args.pages))]
+    print(f"{len(pages)} pages, {os.cpu_count()} CPUs, {args.workers} parse processes, {args.threads} threads")
+    print(f"{'mode':<34}{'pages/s':>12}{'total ms':>12}")
+
+    expected = timed('inline', lambda pages: [parse_job_details(c, j) for j, c in pages], pages)
+
+    def threaded(pages):
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            return list(executor.map(lambda page: parsepool.parse_page(page[1], page[0]), pages))
+    timed('thread mode, fetch threads', threaded, pages)
+
+    settings.LINKEDIN_PARSE_MODE = parsepool.PROCESS
+    settings.LINKEDIN_PARSE_WORKERS = args.workers
+    # Start the workers outside the timings
+    parsepool.parse_pages(pages[:args.workers * 4], chunksize=1)
+
+    results = timed('process mode, fetch threads', threaded, pages)
+    assert results == expected, "process parsing returned different fields"
+    for chunksize in (1, 16, 64):
+        timed(f'process mode, chunks of {chunksize}', lambda pages: parsepool.parse_pages(pages, chunksize), pages)
+
+    parsepool.get_parse_executor().shutdown()
+
+
+if __name__ == '__main__':
+    main()
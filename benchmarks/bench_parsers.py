@@ -0,0 +1,162 @@
+"""Compare the lxml extractors in jobApp.parsers with the original BeautifulSoup code.
+
+Run from the repository root:
+
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/bench_parsers.py [--repeat N]
+
+Both implementations parse the saved pages in benchmarks/fixtures. The script
+checks that they extract identical fields before printing the timings. Skills
+and salary are left out of the comparison because they now come from the
+taxonomy engine (see bench_skills.py) rather than the original keyword scan.
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+sys.path.insert(0, str(ROOT))
+
+from jobApp import parsers  # noqa: E402
+
+
+def legacy_job_ids(html):
+    """Listing page extraction as get_job_ids did it with html.parser (IDs only)."""
+    soup = BeautifulSoup(html, 'html.parser')
+    job_ids = []
+    for job in soup.find_all("li"):
+        base_card = job.find("div", {"class": "base-card"})
+        if base_card and base_card.get('data-entity-urn'):
+            job_ids.append(base_card.get('data-entity-urn').split(":")[3])
+    return job_ids
+
+
+def legacy_job_details(html, job_id=None):
+    """Posting page extraction as get_job_details did it with html.parser."""
+    job_data = {
+        'job_id': job_id, 'company': None, 'company_url': None, 'job_title': None,
+        'job_url': None, 'location': None, 'posted_date': None, 'job_description': None,
+        'applicant_count': None, 'level': None, 'employment_type': None,
+        'job_function': None, 'salary': None, 'skills': []
+    }
+    soup = BeautifulSoup(html, 'html.parser')
+
+    company_card = soup.find("div", {"class": "top-card-layout__card"})
+    if company_card:
+        company_link = company_card.find("a")
+        if company_link:
+            if company_link.find("img"):
+                job_data["company"] = company_link.find("img").get("alt", "").strip()
+            job_data["company_url"] = company_link.get("href", "").strip()
+
+    title_section = soup.find("div", {"class": "top-card-layout__entity-info"})
+    if title_section:
+        title_link = title_section.find("a")
+        if title_link:
+            job_data["job_title"] = title_link.text.strip()
+            job_data["job_url"] = title_link.get("href", "").strip()
+
+    for key, tag, name in (('location', 'span', 'topcard__flavor--bullet'),
+                           ('posted_date', 'span', 'posted-time-ago__text'),
+                           ('job_description', 'div', 'show-more-less-html__markup'),
+                           ('applicant_count', 'span', 'num-applicants__caption')):
+        elem = soup.find(tag, {"class": name})
+        if elem:
+            job_data[key] = elem.text.strip()
+
+    criteria_list = soup.find("ul", {"class": "description__job-criteria-list"})
+    if criteria_list:
+        for item in criteria_list.find_all("li"):
+            header = item.find("h3")
+            value = item.find("span")
+            if header and value:
+                header_text = header.text.strip().lower()
+                if "seniority" in header_text:
+                    job_data["level"] = value.text.strip()
+                elif "employment type" in header_text:
+                    job_data["employment_type"] = value.text.strip()
+                elif "industry" in header_text:
+                    job_data["industry"] = value.text.strip()
+                elif "job function" in header_text:
+                    job_data["job_function"] = value.text.strip()
+
+    salary_elem = soup.find("span", {"class": "compensation__salary"})
+    if salary_elem:
+        job_data["salary"] = salary_elem.text.strip()
+    elif job_data.get("job_description"):
+        salary_pattern = r'\$[\d,]+(?:\.\d+)?(?:\s*-\s*\$[\d,]+(?:\.\d+)?)?(?:\s*(?:per year|annually|yearly))?'
+        match = re.search(salary_pattern, job_data["job_description"].lower())
+        if match:
+            job_data["salary"] = match.group(0)
+
+    skills_section = soup.find("section", {"class": "skills-section"})
+    if skills_section:
+        for skill_item in skills_section.find_all("li", {"class": "job-details-skill-match-status-list__skill"}):
+            skill_name = skill_item.find("span", {"class": "job-details-skill-match-status-list__skill-name"})
+            if skill_name:
+                job_data["skills"].append(skill_name.text.strip())
+    elif job_data.get("job_description"):
+        description_text = job_data["job_description"].lower()
+        common_skills = ["python", "java", "javascript", "sql", "aws", "machine learning", "data analysis"]
+        job_data["skills"] = [skill for skill in common_skills if skill in description_text]
+
+    return job_data
+
+
+# Fields whose extraction intentionally changed since the BeautifulSoup version
+TAXONOMY_FIELDS = {'skills', 'salary'}
+
+
+def card_job_ids(content):
+    """The listing extractor the scraper uses, reduced to the IDs the original code collected."""
+    return [card['job_id'] for card in parsers.parse_job_cards(content)]
+
+
+def comparable(fields):
+    if isinstance(fields, list):
+        return fields
+    return {key: value for key, value in fields.items() if key not in TAXONOMY_FIELDS}
+
+
+def timed(func, payload, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(payload)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=200)
+    args = arg_parser.parse_args()
+
+    # parse_job_cards also reads each card's title, company, location and date
+    cases = [('search_page.html', legacy_job_ids, card_job_ids)]
+    cases += [
+        (path.name, legacy_job_details, parsers.parse_job_details)
+        for path in sorted(FIXTURES.glob('job_posting_*.html'))
+    ]
+
+    print(f"{'fixture':<34}{'bs4 ms':>10}{'lxml ms':>10}{'speedup':>10}")
+    for name, legacy, current in cases:
+        raw = (FIXTURES / name).read_bytes()
+        expected = comparable(legacy(raw.decode('utf-8')))
+        actual = current(raw)
+        if not isinstance(actual, list):
+            actual = {key: getattr(actual, key) for key in expected}
+        if expected != actual:
+            sys.exit(f"{name}: extractors disagree\n  bs4:  {expected}\n  lxml: {actual}")
+
+        # The original code parsed resp.text, so decoding is part of its cost
+        legacy_time = timed(lambda data: legacy(data.decode('utf-8')), raw, args.repeat)
+        current_time = timed(current, raw, args.repeat)
+        print(f"{name:<34}{legacy_time * 1000:>10.3f}{current_time * 1000:>10.3f}{legacy_time / current_time:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+"""Settings for bench_end_to_end.py: the project settings on a local SQLite file.
+
+Caches and pacing are off so every run measures the full fetch-and-parse
+path, and LINKEDIN_BASE_URL is set once the fixture server is listening.
+"""
+import tempfile
+from pathlib import Path
+
+from job.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': Path(tempfile.gettempdir()) / 'linkedin_bench.sqlite3',
+    }
+}
+
+LINKEDIN_RAW_STORE_DIR = Path(tempfile.gettempdir()) / 'linkedin_bench_raw'
+
+LINKEDIN_REQUESTS_PER_SECOND = 0
+LINKEDIN_CACHE_TTL = 0
+LINKEDIN_RESULT_CACHE_TTL = 0
+LINKEDIN_BACKOFF_BASE = 0.01
+LINKEDIN_SEARCH_RUN_IN_PROCESS = False
+
+LOGGING['loggers']['jobApp']['level'] = 'WARNING'  # noqa: F405
@@ -0,0 +1,82 @@
+"""Measure skill and salary extraction throughput on saved job descriptions.
+
+Run from the repository root:
+
+    python benchmarks/bench_skills.py [--repeat N]
+
+Compares the compiled SkillMatcher against scanning the same taxonomy one
+term at a time (the approach of the original seven-keyword loop), and times
+salary normalization on the same corpus.
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CORPUS = Path(__file__).resolve().parent / 'fixtures' / 'descriptions.jsonl'
+sys.path.insert(0, str(ROOT))
+
+from jobApp.salary import parse_salary  # noqa: E402
+from jobApp.skills import get_skill_matcher  # noqa: E402
+
+
+def substring_scan(terms):
+    """Per-term substring loop, as get_job_details originally did for seven keywords."""
+    def find(text):
+        text = text.lower()
+        return [term for term in terms if term in text]
+    return find
+
+
+def boundary_scan(terms):
+    """One word-bounded regex per term: accurate, but a full pass for every term."""
+    patterns = [re.compile(r'(?<![\w+#])' + re.escape(term) + r'(?![\w+#])') for term in terms]
+
+    def find(text):
+        text = text.lower()
+        return [pattern.pattern for pattern in patterns if pattern.search(text)]
+    return find
+
+
+def throughput(func, descriptions, repeat):
+    total_bytes = sum(len(text.encode('utf-8')) for text in descriptions) * repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in descriptions:
+            func(text)
+    elapsed = time.perf_counter() - start
+    return len(descriptions) * repeat / elapsed, total_bytes / elapsed / 1e6
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=20)
+    args = arg_parser.parse_args()
+
+    with open(CORPUS, encoding='utf-8') as f:
+        descriptions = [json.loads(line)['job_description'] for line in f]
+
+    start = time.perf_counter()
+    matcher = get_skill_matcher()
+    compile_ms = (time.perf_counter() - start) * 1000
+    terms = list(matcher.canonical)
+    print(f"taxonomy: {len(set(matcher.canonical.values()))} skills, {len(terms)} terms, "
+          f"compiled in {compile_ms:.1f} ms; corpus: {len(descriptions)} descriptions")
+
+    print(f"{'extractor':<28}{'docs/s':>12}{'MB/s':>10}")
+    for name, func in (('SkillMatcher', matcher.find),
+                       ('substring scan', substring_scan(terms)),
+                       ('per-term regex scan', boundary_scan(terms)),
+                       ('parse_salary', parse_salary)):
+        docs_per_second, mb_per_second = throughput(func, descriptions, args.repeat)
+        print(f"{name:<28}{docs_per_second:>12,.0f}{mb_per_second:>10.2f}")
+
+    with_salary = sum(parse_salary(text) is not None for text in descriptions)
+    print(f"salaries normalized: {with_salary}/{len(descriptions)}")
+
+
+if __name__ == '__main__':
+    main()
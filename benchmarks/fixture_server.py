@@ -0,0 +1,165 @@
+"""Serve recorded LinkedIn guest API pages locally, with injected latency and errors.
+
+Run from the repository root:
+
+    python benchmarks/fixture_server.py [--port 8765] [--jobs 500] [--ceiling 1000]
+        [--latency-ms 50] [--jitter-ms 20] [--error-rate 0.01] [--throttle-rate 0.02]
+
+Listing pages replay benchmarks/fixtures/search_page.html with the job IDs
+rewritten so every offset up to --jobs returns distinct cards; offsets past
+that, or past --ceiling, answer HTTP 400 like the real API. Every synthetic
+job has an experience level, job type and workplace type, and the f_E,
+f_JT and f_WT filters narrow the listing to them. Posting pages rotate through the
+recorded job_posting_*.html files. A fraction of requests fail with HTTP 500
+(--error-rate) or HTTP 429 with Retry-After: 0 (--throttle-rate).
+
+Point the scraper at it with LINKEDIN_BASE_URL = 'http://127.0.0.1:<port>'.
+"""
+import argparse
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+
+LISTING_PATH = '/jobs-guest/jobs/api/seeMoreJobPostings/search'
+POSTING_PREFIX = '/jobs-guest/jobs/api/jobPosting/'
+
+# Synthetic job IDs start here so they never collide with the recorded ones
+FIRST_JOB_ID = 4200000000
+
+# Guest API filters and the values synthetic jobs cycle through, the first
+# changing fastest with the job's position
+FACETS = (('f_E', '123456'), ('f_JT', 'FPCTIVO'), ('f_WT', '123'))
+
+_CARD = re.compile(rb'<li>.*?</li>\s*', re.S)
+_URN = re.compile(rb'urn:li:jobPosting:(\d+)')
+
+
+class FixtureSite:
+    """Builds the responses; shared by all request handler threads."""
+
+    def __init__(self, jobs=500, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, throttle_rate=0.0, seed=None,
+                 ceiling=1000):
+        self.jobs = jobs
+        self.ceiling = ceiling
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        # (card HTML, recorded job ID) for each card of the recorded page
+        self.cards = [
+            (card, _URN.search(card).group(1)) for card in _CARD.findall((FIXTURES / 'search_page.html').read_bytes())
+        ]
+        self.postings = [path.read_bytes() for path in sorted(FIXTURES.glob('job_posting_*.html'))]
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _roll(self):
+        with self._lock:
+            return self._random.random(), self._random.uniform(-self.jitter, self.jitter)
+
+    def matching_jobs(self, query):
+        """Positions of the synthetic jobs passing the query's facet filters."""
+        positions = range(self.jobs)
+        period = 1
+        for facet, values in FACETS:
+            if facet in query:
+                wanted = values.find(query[facet][0])
+                positions = [i for i in positions if i // period % len(values) == wanted]
+            period *= len(values)
+        return positions
+
+    def listing_page(self, start, query=None):
+        positions = self.matching_jobs(query or {})[start:start + len(self.cards)]
+        return b''.join(
+            card.replace(recorded_id, b'%d' % (FIRST_JOB_ID + position))
+            for position, (card, recorded_id) in zip(positions, self.cards)
+        )
+
+    def respond(self, path, query):
+        """Return (status, headers, body, delay) for one request."""
+        roll, jitter = self._roll()
+        delay = max(0.0, self.latency + jitter)
+        if roll < self.throttle_rate:
+            return 429, {'Retry-After': '0'}, b'', delay
+        if roll < self.throttle_rate + self.error_rate:
+            return 500, {}, b'', delay
+
+        if path == LISTING_PATH:
+            start = int(query.get('start', ['0'])[0])
+            page = self.listing_page(start, query) if start < self.ceiling else b''
+            if not page:
+                return 400, {}, b'', delay
+            return 200, {}, page, delay
+        if path.startswith(POSTING_PREFIX):
+            job_id = path[len(POSTING_PREFIX):]
+            if not job_id.isdigit():
+                return 404, {}, b'', delay
+            return 200, {}, self.postings[int(job_id) % len(self.postings)], delay
+        return 404, {}, b'', delay
+
+
+def make_handler(site):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in separate writes; without this, delayed
+        # ACKs add ~40 ms to every keep-alive response
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            code, headers, body, delay = site.respond(parts.path, parse_qs(parts.query))
+            if delay:
+                time.sleep(delay)
+            self.send_response(code)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def make_server(site, host='127.0.0.1', port=0):
+    """Bind a threaded server for `site`; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), make_handler(site))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8765)
+    arg_parser.add_argument('--jobs', type=int, default=500, help='total search results served')
+    arg_parser.add_argument('--ceiling', type=int, default=1000, help='offsets served per query')
+    arg_parser.add_argument('--latency-ms', type=float, default=50.0)
+    arg_parser.add_argument('--jitter-ms', type=float, default=20.0)
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered 500')
+    arg_parser.add_argument('--throttle-rate', type=float, default=0.0, help='fraction of requests answered 429')
+    arg_parser.add_argument('--seed', type=int, default=None)
+    args = arg_parser.parse_args()
+
+    site = FixtureSite(
+        args.jobs, args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rate, args.seed, args.ceiling,
+    )
+    server = make_server(site, args.host, args.port)
+    print(f"Serving {args.jobs} jobs on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 
+import os
+
 import dj_database_url
 
 from pathlib import Path
@@ -146,3 +148,173 @@ STATIC_URL = '/static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# LinkedIn scraper
+# Origin of the guest job APIs; benchmarks point this at a local fixture server
+LINKEDIN_BASE_URL = 'https://www.linkedin.com'
+
+# Upper bound on concurrent job-detail requests per search
+LINKEDIN_MAX_WORKERS = 8
+
+# Starting request rate for each endpoint class (listing pages, postings),
+# shared by all worker threads (0 disables pacing). The adaptive limiter
+# raises it while responses are clean and fast and halves it on 429/999
+# responses, empty listing pages or responses slower than the latency target
+LINKEDIN_REQUESTS_PER_SECOND = 5
+LINKEDIN_MIN_REQUESTS_PER_SECOND = 0.5
+LINKEDIN_MAX_REQUESTS_PER_SECOND = 20
+LINKEDIN_RATE_BURST = 2
+LINKEDIN_RATE_INCREASE = 0.5
+LINKEDIN_RATE_DECREASE = 0.5
+LINKEDIN_LATENCY_TARGET = 2.0
+
+# Path of a file through which gunicorn workers on one host share the rate
+# budget (Unix only); None keeps it per process
+LINKEDIN_RATE_LIMIT_STATE_FILE = None
+
+# Keep-alive connections held by the shared HTTP session
+LINKEDIN_POOL_SIZE = LINKEDIN_MAX_WORKERS
+
+# (connect, read) timeouts in seconds for every LinkedIn request
+LINKEDIN_TIMEOUT = (5, 20)
+
+# Retries for connection errors, 429/999 and 5xx responses
+LINKEDIN_MAX_RETRIES = 4
+LINKEDIN_BACKOFF_BASE = 0.5
+LINKEDIN_BACKOFF_MAX = 30
+
+# Detail fetches allowed to queue up ahead of the consumer while the listing
+# pager runs; the pager blocks once this many are pending
+LINKEDIN_PIPELINE_DEPTH = 4 * LINKEDIN_MAX_WORKERS
+
+# Where posting pages are parsed: 'thread' parses in the fetching thread,
+# 'process' hands the raw bytes to a pool of LINKEDIN_PARSE_WORKERS processes
+# (default: one per CPU) so parsing is not serialized by the GIL. Batch jobs
+# such as reparse_raw_responses send pages in chunks of LINKEDIN_PARSE_CHUNK_SIZE
+LINKEDIN_PARSE_MODE = 'thread'
+LINKEDIN_PARSE_WORKERS = None
+LINKEDIN_PARSE_CHUNK_SIZE = 16
+
+# Searches that page past the guest API's 1000-result ceiling are split into
+# facet sub-queries (jobApp/shards.py) paged this many at a time; 0 stops
+# every search at the ceiling instead
+LINKEDIN_SHARD_WORKERS = 4
+# Optional last split: sub-locations to search instead of a location once the
+# facets are used up, keyed by lowercase location and possibly nested, e.g.
+# {'germany': ['Berlin', 'Munich', 'Hamburg', 'Frankfurt']}
+LINKEDIN_SHARD_LOCATIONS = {}
+
+# Near-duplicate postings (jobApp/dedup.py): descriptions whose 5-word
+# shingle sets have at least this estimated Jaccard similarity are one role
+LINKEDIN_DUPLICATE_THRESHOLD = 0.8
+# What searches do with them unless the request's "duplicates" says otherwise:
+# 'annotate' sets duplicate_of to the earlier posting's job ID, 'collapse'
+# leaves them out and 'off' skips the detection
+LINKEDIN_DUPLICATE_MODE = 'annotate'
+# Streamed live searches check postings against the stored ones in batches,
+# sending a batch once its first posting has waited this many seconds
+LINKEDIN_STREAM_DUPLICATE_DELAY = 0.25
+
+# Posting field extraction (jobApp.parsers.FIELD_SELECTORS): hit rates are
+# reported every this many parsed pages (GET /parse-stats/ has them live),
+# with a warning when a field's hit rate, or the share of its hits found by
+# its primary selector, falls below this fraction of its earlier value
+LINKEDIN_FIELD_STATS_WINDOW = 500
+LINKEDIN_FIELD_ALERT_RATIO = 0.5
+
+# Seconds a parsed job posting stays fresh in the JobListing cache (0 disables)
+LINKEDIN_CACHE_TTL = 24 * 60 * 60
+
+# Fetched postings buffered before each bulk upsert into the cache
+LINKEDIN_CACHE_WRITE_BATCH = 100
+
+# Background searches (POST /search/ with "async": true)
+# Searches run concurrently by the in-process pool or run_search_worker
+LINKEDIN_SEARCH_WORKERS = 2
+
+# Run queued searches inside the web process; disable on serverless deploys
+# and run `python manage.py run_search_worker` next to the app instead
+LINKEDIN_SEARCH_RUN_IN_PROCESS = True
+
+# A running search writes a heartbeat with its progress. One silent for this
+# many seconds lost its worker (e.g. a gunicorn restart) and is requeued by
+# run_search_worker or when polled, and failed once it was started this often
+LINKEDIN_SEARCH_HEARTBEAT_TIMEOUT = 5 * 60
+LINKEDIN_SEARCH_MAX_ATTEMPTS = 2
+
+# Finished search results kept in memory per process so identical searches
+# (same normalized keywords, location and limit) reuse one scrape
+LINKEDIN_RESULT_CACHE_TTL = 10 * 60
+
+# Total jobs held across all cached results before LRU eviction
+LINKEDIN_RESULT_CACHE_MAX_JOBS = 20000
+
+# Directory keeping every fetched posting page (gzip, content-addressed) with
+# its ETag/Last-Modified, so refetches are conditional and
+# `manage.py reparse_raw_responses` can rebuild JobListing rows offline.
+# Off unless the LINKEDIN_RAW_STORE_DIR environment variable names a writable
+# directory; serverless filesystems such as Vercel's are read-only
+LINKEDIN_RAW_STORE_DIR = os.environ.get('LINKEDIN_RAW_STORE_DIR') or None
+# `manage.py prune_raw_responses` (run it from cron) deletes stored pages not
+# fetched or revalidated for this many seconds; postings expire after 30 days
+LINKEDIN_RAW_STORE_MAX_AGE = 30 * 24 * 60 * 60
+
+# Batch searches (POST /search/batch/): queries accepted per request, and
+# how many of them crawl their listing pages at the same time
+LINKEDIN_BATCH_MAX_QUERIES = 50
+LINKEDIN_BATCH_LISTING_WORKERS = 4
+
+# Saved searches (POST /saved-searches/<id>/refresh/)
+# A delta refresh never re-crawls old listing pages, so a known job not seen
+# for this many seconds is reported as removed; LinkedIn postings expire
+# after 30 days
+LINKEDIN_SAVED_SEARCH_EXPIRY = 30 * 24 * 60 * 60
+
+# Hot searches (`manage.py refresh_hot_searches`): every /search/ request adds
+# one to its query's score, which halves every LINKEDIN_HOT_SEARCH_HALF_LIFE
+# seconds. Queries scoring at least LINKEDIN_HOT_SEARCH_MIN_SCORE (2.5: about
+# three requests in the last few hours) are re-crawled in the background
+# every LINKEDIN_HOT_SEARCH_REFRESH seconds, hottest first, and answered from
+# the stored crawl until it is LINKEDIN_HOT_SEARCH_MAX_AGE seconds old
+LINKEDIN_HOT_SEARCH_HALF_LIFE = 6 * 60 * 60
+LINKEDIN_HOT_SEARCH_MIN_SCORE = 2.5
+LINKEDIN_HOT_SEARCH_REFRESH = 15 * 60
+LINKEDIN_HOT_SEARCH_MAX_AGE = 2 * LINKEDIN_HOT_SEARCH_REFRESH
+# Largest job_limit crawled in the background; bigger searches run live
+LINKEDIN_HOT_SEARCH_MAX_JOBS = 500
+# Seconds between background re-fetches of one posting
+LINKEDIN_HOT_JOB_REFRESH = 6 * 60 * 60
+# LinkedIn requests (listing pages and postings) the refresher may make per
+# hour across all hot searches
+LINKEDIN_HOT_SEARCH_BUDGET = 1200
+
+# Seconds a fresh process may take to load the WSGI app and route /search/,
+# checked by jobApp.tests when RUN_TIMING_TESTS is set and reported by
+# `manage.py profile_imports`. About 0.5s on a developer machine; the rest
+# is headroom for slower hosts
+COLD_START_BUDGET = 1.5
+
+# Scraper logs go to stderr, where gunicorn collects them; set jobApp to
+# DEBUG to see per-page progress
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'verbose': {
+            'format': '%(asctime)s %(levelname)s %(name)s [%(threadName)s] %(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'verbose',
+        },
+    },
+    'loggers': {
+        'jobApp': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
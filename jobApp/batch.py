@@ -0,0 +1,115 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+from .client import LinkedInFetchError
+from .coalesce import search_cache, search_key
+from .scraper import (
+    create_linkedin_url, get_job_details, get_job_ids, job_matches, load_cached_details, matching_card_filter,
+    store_job_details,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class BatchSearch:
+    """Runs several searches at once, fetching each distinct posting only once.
+
+    Listing pages of all queries are crawled concurrently. As each query's
+    cards arrive, IDs no other query has claimed yet are looked up in the
+    JobListing cache or submitted to one shared pool of detail workers.
+    Results are then fanned back out to every query that listed them.
+    """
+
+    def __init__(self, queries, headers, max_workers=None):
+        self.queries = queries
+        self.headers = headers
+        self.max_workers = max_workers or settings.LINKEDIN_MAX_WORKERS
+        self._details = {}  # job_id -> Future of its details
+        self._fetched = []  # details downloaded by this batch, for the JobListing cache
+        self._lock = threading.Lock()
+        self.listed_jobs = 0
+
+    def _claim(self, job_ids, executor):
+        """Schedule details for IDs not seen by any earlier query."""
+        with self._lock:
+            new_ids = [job_id for job_id in dict.fromkeys(job_ids) if job_id not in self._details]
+            for job_id in new_ids:
+                self._details[job_id] = Future()
+            self.listed_jobs += len(job_ids)
+        cached = load_cached_details(new_ids)
+        for job_id in new_ids:
+            if job_id in cached:
+                self._details[job_id].set_result(cached[job_id])
+            else:
+                executor.submit(self._fetch, job_id)
+
+    def _fetch(self, job_id):
+        future = self._details[job_id]
+        try:
+            job_data = get_job_details(job_id, self.headers)
+        except BaseException as e:
+            future.set_exception(e)
+            return
+        if job_data:
+            with self._lock:
+                self._fetched.append(job_data)
+        future.set_result(job_data)
+
+    @property
+    def unique_jobs(self):
+        return len(self._details)
+
+    @property
+    def fetched_jobs(self):
+        return len(self._fetched)
+
+    def _crawl(self, query, executor):
+        try:
+            base_url = create_linkedin_url(query['keywords'], query['location'])
+            card_filter = matching_card_filter(query['keywords'], query['location'])
+            job_ids = [card['job_id'] for card in get_job_ids(base_url, self.headers, query['job_limit'], card_filter)]
+            self._claim(job_ids, executor)
+            return job_ids
+        finally:
+            # Listing threads opened connections for the cache lookups
+            connections.close_all()
+
+    def run(self):
+        """Return one result dict per query, in the order given."""
+        results = [dict(query, jobs=[], error=None) for query in self.queries]
+        pending = []
+        for result in results:
+            cached = search_cache.get(search_key(result['keywords'], result['location'], result['job_limit']))
+            if cached is not None:
+                result['jobs'] = list(cached)
+            else:
+                pending.append(result)
+
+        detail_executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        listing_workers = max(1, min(settings.LINKEDIN_BATCH_LISTING_WORKERS, len(pending)))
+        try:
+            with ThreadPoolExecutor(max_workers=listing_workers) as listing_executor:
+                crawls = [
+                    (result, listing_executor.submit(self._crawl, result, detail_executor)) for result in pending
+                ]
+                job_ids_by_query = []
+                for result, crawl in crawls:
+                    try:
+                        job_ids_by_query.append((result, crawl.result()))
+                    except LinkedInFetchError as e:
+                        logger.warning("Batch query %r in %r failed: %s", result['keywords'], result['location'], e)
+                        result['error'] = f"LinkedIn search failed: {e}"
+
+            for result, job_ids in job_ids_by_query:
+                for job_id in job_ids:
+                    job_data = self._details[job_id].result()
+                    if job_matches(job_data, result['keywords'], result['location']):
+                        result['jobs'].append(job_data)
+        finally:
+            detail_executor.shutdown(wait=False, cancel_futures=True)
+            store_job_details(self._fetched)
+        return results
@@ -0,0 +1,113 @@
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from .metrics import HTTP_RESPONSES, HTTP_RETRIES, PHASE_SECONDS, RESPONSE_BYTES, endpoint_class
+from .ratelimit import linkedin_limiter
+
+logger = logging.getLogger(__name__)
+
+# 999 is LinkedIn's "request denied" status, served when it suspects scraping
+RETRY_STATUSES = {429, 500, 502, 503, 504, 999}
+# Statuses that tell the adaptive limiter to slow down
+THROTTLE_STATUSES = {429, 999}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class LinkedInFetchError(Exception):
+    """Raised when a LinkedIn request keeps failing after every retry."""
+
+
+def get_session():
+    """Return the process-wide session so connections are kept alive and reused."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool_size = settings.LINKEDIN_POOL_SIZE
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+def parse_retry_after(value):
+    """Convert a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Exponential backoff with full jitter, overridden by the server's Retry-After."""
+    cap = settings.LINKEDIN_BACKOFF_MAX
+    if retry_after is not None:
+        return min(retry_after, cap)
+    return random.uniform(0, min(cap, settings.LINKEDIN_BACKOFF_BASE * 2 ** attempt))
+
+
+def fetch(url, headers=None, on_attempt=None):
+    """GET a LinkedIn URL through the shared session, retrying transient failures.
+
+    Responses with a non-retryable status are returned as-is for the caller to
+    inspect. LinkedInFetchError is raised once the retries are used up.
+    `on_attempt` is called before every request sent, retries included.
+    """
+    endpoint = endpoint_class(url)
+    with PHASE_SECONDS.time(f'{endpoint}_fetch'):
+        return _fetch(url, headers, endpoint, on_attempt)
+
+
+def _fetch(url, headers, endpoint, on_attempt):
+    session = get_session()
+    retries = settings.LINKEDIN_MAX_RETRIES
+    last_error = None
+
+    for attempt in range(retries + 1):
+        retry_after = None
+        try:
+            with linkedin_limiter.slot(endpoint) as slot:
+                if on_attempt is not None:
+                    on_attempt()
+                resp = session.get(url, headers=headers, timeout=settings.LINKEDIN_TIMEOUT)
+                slot.throttled = resp.status_code in THROTTLE_STATUSES
+                slot.failed = resp.status_code in RETRY_STATUSES
+        except requests.RequestException as e:
+            last_error = e
+            reason = type(e).__name__
+        else:
+            HTTP_RESPONSES.inc(endpoint, resp.status_code)
+            if resp.status_code not in RETRY_STATUSES:
+                RESPONSE_BYTES.observe(len(resp.content), endpoint)
+                return resp
+            last_error = f"HTTP {resp.status_code}"
+            reason = str(resp.status_code)
+            retry_after = parse_retry_after(resp.headers.get('Retry-After'))
+            resp.close()
+
+        if attempt < retries:
+            HTTP_RETRIES.inc(endpoint, reason)
+            delay = backoff_delay(attempt, retry_after)
+            logger.info("Retrying %s in %.1fs after %s", url, delay, last_error)
+            time.sleep(delay)
+
+    logger.warning("Giving up on %s after %d attempts: %s", url, retries + 1, last_error)
+    raise LinkedInFetchError(f"{url} failed after {retries + 1} attempts: {last_error}")
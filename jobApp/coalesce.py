@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .metrics import CACHE_LOOKUPS
+from .scraper import create_linkedin_url
+
+
+def search_key(keywords, location, job_limit):
+    """Normalize a query so equivalent searches share one cache entry."""
+    keywords = ' '.join(keywords.lower().split())
+    location = ' '.join(location.lower().split())
+    return create_linkedin_url(keywords, location), job_limit
+
+
+class _Flight:
+    """A computation other threads can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SearchResultCache:
+    """Thread-safe LRU/TTL cache of finished search results with single-flight loading.
+
+    Concurrent callers asking for the same key while it is being computed
+    wait for that one computation instead of starting their own. Entries are
+    evicted least-recently-used first once the cached results, and the
+    variants derived from them, hold more than `max_jobs` jobs in total.
+    """
+
+    def __init__(self, ttl, max_jobs):
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self._entries = OrderedDict()  # key -> (expires_at, jobs, {variant: derived jobs})
+        self._size = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached result for `key`, or None."""
+        with self._lock:
+            jobs = self._get(key)
+        CACHE_LOOKUPS.inc('search_result', 'miss' if jobs is None else 'hit')
+        return jobs
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, jobs, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return jobs
+
+    def _remove(self, key):
+        _, jobs, derived = self._entries.pop(key)
+        self._size -= len(jobs) + sum(len(variant_jobs) for variant_jobs in derived.values())
+
+    def _evict(self):
+        while self._size > self.max_jobs:
+            self._remove(next(iter(self._entries)))
+
+    def _store(self, key, jobs):
+        if not self.ttl or len(jobs) > self.max_jobs:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, jobs, {})
+        self._size += len(jobs)
+        self._evict()
+
+    def _derived(self, key, jobs):
+        # The variants of `jobs` while it is still the live entry for `key`
+        entry = self._entries.get(key)
+        if entry is None or entry[1] is not jobs or entry[0] <= time.monotonic():
+            return None
+        return entry[2]
+
+    def derive(self, key, jobs, variant, compute):
+        """Return `compute(jobs)`, kept with the cached result of `key` while it lasts.
+
+        `jobs` is the result get_or_compute returned for `key`; when it is no
+        longer cached, the variant is computed but not kept.
+        """
+        with self._lock:
+            derived = self._derived(key, jobs)
+            variant_jobs = derived.get(variant) if derived is not None else None
+        CACHE_LOOKUPS.inc('search_variant', 'miss' if variant_jobs is None else 'hit')
+        if variant_jobs is not None:
+            return variant_jobs
+
+        variant_jobs = compute(jobs)
+        with self._lock:
+            derived = self._derived(key, jobs)
+            if derived is not None and variant not in derived:
+                derived[variant] = variant_jobs
+                self._size += len(variant_jobs)
+                self._evict()
+        return variant_jobs
+
+    def get_or_compute(self, key, compute):
+        """Return the cached result for `key`, computing it at most once at a time.
+
+        Errors raised by `compute` are re-raised in every waiting caller and
+        are not cached.
+        """
+        with self._lock:
+            jobs = self._get(key)
+            if jobs is not None:
+                CACHE_LOOKUPS.inc('search_result', 'hit')
+                return jobs
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _Flight()
+
+        CACHE_LOOKUPS.inc('search_result', 'miss' if leader else 'coalesced')
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                if flight.error is None:
+                    self._store(key, flight.result)
+            flight.done.set()
+        return flight.result
+
+
+search_cache = SearchResultCache(
+    ttl=settings.LINKEDIN_RESULT_CACHE_TTL,
+    max_jobs=settings.LINKEDIN_RESULT_CACHE_MAX_JOBS,
+)
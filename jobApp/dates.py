@@ -0,0 +1,20 @@
+import re
+from datetime import timedelta
+
+_AGO_UNITS = {
+    'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400,
+    'week': 7 * 86400, 'month': 30 * 86400, 'year': 365 * 86400,
+}
+_AGO_PATTERN = re.compile(r'(\d+)\+?\s+(second|minute|hour|day|week|month|year)s?\s+ago', re.IGNORECASE)
+
+
+def parse_posted_ago(text, now):
+    """Turn a relative posting time such as "2 weeks ago" into a datetime before `now`."""
+    if not text:
+        return None
+    match = _AGO_PATTERN.search(text)
+    if match:
+        return now - timedelta(seconds=int(match.group(1)) * _AGO_UNITS[match.group(2).lower()])
+    if 'just now' in text.lower():
+        return now
+    return None
@@ -0,0 +1,307 @@
+"""Near-duplicate postings: MinHash signatures of descriptions and an LSH index.
+
+The same role is often posted under several job IDs (reposts, one per
+city, agencies). Each description is reduced to a MinHash signature of
+its 5-word shingles. Signatures are cut into bands, and postings that
+share a band are compared. The share of equal signature slots estimates
+the Jaccard similarity of the two shingle sets, so no pair of postings
+is compared unless LSH puts them in the same bucket.
+
+numpy is imported where it is used so that app startup does not load it.
+"""
+import hashlib
+import logging
+import re
+import time
+import zlib
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from .models import JobListing, NearDuplicateBucket
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 5
+# 20 bands of 6 rows: postings at 0.8 similarity share a band 99.8% of the
+# time, at 0.5 27% of the time and at 0.3 1.4%, before verification
+BANDS = 20
+ROWS = 6
+NUM_PERM = BANDS * ROWS
+
+# Largest prime below 2**32: (a * h + b) stays below 2**64 for 32-bit h
+_PRIME = 4294967291
+_WORD = re.compile(r'\w+')
+
+OFF = 'off'
+ANNOTATE = 'annotate'
+COLLAPSE = 'collapse'
+DUPLICATE_MODES = (OFF, ANNOTATE, COLLAPSE)
+
+
+def _constants(label, count, modulus):
+    # Derived from a hash rather than a seeded RNG so stored signatures stay
+    # valid across numpy versions and processes
+    return [
+        int.from_bytes(hashlib.blake2b(f'{label}{i}'.encode(), digest_size=8).digest(), 'little') % modulus
+        for i in range(count)
+    ]
+
+
+_params = None
+
+
+def _hash_params():
+    global _params
+    if _params is None:
+        import numpy as np
+
+        _params = (
+            np.array([value or 1 for value in _constants('a', NUM_PERM, _PRIME)], dtype=np.uint64)[:, None],
+            np.array(_constants('b', NUM_PERM, _PRIME), dtype=np.uint64)[:, None],
+            np.array(_constants('band', ROWS, 2 ** 64), dtype=np.uint64),
+        )
+    return _params
+
+
+def shingle_hashes(text):
+    """32-bit hashes of the text's lowercase 5-word shingles, as a numpy array."""
+    import numpy as np
+
+    words = _WORD.findall(text.lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    word_hashes = np.fromiter((zlib.crc32(word.encode()) for word in words), dtype=np.uint64, count=len(words))
+    size = min(SHINGLE_SIZE, len(words))
+    # Polynomial rolling hash over each window of `size` words
+    hashes = np.zeros(len(words) - size + 1, dtype=np.uint64)
+    for offset in range(size):
+        hashes = (hashes * np.uint64(1000003) + word_hashes[offset:len(words) - size + 1 + offset]) & np.uint64(0xFFFFFFFF)
+    return np.unique(hashes)
+
+
+def minhash_signature(text):
+    """Return the MinHash signature of `text` as NUM_PERM uint32 values, or None for empty text."""
+    import numpy as np
+
+    if not text:
+        return None
+    hashes = shingle_hashes(text)
+    if not len(hashes):
+        return None
+    a, b, _ = _hash_params()
+    # One row per permutation, one column per shingle
+    return ((a * hashes[None, :] + b) % np.uint64(_PRIME)).min(axis=1).astype(np.uint32)
+
+
+def signature_bytes(signature):
+    return signature.astype('<u4').tobytes()
+
+
+def signature_from_bytes(data):
+    import numpy as np
+
+    return np.frombuffer(bytes(data), dtype='<u4')
+
+
+def band_keys(signature):
+    """One signed 64-bit bucket key per band, for NearDuplicateBucket rows."""
+    import numpy as np
+
+    _, _, multipliers = _hash_params()
+    rows = signature.reshape(BANDS, ROWS).astype(np.uint64)
+    keys = (rows * multipliers).sum(axis=1) + np.arange(BANDS, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    return keys.view(np.int64).tolist()
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two signatures."""
+    return float((first == second).mean())
+
+
+class MinHashIndex:
+    """In-memory LSH index over signatures, queried without pairwise scans."""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self._buckets = defaultdict(list)
+        self._signatures = {}
+
+    def __contains__(self, job_id):
+        return job_id in self._signatures
+
+    def add(self, job_id, signature, keys=None):
+        self._signatures[job_id] = signature
+        for key in keys if keys is not None else band_keys(signature):
+            self._buckets[key].append(job_id)
+
+    def query(self, signature, keys=None):
+        """Return the indexed job IDs at least `threshold` similar to `signature`, oldest first."""
+        candidates = {}
+        for key in keys if keys is not None else band_keys(signature):
+            for job_id in self._buckets.get(key, ()):
+                candidates.setdefault(job_id, None)
+        return [
+            job_id for job_id in candidates
+            if similarity(signature, self._signatures[job_id]) >= self.threshold
+        ]
+
+
+def _id_order(job_id):
+    # LinkedIn IDs grow over time; compare them as numbers
+    return (len(job_id), job_id)
+
+
+class DuplicateDetector:
+    """Marks near-duplicate JobRecords across one search and the stored JobListings.
+
+    A posting similar to postings earlier in this search joins their group.
+    Otherwise the oldest (lowest ID) of itself and the similar stored
+    postings starts its group. `duplicate_of` always names where a group
+    started, so following it never loops. Records are passed in chunks so
+    stored history costs three queries per chunk, and the signature saved
+    with a stored posting is reused instead of hashing its description again.
+    """
+
+    def __init__(self, threshold=None, use_history=True):
+        self.threshold = settings.LINKEDIN_DUPLICATE_THRESHOLD if threshold is None else threshold
+        self.use_history = use_history
+        self._seen = MinHashIndex(self.threshold)
+        self._history = MinHashIndex(self.threshold)
+        self._group = {}
+        self._kept = set()
+
+    def _stored_signatures(self, job_ids):
+        try:
+            rows = JobListing.objects.filter(job_id__in=job_ids, minhash__isnull=False).values_list('job_id', 'minhash')
+            return {job_id: signature_from_bytes(data) for job_id, data in rows}
+        except DatabaseError as e:
+            logger.warning("Stored signature lookup failed: %s", e)
+            return {}
+
+    def _load_history(self, keys):
+        try:
+            job_ids = set(
+                NearDuplicateBucket.objects.filter(bucket__in=keys).values_list('job_id', flat=True)
+            )
+            job_ids = [job_id for job_id in job_ids if job_id not in self._history]
+            rows = JobListing.objects.filter(job_id__in=job_ids, minhash__isnull=False).values_list('job_id', 'minhash')
+            for job_id, data in rows:
+                self._history.add(job_id, signature_from_bytes(data))
+        except DatabaseError as e:
+            logger.warning("Duplicate history lookup failed: %s", e)
+
+    def _root(self, job_id):
+        # Follow group starts that later joined an older group themselves
+        seen = set()
+        while job_id in self._group and self._group[job_id] != job_id and job_id not in seen:
+            seen.add(job_id)
+            job_id = self._group[job_id]
+        return job_id
+
+    def mark(self, jobs):
+        """Set `duplicate_of` on each record of one chunk, in order; returns the chunk."""
+        stored = self._stored_signatures([job.job_id for job in jobs if job]) if self.use_history else {}
+        signed = []
+        for job in jobs:
+            signature = None
+            if job:
+                signature = stored.get(job.job_id)
+                if signature is None:
+                    signature = minhash_signature(job.job_description)
+            signed.append((job, signature, band_keys(signature) if signature is not None else None))
+        if self.use_history:
+            keys = [key for _, _, job_keys in signed if job_keys for key in job_keys]
+            if keys:
+                self._load_history(keys)
+
+        for job, signature, keys in signed:
+            if signature is None or job.job_id in self._seen:
+                continue
+            earlier = [self._root(job_id) for job_id in self._seen.query(signature, keys)]
+            if earlier:
+                # Earlier postings were already passed on with their groups
+                group = min(earlier, key=_id_order)
+            else:
+                # The stored postings include this one when it was saved before the search ended
+                stored = [self._root(job_id) for job_id in self._history.query(signature, keys)]
+                group = min(stored + [job.job_id], key=_id_order)
+            self._group[job.job_id] = group
+            job.duplicate_of = group if group != job.job_id else None
+            self._seen.add(job.job_id, signature, keys)
+        return jobs
+
+    def keep(self, job):
+        """For collapsing: whether `job` is the first marked posting of its group.
+
+        A group whose stored original is not among this search's results is
+        still shown once, by its first posting here.
+        """
+        if not job:
+            return True
+        group = self._root(job.job_id)
+        if group in self._kept:
+            return False
+        self._kept.add(group)
+        return True
+
+
+def iter_deduplicated(jobs, mode, chunk_size=25, use_history=True, max_delay=None):
+    """Pass JobRecords through near-duplicate detection in chunks.
+
+    ANNOTATE sets `duplicate_of` and yields every record; COLLAPSE also
+    drops every record after the first of each group; OFF clears it.
+    Records that get a different `duplicate_of` are yielded as copies,
+    because the ones passed in may be shared through the search cache.
+
+    With `max_delay`, a chunk is also passed on when a record arrives after
+    its first one has waited `max_delay` seconds, for streams that should
+    not hold records back for a whole chunk.
+    """
+    if mode == OFF:
+        for job in jobs:
+            yield job.copy(duplicate_of=None) if job and job.duplicate_of is not None else job
+        return
+    detector = DuplicateDetector(use_history=use_history)
+    chunk = []
+    started = None
+
+    def flush():
+        for job in detector.mark(chunk):
+            if mode == ANNOTATE or detector.keep(job):
+                yield job
+        chunk.clear()
+
+    for job in jobs:
+        if not chunk:
+            started = time.monotonic()
+        chunk.append(job.copy() if job else job)
+        if len(chunk) >= chunk_size or (max_delay is not None and time.monotonic() - started >= max_delay):
+            yield from flush()
+    yield from flush()
+
+
+def store_buckets(signatures):
+    """Replace the LSH bucket rows of the given {job_id: signature or None}."""
+    NearDuplicateBucket.objects.filter(job_id__in=list(signatures)).delete()
+    NearDuplicateBucket.objects.bulk_create(
+        [
+            NearDuplicateBucket(bucket=key, job_id=job_id)
+            for job_id, signature in signatures.items() if signature is not None
+            for key in band_keys(signature)
+        ],
+        batch_size=1000,
+    )
+
+
+def index_listings(listings):
+    """Sign and bucket saved JobListings, e.g. rows stored before signatures existed."""
+    signatures = {}
+    for listing in listings:
+        signature = minhash_signature(listing.job_description)
+        listing.minhash = signature_bytes(signature) if signature is not None else None
+        signatures[listing.job_id] = signature
+    JobListing.objects.bulk_update(listings, ['minhash'], batch_size=500)
+    store_buckets(signatures)
+    return sum(1 for signature in signatures.values() if signature is not None)
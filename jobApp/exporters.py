@@ -0,0 +1,131 @@
+import csv
+import zlib
+
+from .records import JobRecord
+
+# Column order of tabular exports, one column per JobRecord field
+EXPORT_FIELDS = list(JobRecord.FIELDS)
+
+# Rows buffered per yielded chunk (CSV/NDJSON) or per Parquet row group
+CHUNK_ROWS = 500
+
+# Parquet columns that are not strings, by pyarrow type factory name
+PARQUET_TYPES = {'salary_min': 'float64', 'salary_max': 'float64'}
+
+
+class Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
+
+class _ChunkSink:
+    """Write-only file collecting bytes until the next drain()."""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_csv(jobs):
+    """Yield CSV text for JobRecords in chunks, header first."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for batch in _batched(jobs, CHUNK_ROWS):
+        yield ''.join(writer.writerow(job.to_row()) for job in batch)
+
+
+def iter_csv_gzip(jobs):
+    """Yield gzip-compressed CSV bytes as each chunk is produced."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in iter_csv(jobs):
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_ndjson(jobs):
+    """Yield one JSON object per line; skills stay a JSON array."""
+    for batch in _batched(jobs, CHUNK_ROWS):
+        yield ''.join(job.to_json() + '\n' for job in batch)
+
+
+def iter_parquet(jobs):
+    """Yield a Parquet file written one row group at a time.
+
+    Requires the optional pyarrow package, which is too large to ship in
+    the serverless bundle by default.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        (column, getattr(pa, PARQUET_TYPES.get(column, 'string'))()) for column in EXPORT_FIELDS
+    ])
+    numeric = [(index, column) for index, column in enumerate(EXPORT_FIELDS) if column in PARQUET_TYPES]
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    for batch in _batched(jobs, CHUNK_ROWS):
+        # Transpose the rows into columns so no per-row dict is built
+        columns = list(zip(*(job.to_row() for job in batch)))
+        for index, column in numeric:
+            columns[index] = [getattr(job, column) for job in batch]
+        table = pa.Table.from_arrays(
+            [pa.array(values, field.type) for values, field in zip(columns, schema)], schema=schema,
+        )
+        writer.write_table(table)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def parquet_available():
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# format -> (chunk generator, content type, file extension)
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv', 'csv'),
+    'csv.gz': (iter_csv_gzip, 'application/gzip', 'csv.gz'),
+    'ndjson': (iter_ndjson, 'application/x-ndjson', 'ndjson'),
+    'parquet': (iter_parquet, 'application/vnd.apache.parquet', 'parquet'),
+}
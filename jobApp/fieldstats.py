@@ -0,0 +1,123 @@
+"""Per-field extraction outcomes of parsed posting pages.
+
+Every parsed page reports, for each field of jobApp.parsers.FIELD_SELECTORS,
+which selector found it or that none did. The outcomes feed the
+linkedin_field_extractions counter, GET /parse-stats/ and a log report
+every LINKEDIN_FIELD_STATS_WINDOW pages, which warns when a field is found
+far less often than before, or through its fallbacks far more often. Like
+jobApp.metrics, the numbers are per process.
+"""
+import logging
+import threading
+from collections import Counter, deque
+
+from django.conf import settings
+
+from .metrics import FIELD_EXTRACTIONS
+
+logger = logging.getLogger(__name__)
+
+
+def _rate(part, whole):
+    return round(part / whole, 4) if whole else None
+
+
+class FieldStats:
+    def __init__(self, window):
+        self.window = window
+        self.pages = 0
+        self._totals = {}
+        self._recent = {}
+        self._lock = threading.Lock()
+
+    def record(self, sources):
+        """Count one page's {field: selector name, MISSING or ERROR}."""
+        with self._lock:
+            self.pages += 1
+            for field, outcome in sources.items():
+                FIELD_EXTRACTIONS.inc(field, outcome)
+                self._totals.setdefault(field, Counter())[outcome] += 1
+                self._recent.setdefault(field, deque(maxlen=self.window)).append(outcome)
+            report = self.pages % self.window == 0
+        if report:
+            self.log_report()
+
+    def snapshot(self):
+        """Hit rates and selector counts per field, overall and over the last `window` pages."""
+        # Loaded only once pages were parsed, so the parser is usually in memory already
+        from .parsers import ERROR, FIELD_SELECTORS, MISSING
+
+        with self._lock:
+            pages = self.pages
+            totals = {field: Counter(counts) for field, counts in self._totals.items()}
+            recent = {field: Counter(outcomes) for field, outcomes in self._recent.items()}
+        recent_pages = min(pages, self.window)
+
+        fields = {}
+        for field, selectors in FIELD_SELECTORS.items():
+            total = totals.get(field, Counter())
+            window = recent.get(field, Counter())
+            hits = pages - total[MISSING] - total[ERROR]
+            recent_hits = recent_pages - window[MISSING] - window[ERROR]
+            earlier_pages = pages - recent_pages
+            primary = selectors[0][0]
+            # The earlier rates are None until a full window of pages precedes the recent one
+            earlier = earlier_pages >= self.window
+            fields[field] = {
+                'hit_rate': _rate(hits, pages),
+                'recent_hit_rate': _rate(recent_hits, recent_pages),
+                'previous_hit_rate': _rate(hits - recent_hits, earlier_pages) if earlier else None,
+                # Share of hits found by the first selector rather than a fallback
+                'recent_primary_share': _rate(window[primary], recent_hits),
+                'previous_primary_share': (
+                    _rate(total[primary] - window[primary], hits - recent_hits) if earlier else None
+                ),
+                'selectors': {name: total[name] for name, _ in selectors},
+                'missing': total[MISSING],
+                'errors': total[ERROR],
+            }
+        return {'pages': pages, 'window': self.window, 'fields': fields}
+
+    def log_report(self):
+        """Log the recent hit rates, and a warning per field that looks broken."""
+        snapshot = self.snapshot()
+        fields = snapshot['fields']
+        logger.info(
+            "Field hit rates over the last %d postings: %s", min(snapshot['pages'], self.window),
+            ', '.join(f"{field} {stats['recent_hit_rate']:.0%}" for field, stats in fields.items()),
+        )
+        ratio = settings.LINKEDIN_FIELD_ALERT_RATIO
+        for field, stats in fields.items():
+            previous = stats['previous_hit_rate']
+            if previous and stats['recent_hit_rate'] < previous * ratio:
+                logger.warning(
+                    "Field %s found on %.0f%% of the last %d postings, down from %.0f%%; check its selectors",
+                    field, stats['recent_hit_rate'] * 100, self.window, previous * 100,
+                )
+            # Salary and skills come from fallbacks on many postings, so
+            # only a drop against the field's own history is a warning
+            previous = stats['previous_primary_share']
+            recent = stats['recent_primary_share']
+            if previous and recent is not None and recent < previous * ratio:
+                logger.warning(
+                    "Field %s matched its primary selector on %.0f%% of recent hits, down from %.0f%%; "
+                    "its fallbacks carry the rest",
+                    field, recent * 100, previous * 100,
+                )
+
+
+_stats = None
+_stats_lock = threading.Lock()
+
+
+def get_field_stats():
+    global _stats
+    if _stats is None:
+        with _stats_lock:
+            if _stats is None:
+                _stats = FieldStats(settings.LINKEDIN_FIELD_STATS_WINDOW)
+    return _stats
+
+
+def record_field_sources(sources):
+    get_field_stats().record(sources)
@@ -0,0 +1,233 @@
+"""Background refresh of frequently requested searches.
+
+Each /search/ request is counted on its HotSearch row. `manage.py
+refresh_hot_searches` re-crawls the searches requested most, hottest first,
+within a request budget shared by all of them. The crawled listing and the
+stored postings then answer /search/ without touching LinkedIn.
+"""
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import F, Q, Value
+from django.db.models.functions import Greatest, Log, Power
+from django.utils import timezone
+
+from .client import LinkedInFetchError, fetch
+from .metrics import CACHE_LOOKUPS
+from .models import HotSearch, JobListing
+from .ratelimit import linkedin_limiter
+from .scraper import (
+    END_OF_RESULTS_STATUSES, PAGE_SIZE, RESULTS_CEILING, create_linkedin_url, get_job_details, job_matches,
+    matching_card_filter, store_job_details,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(text):
+    # Same normalization as coalesce.search_key
+    return ' '.join(text.lower().split())
+
+
+def _heat(now):
+    """Heat of a single request made at `now`: time in half-lives since the Unix epoch."""
+    return now.timestamp() / settings.LINKEDIN_HOT_SEARCH_HALF_LIFE
+
+
+def min_heat(now):
+    """Smallest `request_heat` that makes a search hot at `now`."""
+    return math.log2(settings.LINKEDIN_HOT_SEARCH_MIN_SCORE) + _heat(now)
+
+
+def record_search_request(keywords, location, job_limit):
+    """Count one request for a search with a single UPDATE; failures only cost the count."""
+    now = timezone.now()
+    heat = _heat(now)
+    job_limit = min(job_limit, settings.LINKEDIN_HOT_SEARCH_MAX_JOBS)
+    # log2(2**a + 2**b), kept in range by factoring out the larger of the two
+    top = Greatest(F('request_heat'), Value(heat))
+    added = top + Log(2, Power(2, F('request_heat') - top) + Power(2, Value(heat) - top))
+    changes = {
+        'request_heat': added, 'last_requested_at': now, 'job_limit': Greatest(F('job_limit'), Value(job_limit)),
+    }
+    key = {'keywords': _normalize(keywords), 'location': _normalize(location)}
+    try:
+        if not HotSearch.objects.filter(**key).update(**changes):
+            _, created = HotSearch.objects.get_or_create(
+                **key, defaults={'job_limit': job_limit, 'request_heat': heat, 'last_requested_at': now},
+            )
+            if not created:
+                # Another request created the row first
+                HotSearch.objects.filter(**key).update(**changes)
+    except DatabaseError as e:
+        logger.warning("Could not count search request: %s", e)
+
+
+def stored_search_results(keywords, location, job_limit):
+    """Return the matching JobRecords of a recently refreshed hot search, or None.
+
+    Like iter_matching_jobs, `job_limit` counts pre-filtered cards, so the
+    answer is the one a live search would have given at refresh time.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.LINKEDIN_HOT_SEARCH_MAX_AGE)
+    try:
+        search = HotSearch.objects.filter(
+            keywords=_normalize(keywords), location=_normalize(location),
+            refreshed_at__gte=cutoff, results_limit__gte=job_limit,
+        ).first()
+        listings = {}
+        if search is not None:
+            job_ids = search.job_ids[:job_limit]
+            listings = {listing.job_id: listing for listing in JobListing.objects.filter(job_id__in=job_ids)}
+    except DatabaseError as e:
+        logger.warning("Hot search lookup failed: %s", e)
+        search = None
+    CACHE_LOOKUPS.inc('hot_search', 'miss' if search is None else 'hit')
+    if search is None:
+        return None
+    jobs = [listings[job_id].to_record() for job_id in job_ids if job_id in listings]
+    return [job for job in jobs if job_matches(job, keywords, location)]
+
+
+class RequestBudget:
+    """Token bucket of LinkedIn requests: `per_hour` on average, at most an hour's worth at once."""
+
+    def __init__(self, per_hour):
+        self.per_hour = per_hour
+        self._tokens = float(per_hour)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.per_hour, self._tokens + (now - self._updated) * self.per_hour / 3600)
+            self._updated = now
+            return self._tokens
+
+    def spend(self, requests):
+        with self._lock:
+            self._tokens -= requests
+
+    def charge(self):
+        """Spend one request; given to fetch as `on_attempt`, so retries are paid for too."""
+        self.spend(1)
+
+
+def _due(listing, now):
+    if listing is None:
+        return True
+    next_refresh_at = listing.next_refresh_at or (
+        listing.fetched_at + timedelta(seconds=settings.LINKEDIN_HOT_JOB_REFRESH)
+    )
+    return next_refresh_at <= now
+
+
+def crawl_page(search, headers, budget):
+    """Crawl the next listing page of a hot search and fetch its due postings.
+
+    Returns False when the crawl ended (limit, end of results or ceiling)
+    and was saved as the search's new results. Raises LinkedInFetchError
+    if the page cannot be fetched; the frontier then stays where it was.
+    """
+    from .parsers import parse_job_cards
+
+    resp = fetch(
+        create_linkedin_url(search.keywords, search.location).format(search.next_offset),
+        headers=headers, on_attempt=budget.charge,
+    )
+    if resp.status_code not in END_OF_RESULTS_STATUSES and resp.status_code != 200:
+        raise LinkedInFetchError(f"Listing page at offset {search.next_offset} returned HTTP {resp.status_code}")
+    cards = parse_job_cards(resp.content) if resp.status_code == 200 else []
+    if resp.status_code == 200 and not cards:
+        linkedin_limiter.backoff('listing', 'empty_page')
+
+    card_filter = matching_card_filter(search.keywords, search.location)
+    wanted = search.job_limit - len(search.crawl_job_ids)
+    job_ids = [card['job_id'] for card in cards if card_filter(card) and card['job_id'] not in search.crawl_job_ids]
+    job_ids = list(dict.fromkeys(job_ids))[:wanted]
+
+    now = timezone.now()
+    listings = {listing.job_id: listing for listing in JobListing.objects.filter(job_id__in=job_ids)}
+    due = [job_id for job_id in job_ids if _due(listings.get(job_id), now)]
+    if due:
+        with ThreadPoolExecutor(max_workers=min(settings.LINKEDIN_MAX_WORKERS, len(due))) as executor:
+            fetched = list(executor.map(lambda job_id: get_job_details(job_id, headers, budget.charge), due))
+        store_job_details([job for job in fetched if job])
+        # Failed postings (often expired ones) wait for their next turn too
+        JobListing.objects.filter(job_id__in=due).update(
+            next_refresh_at=now + timedelta(seconds=settings.LINKEDIN_HOT_JOB_REFRESH)
+        )
+
+    search.crawl_job_ids = search.crawl_job_ids + job_ids
+    search.next_offset += PAGE_SIZE
+    finished = (
+        not cards or len(search.crawl_job_ids) >= search.job_limit or search.next_offset >= RESULTS_CEILING
+    )
+    if finished:
+        search.job_ids = search.crawl_job_ids
+        search.results_limit = search.job_limit
+        search.refreshed_at = now
+        search.next_refresh_at = now + timedelta(seconds=settings.LINKEDIN_HOT_SEARCH_REFRESH)
+        search.crawl_job_ids = []
+        search.next_offset = 0
+    search.save(update_fields=[
+        'crawl_job_ids', 'next_offset', 'job_ids', 'results_limit', 'refreshed_at', 'next_refresh_at',
+    ])
+    return not finished
+
+
+def due_searches(now=None):
+    """Hot searches due for a crawl, hottest first; searches that cooled off are retired."""
+    now = now or timezone.now()
+    threshold = min_heat(now)
+    # Their stored results expire on their own; a new request can make them hot again
+    HotSearch.objects.filter(next_refresh_at__lte=now, request_heat__lt=threshold).update(
+        next_refresh_at=None, next_offset=0, crawl_job_ids=[],
+    )
+    # A search that just became hot has no next_refresh_at yet
+    return list(HotSearch.objects.filter(
+        Q(next_refresh_at__lte=now) | Q(next_refresh_at__isnull=True), request_heat__gte=threshold,
+    ).order_by('-request_heat'))
+
+
+def prune_hot_searches(now=None):
+    """Delete searches whose score has decayed to nearly nothing and that are not being refreshed."""
+    now = now or timezone.now()
+    # Ten half-lives take any score below a thousandth of its peak
+    cutoff = now - timedelta(seconds=10 * settings.LINKEDIN_HOT_SEARCH_HALF_LIFE)
+    return HotSearch.objects.filter(last_requested_at__lt=cutoff, next_refresh_at__isnull=True).delete()[0]
+
+
+def refresh_hot_searches(budget, headers):
+    """Crawl due hot searches page by page while the budget lasts.
+
+    Returns the number of listing pages crawled. A page is only started
+    with enough budget left for it and every posting on it. Every request
+    sent is charged, retries included, so a page that needed retries can
+    overdraw the budget; later pages wait until it is paid back. An
+    unfinished crawl resumes at its next_offset.
+    """
+    pages = 0
+    for search in due_searches():
+        crawling = True
+        while crawling:
+            if budget.available < 1 + PAGE_SIZE:
+                return pages
+            try:
+                crawling = crawl_page(search, headers, budget)
+            except LinkedInFetchError as e:
+                logger.warning("Refreshing hot search %s failed: %s", search, e)
+                break
+            pages += 1
+        if not crawling:
+            logger.info("Refreshed hot search %s: %d candidate jobs", search, len(search.job_ids))
+    return pages
+
@@ -0,0 +1,96 @@
+import re
+from datetime import datetime, time
+
+from django.db import connection
+from django.db.models import Count, F, Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import JobListing
+
+# Fields offered as facets and as exact-match filters on /jobs/
+FACET_FIELDS = ['company', 'location', 'level', 'employment_type']
+
+# Most frequent values returned per facet
+FACET_SIZE = 10
+
+# Virtual table and expression behind the full-text index (see migration 0009)
+FTS_TABLE = 'jobApp_joblisting_fts'
+TSVECTOR = "to_tsvector('english', coalesce(job_title, '') || ' ' || coalesce(job_description, ''))"
+
+_WORDS = re.compile(r'\w+')
+
+
+def fts5_query(text):
+    """Quote each word so user input can never be read as FTS5 query syntax."""
+    return ' '.join(f'"{word}"' for word in _WORDS.findall(text))
+
+
+def full_text_filter(queryset, text):
+    """Keep listings whose title or description contains every word of `text`."""
+    if connection.vendor == 'sqlite':
+        query = fts5_query(text)
+        if not query:
+            return queryset
+        return queryset.filter(id__in=RawSQL(
+            f'SELECT rowid FROM "{FTS_TABLE}" WHERE "{FTS_TABLE}" MATCH %s', (query,)
+        ))
+    if connection.vendor == 'postgresql':
+        return queryset.extra(where=[f"{TSVECTOR} @@ plainto_tsquery('english', %s)"], params=[text])
+    # No full-text index on other backends; fall back to a scan
+    condition = Q()
+    for word in _WORDS.findall(text):
+        condition &= Q(job_title__icontains=word) | Q(job_description__icontains=word)
+    return queryset.filter(condition)
+
+
+def filter_listings(params):
+    """Build the JobListing queryset for the /jobs/ query parameters.
+
+    `q` is a full-text query over title and description. Each facet field
+    accepts one or more exact values, and `posted_after`/`posted_before`
+    bound posted_at. Raises ValueError for a malformed date.
+    """
+    queryset = JobListing.objects.all()
+    text = params.get('q', '').strip()
+    if text:
+        queryset = full_text_filter(queryset, text)
+    for field in FACET_FIELDS:
+        values = params.getlist(field)
+        if values:
+            queryset = queryset.filter(**{f'{field}__in': values})
+    for param, lookup in (('posted_after', 'posted_at__gte'), ('posted_before', 'posted_at__lte')):
+        value = params.get(param)
+        if value:
+            queryset = queryset.filter(**{lookup: parse_date_param(param, value)})
+    return queryset.order_by(F('posted_at').desc(nulls_last=True), '-id')
+
+
+def parse_date_param(param, value):
+    try:
+        parsed = parse_datetime(value) or parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f"{param} must be an ISO date or datetime")
+    if not isinstance(parsed, datetime):
+        parsed = datetime.combine(parsed, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def facet_counts(queryset):
+    """Count the most common values of each facet field among the matches."""
+    facets = {}
+    for field in FACET_FIELDS:
+        rows = (
+            queryset.exclude(**{f'{field}__isnull': True})
+            .order_by()
+            .values(field)
+            .annotate(count=Count('id'))
+            .order_by('-count', field)[:FACET_SIZE]
+        )
+        facets[field] = [{'value': row[field], 'count': row['count']} for row in rows]
+    return facets
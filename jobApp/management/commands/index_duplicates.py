@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobApp.dedup import index_listings
+from jobApp.models import JobListing
+
+
+class Command(BaseCommand):
+    help = "Compute MinHash signatures for stored JobListings that lack one, for near-duplicate detection."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help="Re-sign every listing, not only those without a signature.",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.LINKEDIN_CACHE_WRITE_BATCH,
+            help="Listings signed per database write.",
+        )
+
+    def handle(self, *args, **options):
+        listings = JobListing.objects.filter(job_description__isnull=False).only('id', 'job_id', 'job_description')
+        if not options['all']:
+            listings = listings.filter(minhash__isnull=True)
+
+        batch = []
+        indexed = 0
+        for listing in listings.iterator(chunk_size=options['batch_size']):
+            batch.append(listing)
+            if len(batch) >= options['batch_size']:
+                indexed += index_listings(batch)
+                batch = []
+        if batch:
+            indexed += index_listings(batch)
+
+        self.stdout.write(f"Indexed {indexed} stored postings")
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobApp.startup import DEFERRED_MODULES, run_cold_start
+
+
+class Command(BaseCommand):
+    help = "Profile a cold start (load the WSGI app, route one URL) and list the costliest imports."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default='/search/',
+            help="URL the fresh process routes after loading the app.",
+        )
+        parser.add_argument(
+            '--top', type=int, default=20,
+            help="Number of imports to list.",
+        )
+        parser.add_argument(
+            '--sort', choices=['self', 'cumulative'], default='cumulative',
+            help="Rank imports by their own time or including what they import.",
+        )
+
+    def handle(self, *args, **options):
+        profile = run_cold_start(options['path'], importtime=True)
+        column = 0 if options['sort'] == 'self' else 1
+        imports = sorted(profile['imports'], key=lambda row: row[column], reverse=True)
+
+        self.stdout.write(f"{'self ms':>10}{'total ms':>10}  module")
+        for self_us, cumulative_us, module in imports[:options['top']]:
+            self.stdout.write(f"{self_us / 1000:>10.1f}{cumulative_us / 1000:>10.1f}  {module}")
+
+        budget = settings.COLD_START_BUDGET
+        self.stdout.write(
+            f"\nCold start to {options['path']}: {profile['seconds'] * 1000:.0f} ms "
+            f"({len(profile['modules'])} modules, budget {budget * 1000:.0f} ms)"
+        )
+        loaded = [module for module in DEFERRED_MODULES if module in profile['modules']]
+        if loaded:
+            self.stderr.write(f"Deferred modules loaded at startup: {', '.join(loaded)}")
+        if profile['seconds'] > budget:
+            self.stderr.write("Cold start is over budget")
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jobApp.rawstore import get_raw_store
+
+
+class Command(BaseCommand):
+    help = "Delete stored posting pages that were not fetched or revalidated recently."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age', type=int, default=settings.LINKEDIN_RAW_STORE_MAX_AGE,
+            help="Keep pages fetched within this many seconds.",
+        )
+
+    def handle(self, *args, **options):
+        raw_store = get_raw_store()
+        if raw_store is None:
+            raise CommandError("LINKEDIN_RAW_STORE_DIR is not set")
+
+        records, blobs = raw_store.prune(options['max_age'])
+        self.stdout.write(f"Deleted {records} job records and {blobs} stored pages")
@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobApp.hot_searches import RequestBudget, prune_hot_searches, refresh_hot_searches
+from jobApp.scraper import DEFAULT_HEADERS
+
+
+class Command(BaseCommand):
+    help = "Keep the most requested searches (HotSearch rows) fresh in the background, within a request budget."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--budget', type=int, default=settings.LINKEDIN_HOT_SEARCH_BUDGET,
+            help="LinkedIn requests allowed per hour across all hot searches.",
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=30.0,
+            help="Seconds to wait between checks for due searches.",
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Refresh the currently due searches as far as the budget allows and exit.",
+        )
+
+    def handle(self, *args, **options):
+        # One scheduler per deployment: the budget is kept in this process
+        budget = RequestBudget(options['budget'])
+        while True:
+            pruned = prune_hot_searches()
+            if pruned:
+                self.stdout.write(f"Forgot {pruned} searches nobody requested lately")
+            pages = refresh_hot_searches(budget, DEFAULT_HEADERS)
+            if pages:
+                self.stdout.write(f"Crawled {pages} listing pages, {budget.available:.0f} requests of budget left")
+
+            if options['once']:
+                break
+            # Don't hold a connection open between polls
+            connections.close_all()
+            time.sleep(options['poll_interval'])
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from jobApp.fieldstats import get_field_stats
+from jobApp.models import JobListing
+from jobApp.parsepool import parse_pages
+from jobApp.rawstore import get_raw_store
+
+
+class Command(BaseCommand):
+    help = "Rebuild JobListing rows from the stored posting pages, without network access."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'job_ids', nargs='*',
+            help="Only re-parse these job IDs (default: every stored page).",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.LINKEDIN_CACHE_WRITE_BATCH,
+            help="Rows upserted per database write.",
+        )
+
+    def handle(self, *args, **options):
+        raw_store = get_raw_store()
+        if raw_store is None:
+            raise CommandError("LINKEDIN_RAW_STORE_DIR is not set")
+
+        if options['job_ids']:
+            records = (raw_store.get(job_id) for job_id in options['job_ids'])
+        else:
+            records = raw_store.records()
+
+        pages = []
+        fetched_at = {}
+        parsed = missing = 0
+
+        def flush():
+            # Parsing is spread over LINKEDIN_PARSE_WORKERS processes in process mode
+            JobListing.store_details(parse_pages(pages), fetched_at)
+            pages.clear()
+            fetched_at.clear()
+
+        for record in records:
+            content = raw_store.read(record) if record else None
+            if content is None:
+                missing += 1
+                continue
+            pages.append((record['job_id'], content))
+            # Keep the download time so cache freshness and posted_at stay truthful
+            fetched_at[record['job_id']] = parse_datetime(record['fetched_at'])
+            parsed += 1
+            if len(pages) >= options['batch_size']:
+                flush()
+        flush()
+
+        self.stdout.write(f"Re-parsed {parsed} stored postings")
+        if parsed:
+            # This process parsed nothing else, so the stats cover exactly these pages
+            for field, stats in get_field_stats().snapshot()['fields'].items():
+                selectors = ', '.join(f"{name} {count}" for name, count in stats['selectors'].items())
+                self.stdout.write(f"  {field:<16}{stats['hit_rate']:>7.1%}  ({selectors})")
+        if missing:
+            self.stderr.write(f"{missing} postings had no stored page")
@@ -0,0 +1,47 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobApp.tasks import pending_task_ids, recover_stale_tasks, run_search_task
+
+
+class Command(BaseCommand):
+    help = "Run queued background searches (SearchTask rows) from the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=settings.LINKEDIN_SEARCH_WORKERS,
+            help="Number of searches to run at the same time.",
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=2.0,
+            help="Seconds to wait between checks for new tasks.",
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Drain the currently pending tasks and exit.",
+        )
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        running = set()
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='search-task') as executor:
+            while True:
+                running = {future for future in running if not future.done()}
+                for task_id in recover_stale_tasks():
+                    self.stdout.write(f"Requeued search task {task_id}; its worker stopped responding")
+                free_slots = concurrency - len(running)
+                task_ids = pending_task_ids(free_slots) if free_slots > 0 else []
+                for task_id in task_ids:
+                    self.stdout.write(f"Starting search task {task_id}")
+                    running.add(executor.submit(run_search_task, task_id))
+
+                if options['once'] and not task_ids and not running:
+                    break
+                # Don't hold a connection open between polls
+                connections.close_all()
+                time.sleep(options['poll_interval'])
@@ -0,0 +1,210 @@
+"""Process-local counters and histograms rendered in the Prometheus text format.
+
+Each gunicorn worker keeps its own values, so scrape every worker (or run a
+single one) to see the whole picture.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; spans a cached lookup up to a heavily throttled request
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Response sizes: listing pages are ~10-60 KB, postings ~20-200 KB
+BYTES_BUCKETS = (1024, 4096, 16384, 32768, 65536, 131072, 262144, 524288, 1048576)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count, optionally split by label values."""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield self.name + '_total', _format_labels(self.labelnames, labels), value
+
+
+class Gauge:
+    """Current value that can go up and down, optionally split by label values."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield self.name, _format_labels(self.labelnames, labels), value
+
+
+class Histogram:
+    """Bucketed observations with their sum and count, optionally split by labels."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels):
+        entry = self._values.get(labels)
+        return sum(entry[0]) if entry else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._values.items())
+        names = self.labelnames + ('le',)
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                yield self.name + '_bucket', _format_labels(names, labels + (_format_number(bound),)), cumulative
+            yield self.name + '_sum', _format_labels(self.labelnames, labels), total
+            yield self.name + '_count', _format_labels(self.labelnames, labels), cumulative
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_format_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+PHASE_SECONDS = registry.register(Histogram(
+    'linkedin_phase_seconds',
+    'Time spent in each scraping phase (listing_fetch, detail_fetch, parse, filter, serialize).',
+    ['phase'],
+))
+RESPONSE_BYTES = registry.register(Histogram(
+    'linkedin_response_bytes', 'Size of LinkedIn response bodies.', ['endpoint'], buckets=BYTES_BUCKETS,
+))
+HTTP_RESPONSES = registry.register(Counter(
+    'linkedin_http_responses', 'LinkedIn responses by endpoint and HTTP status.', ['endpoint', 'status'],
+))
+HTTP_RETRIES = registry.register(Counter(
+    'linkedin_http_retries', 'LinkedIn requests retried, by endpoint and reason.', ['endpoint', 'reason'],
+))
+CACHE_LOOKUPS = registry.register(Counter(
+    'linkedin_cache_lookups', 'Cache lookups by cache (job_listing, search_result, search_variant) and result.', ['cache', 'result'],
+))
+PARSE_FAILURES = registry.register(Counter(
+    'linkedin_parse_failures', 'Job postings that could not be fetched or parsed, by reason.', ['reason'],
+))
+FIELD_EXTRACTIONS = registry.register(Counter(
+    'linkedin_field_extractions',
+    'Posting fields by the selector that extracted them, or missing/error when none did.', ['field', 'selector'],
+))
+
+LIMITER_RATE = registry.register(Gauge(
+    'linkedin_limiter_requests_per_second', 'Request rate currently allowed by the adaptive limiter.', ['endpoint'],
+))
+LIMITER_CONCURRENCY = registry.register(Gauge(
+    'linkedin_limiter_concurrency', 'Concurrent requests currently allowed by the adaptive limiter.', ['endpoint'],
+))
+LIMITER_BACKOFFS = registry.register(Counter(
+    'linkedin_limiter_backoffs', 'Times the adaptive limiter cut its rate, by endpoint and signal.', ['endpoint', 'signal'],
+))
+
+
+def endpoint_class(url):
+    """Label a LinkedIn URL by the guest API it calls."""
+    if '/seeMoreJobPostings/' in url:
+        return 'listing'
+    if '/jobPosting/' in url:
+        return 'detail'
+    return 'other'
+
+
+def timed_iter(iterable, phase):
+    """Yield from `iterable`, adding the time spent producing each item to `phase`."""
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            PHASE_SECONDS.observe(time.perf_counter() - start, phase)
+        yield item
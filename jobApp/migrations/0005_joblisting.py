@@ -0,0 +1,38 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobApp', '0004_delete_joblisting'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobListing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.CharField(max_length=32, unique=True)),
+                ('company', models.CharField(max_length=255, null=True)),
+                ('company_url', models.URLField(max_length=500, null=True)),
+                ('job_title', models.CharField(max_length=255, null=True)),
+                ('job_url', models.URLField(max_length=500, null=True)),
+                ('location', models.CharField(max_length=255, null=True)),
+                ('posted_date', models.CharField(max_length=100, null=True)),
+                ('job_description', models.TextField(null=True)),
+                ('applicant_count', models.CharField(max_length=100, null=True)),
+                ('level', models.CharField(max_length=100, null=True)),
+                ('employment_type', models.CharField(max_length=100, null=True)),
+                ('industry', models.CharField(max_length=255, null=True)),
+                ('job_function', models.CharField(max_length=255, null=True)),
+                ('salary', models.CharField(max_length=255, null=True)),
+                ('skills', models.JSONField(default=list)),
+                ('fetched_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'ordering': ['-id'],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:46
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobApp', '0005_joblisting'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTask',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('keywords', models.CharField(max_length=255)),
+                ('location', models.CharField(max_length=255)),
+                ('job_limit', models.PositiveIntegerField()),
+                ('duplicates', models.CharField(default='annotate', max_length=16)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], db_index=True, default='pending', max_length=16)),
+                ('pages_fetched', models.PositiveIntegerField(default=0)),
+                ('details_parsed', models.PositiveIntegerField(default=0)),
+                ('matches', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('data', models.JSONField()),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='jobApp.searchtask')),
+            ],
+            options={
+                'ordering': ['task', 'position'],
+                'constraints': [models.UniqueConstraint(fields=('task', 'position'), name='unique_search_result_position')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobApp', '0006_searchtask_searchresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='joblisting',
+            name='salary_currency',
+            field=models.CharField(max_length=3, null=True),
+        ),
+        migrations.AddField(
+            model_name='joblisting',
+            name='salary_max',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='joblisting',
+            name='salary_min',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='joblisting',
+            name='salary_period',
+            field=models.CharField(max_length=16, null=True),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:56
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobApp', '0007_joblisting_salary_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('keywords', models.CharField(max_length=255)),
+                ('location', models.CharField(max_length=255)),
+                ('job_limit', models.PositiveIntegerField(default=100, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(3000)])),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_crawled_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SavedSearchJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.CharField(max_length=32)),
+                ('matched', models.BooleanField(default=False)),
+                ('first_seen', models.DateTimeField()),
+                ('last_seen', models.DateTimeField()),
+                ('search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seen_jobs', to='jobApp.savedsearch')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('search', 'job_id'), name='unique_saved_search_job')],
+            },
+        ),
+    ]
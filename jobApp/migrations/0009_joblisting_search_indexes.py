@@ -0,0 +1,85 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:56
+
+from django.db import migrations, models
+
+# SQLite: an external-content FTS5 table kept in sync by triggers
+SQLITE_FTS = [
+    """CREATE VIRTUAL TABLE "jobApp_joblisting_fts" USING fts5(
+        job_title, job_description, content='jobApp_joblisting', content_rowid='id'
+    )""",
+    """CREATE TRIGGER "jobApp_joblisting_fts_insert" AFTER INSERT ON "jobApp_joblisting" BEGIN
+        INSERT INTO "jobApp_joblisting_fts"(rowid, job_title, job_description)
+        VALUES (new.id, new.job_title, new.job_description);
+    END""",
+    """CREATE TRIGGER "jobApp_joblisting_fts_delete" AFTER DELETE ON "jobApp_joblisting" BEGIN
+        INSERT INTO "jobApp_joblisting_fts"("jobApp_joblisting_fts", rowid, job_title, job_description)
+        VALUES ('delete', old.id, old.job_title, old.job_description);
+    END""",
+    """CREATE TRIGGER "jobApp_joblisting_fts_update" AFTER UPDATE ON "jobApp_joblisting" BEGIN
+        INSERT INTO "jobApp_joblisting_fts"("jobApp_joblisting_fts", rowid, job_title, job_description)
+        VALUES ('delete', old.id, old.job_title, old.job_description);
+        INSERT INTO "jobApp_joblisting_fts"(rowid, job_title, job_description)
+        VALUES (new.id, new.job_title, new.job_description);
+    END""",
+    """INSERT INTO "jobApp_joblisting_fts"("jobApp_joblisting_fts") VALUES ('rebuild')""",
+]
+SQLITE_FTS_REVERSE = [
+    'DROP TRIGGER "jobApp_joblisting_fts_insert"',
+    'DROP TRIGGER "jobApp_joblisting_fts_delete"',
+    'DROP TRIGGER "jobApp_joblisting_fts_update"',
+    'DROP TABLE "jobApp_joblisting_fts"',
+]
+
+# PostgreSQL: an expression GIN index; jobApp.listings.TSVECTOR must match it
+POSTGRES_FTS = [
+    """CREATE INDEX "joblisting_fts_idx" ON "jobApp_joblisting" USING gin (
+        to_tsvector('english', coalesce(job_title, '') || ' ' || coalesce(job_description, ''))
+    )""",
+]
+POSTGRES_FTS_REVERSE = ['DROP INDEX "joblisting_fts_idx"']
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobApp', '0008_savedsearch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='joblisting',
+            name='posted_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name='joblisting',
+            index=models.Index(fields=['company'], name='joblisting_company_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='joblisting',
+            index=models.Index(fields=['location'], name='joblisting_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='joblisting',
+            index=models.Index(fields=['level'], name='joblisting_level_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='joblisting',
+            index=models.Index(fields=['employment_type'], name='joblisting_employment_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='joblisting',
+            index=models.Index(fields=['posted_at'], name='joblisting_posted_at_idx'),
+        ),
+        migrations.RunPython(
+            run_vendor_sql({'sqlite': SQLITE_FTS, 'postgresql': POSTGRES_FTS}),
+            run_vendor_sql({'sqlite': SQLITE_FTS_REVERSE, 'postgresql': POSTGRES_FTS_REVERSE}),
+        ),
+    ]
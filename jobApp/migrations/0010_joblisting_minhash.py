@@ -0,0 +1,26 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobApp', '0009_joblisting_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NearDuplicateBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField(db_index=True)),
+                ('job_id', models.CharField(db_index=True, max_length=32)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='joblisting',
+            name='minhash',
+            field=models.BinaryField(null=True),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobApp', '0010_joblisting_minhash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='joblisting',
+            name='next_refresh_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='HotSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('keywords', models.CharField(max_length=255)),
+                ('location', models.CharField(max_length=255)),
+                ('job_limit', models.PositiveIntegerField()),
+                ('request_heat', models.FloatField(db_index=True, default=0)),
+                ('last_requested_at', models.DateTimeField()),
+                ('next_refresh_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('next_offset', models.PositiveIntegerField(default=0)),
+                ('crawl_job_ids', models.JSONField(default=list)),
+                ('job_ids', models.JSONField(default=list)),
+                ('results_limit', models.PositiveIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('keywords', 'location'), name='unique_hot_search')],
+            },
+        ),
+    ]
@@ -0,0 +1,251 @@
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models
+from django.utils import timezone
+
+from .dates import parse_posted_ago
+from .records import JobRecord
+
+
+class JobListing(models.Model):
+    """Parsed job posting, cached by LinkedIn job ID."""
+
+    # Fields copied to and from the JobRecords built by get_job_details;
+    # duplicate_of depends on the other postings and is worked out per search
+    DETAIL_FIELDS = [field for field in JobRecord.FIELDS if field not in ('job_id', 'duplicate_of')]
+
+    job_id = models.CharField(max_length=32, unique=True)
+    company = models.CharField(max_length=255, null=True)
+    company_url = models.URLField(max_length=500, null=True)
+    job_title = models.CharField(max_length=255, null=True)
+    job_url = models.URLField(max_length=500, null=True)
+    location = models.CharField(max_length=255, null=True)
+    posted_date = models.CharField(max_length=100, null=True)
+    job_description = models.TextField(null=True)
+    applicant_count = models.CharField(max_length=100, null=True)
+    level = models.CharField(max_length=100, null=True)
+    employment_type = models.CharField(max_length=100, null=True)
+    industry = models.CharField(max_length=255, null=True)
+    job_function = models.CharField(max_length=255, null=True)
+    salary = models.CharField(max_length=255, null=True)
+    salary_min = models.FloatField(null=True)
+    salary_max = models.FloatField(null=True)
+    salary_currency = models.CharField(max_length=3, null=True)
+    salary_period = models.CharField(max_length=16, null=True)
+    skills = models.JSONField(default=list)
+    # Absolute time derived from the relative posted_date text when fetched
+    posted_at = models.DateTimeField(null=True)
+    fetched_at = models.DateTimeField(db_index=True)
+    # MinHash signature of job_description (jobApp.dedup), little-endian uint32s
+    minhash = models.BinaryField(null=True, editable=False)
+    # When the hot-search refresher fetches this posting again; unset means
+    # LINKEDIN_HOT_JOB_REFRESH seconds after fetched_at
+    next_refresh_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-id']
+        # Filters and facets of the local /jobs/ query; the full-text index over
+        # title and description is vendor-specific and created in migration 0009
+        indexes = [
+            models.Index(fields=['company'], name='joblisting_company_idx'),
+            models.Index(fields=['location'], name='joblisting_location_idx'),
+            models.Index(fields=['level'], name='joblisting_level_idx'),
+            models.Index(fields=['employment_type'], name='joblisting_employment_idx'),
+            models.Index(fields=['posted_at'], name='joblisting_posted_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.job_title} at {self.company} ({self.job_id})"
+
+    def to_record(self):
+        """Rebuild the JobRecord returned by get_job_details."""
+        return JobRecord(self.job_id, **{field: getattr(self, field) for field in self.DETAIL_FIELDS})
+
+    @classmethod
+    def cached_details(cls, job_ids):
+        """Return {job_id: JobRecord} for the given IDs fetched within the cache TTL."""
+        ttl = settings.LINKEDIN_CACHE_TTL
+        if not ttl or not job_ids:
+            return {}
+        cutoff = timezone.now() - timedelta(seconds=ttl)
+        listings = cls.objects.filter(job_id__in=job_ids, fetched_at__gte=cutoff)
+        return {listing.job_id: listing.to_record() for listing in listings}
+
+    @classmethod
+    def store_details(cls, jobs, fetched_at=None):
+        """Upsert JobRecords in bulk.
+
+        They count as fetched now unless `fetched_at` maps a job ID to the
+        time its page was downloaded.
+        """
+        # Imported here so that loading the models does not load numpy
+        from .dedup import minhash_signature, signature_bytes, store_buckets
+
+        now = timezone.now()
+        fetched_at = fetched_at or {}
+        signatures = {job.job_id: minhash_signature(job.job_description) for job in jobs}
+        listings = [
+            cls(job_id=job.job_id, fetched_at=fetched_at.get(job.job_id, now),
+                posted_at=parse_posted_ago(job.posted_date, fetched_at.get(job.job_id, now)),
+                minhash=signature_bytes(signatures[job.job_id]) if signatures[job.job_id] is not None else None,
+                **{field: getattr(job, field) for field in cls.DETAIL_FIELDS})
+            for job in jobs
+        ]
+        if not listings:
+            return
+        cls.objects.bulk_create(
+            listings,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['job_id'],
+            update_fields=cls.DETAIL_FIELDS + ['posted_at', 'fetched_at', 'minhash'],
+        )
+        store_buckets(signatures)
+
+
+class NearDuplicateBucket(models.Model):
+    """One LSH band of a JobListing's MinHash signature (see jobApp.dedup).
+
+    Listings sharing a bucket are candidate near-duplicates, so finding
+    them is an indexed lookup rather than a scan of every stored posting.
+    """
+
+    bucket = models.BigIntegerField(db_index=True)
+    job_id = models.CharField(max_length=32, db_index=True)
+
+    def __str__(self):
+        return f"{self.job_id} in bucket {self.bucket}"
+
+
+class SearchTask(models.Model):
+    """A search scraped in the background and polled by the client."""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    keywords = models.CharField(max_length=255)
+    location = models.CharField(max_length=255)
+    job_limit = models.PositiveIntegerField()
+    # jobApp.dedup mode the results are stored with: off, annotate or collapse
+    duplicates = models.CharField(max_length=16, default='annotate')
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    pages_fetched = models.PositiveIntegerField(default=0)
+    details_parsed = models.PositiveIntegerField(default=0)
+    matches = models.PositiveIntegerField(default=0)
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Written with the progress of a running task; a stale one means its worker is gone
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    # Runs started, counting ones requeued after their worker was lost
+    attempts = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.keywords} in {self.location} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
+
+class SearchResult(models.Model):
+    """One matching job found by a SearchTask, kept in listing order."""
+
+    task = models.ForeignKey(SearchTask, on_delete=models.CASCADE, related_name='results')
+    position = models.PositiveIntegerField()
+    data = models.JSONField()
+
+    class Meta:
+        ordering = ['task', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'position'], name='unique_search_result_position'),
+        ]
+
+
+class HotSearch(models.Model):
+    """A requested search and its place in the background crawl frontier.
+
+    Every /search/ request raises `request_heat`, a request count that decays over time.
+    While it is high enough, `manage.py refresh_hot_searches` re-crawls the
+    search, resuming from `next_offset` when the request budget ran out
+    partway, and /search/ answers it from `job_ids` and stored JobListings.
+    """
+
+    # Normalized like search_key: lowercase, single spaces
+    keywords = models.CharField(max_length=255)
+    location = models.CharField(max_length=255)
+    # Largest job_limit requested, capped at LINKEDIN_HOT_SEARCH_MAX_JOBS
+    job_limit = models.PositiveIntegerField()
+    # log2 of the request count halving every LINKEDIN_HOT_SEARCH_HALF_LIFE,
+    # plus the half-lives since the Unix epoch. The offset makes it grow over
+    # time instead of decaying, so a request only adds to it and the hottest
+    # searches sort first.
+    request_heat = models.FloatField(default=0, db_index=True)
+    last_requested_at = models.DateTimeField()
+    next_refresh_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    # Listing offset and pre-filtered card IDs of the crawl in progress
+    next_offset = models.PositiveIntegerField(default=0)
+    crawl_job_ids = models.JSONField(default=list)
+    # Pre-filtered card IDs of the last finished crawl, in listing order,
+    # and the job_limit it was run for
+    job_ids = models.JSONField(default=list)
+    results_limit = models.PositiveIntegerField(default=0)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['keywords', 'location'], name='unique_hot_search'),
+        ]
+
+    def __str__(self):
+        return f"{self.keywords} in {self.location}"
+
+
+class SavedSearch(models.Model):
+    """A search re-run on demand that only reports what changed since last time."""
+
+    keywords = models.CharField(max_length=255)
+    location = models.CharField(max_length=255)
+    job_limit = models.PositiveIntegerField(
+        default=100, validators=[MinValueValidator(1), MaxValueValidator(3000)]
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_crawled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.keywords} in {self.location}"
+
+
+class SavedSearchJob(models.Model):
+    """A job ID a SavedSearch has already seen in its listing pages."""
+
+    search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='seen_jobs')
+    job_id = models.CharField(max_length=32)
+    # Whether the job matched the search and was reported as added
+    matched = models.BooleanField(default=False)
+    first_seen = models.DateTimeField()
+    last_seen = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['search', 'job_id'], name='unique_saved_search_job'),
+        ]
@@ -0,0 +1,94 @@
+import logging
+import threading
+
+from django.conf import settings
+
+from .fieldstats import record_field_sources
+
+logger = logging.getLogger(__name__)
+
+THREAD = 'thread'
+PROCESS = 'process'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _parse_page(page):
+    # lxml and the compiled XPath queries load with the first page, not at startup
+    from .parsers import parse_job_details
+
+    job_id, content = page
+    sources = {}
+    return parse_job_details(content, job_id, sources), sources
+
+
+def _recorded(parsed):
+    # Field outcomes are counted here, in the calling process, so process
+    # mode's workers need no shared state
+    job, sources = parsed
+    record_field_sources(sources)
+    return job
+
+
+def get_parse_executor():
+    """Return the process pool for parsing, or None when parsing runs in the calling thread."""
+    global _executor
+    if settings.LINKEDIN_PARSE_MODE != PROCESS:
+        return None
+    if _executor is None:
+        # Process pools are opt-in, so thread mode never loads multiprocessing
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        with _executor_lock:
+            if _executor is None:
+                # Forking a process that runs threads can copy held locks;
+                # spawned workers only import the Django-free parsers module
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.LINKEDIN_PARSE_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+    return _executor
+
+
+def _discard_broken_pool(executor):
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    logger.warning("Parse worker pool broke; parsing in-process until it is recreated")
+
+
+def parse_page(content, job_id):
+    """Parse one posting page with the configured parse mode.
+
+    In process mode only the raw bytes go to the worker and only the
+    extracted JobRecord comes back; the lxml tree never crosses processes.
+    """
+    executor = get_parse_executor()
+    if executor is not None:
+        from concurrent.futures.process import BrokenProcessPool
+        try:
+            return _recorded(executor.submit(_parse_page, (job_id, content)).result())
+        except BrokenProcessPool:
+            _discard_broken_pool(executor)
+    return _recorded(_parse_page((job_id, content)))
+
+
+def parse_pages(pages, chunksize=None):
+    """Parse many (job_id, content) pairs, returning the JobRecords in input order.
+
+    Process mode ships the pages to the workers in chunks, so the
+    per-task pickling and IPC cost is paid once per chunk.
+    """
+    pages = list(pages)
+    executor = get_parse_executor()
+    if executor is not None:
+        from concurrent.futures.process import BrokenProcessPool
+        try:
+            chunksize = chunksize or settings.LINKEDIN_PARSE_CHUNK_SIZE
+            return [_recorded(parsed) for parsed in executor.map(_parse_page, pages, chunksize=chunksize)]
+        except BrokenProcessPool:
+            _discard_broken_pool(executor)
+    return [_recorded(_parse_page(page)) for page in pages]
@@ -0,0 +1,294 @@
+import logging
+import threading
+
+from lxml import etree
+
+from .records import JobRecord, intern_value
+from .salary import find_salary, normalize_salary
+from .skills import get_skill_matcher
+
+logger = logging.getLogger(__name__)
+
+
+def _has_class(name):
+    """XPath predicate matching an element whose class list contains `name`."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Every node the primary detail selectors need, gathered by one compiled query in document order
+_DETAIL_CLASSES = {
+    'div': ['top-card-layout__card', 'top-card-layout__entity-info', 'show-more-less-html__markup'],
+    'span': ['topcard__flavor--bullet', 'posted-time-ago__text', 'num-applicants__caption', 'compensation__salary'],
+    'ul': ['description__job-criteria-list'],
+    'section': ['skills-section'],
+}
+_DETAIL_NODES = etree.XPath(' | '.join(
+    f"//{tag}[{' or '.join(_has_class(name) for name in names)}]"
+    for tag, names in _DETAIL_CLASSES.items()
+))
+_JOB_CARDS = etree.XPath(f"//li//div[{_has_class('base-card')}][@data-entity-urn]")
+_CARD_TITLE = etree.XPath(f"(.//h3[{_has_class('base-search-card__title')}])[1]")
+_CARD_COMPANY = etree.XPath(f"(.//h4[{_has_class('base-search-card__subtitle')}])[1]")
+_CARD_LOCATION = etree.XPath(f"(.//span[{_has_class('job-search-card__location')}])[1]")
+_CARD_DATE = etree.XPath("(.//time)[1]")
+_FIRST_LINK = etree.XPath('(.//a)[1]')
+_FIRST_IMG = etree.XPath('(.//img)[1]')
+_CRITERIA = etree.XPath('.//li')
+_FIRST_H3 = etree.XPath('(.//h3)[1]')
+_FIRST_SPAN = etree.XPath('(.//span)[1]')
+_SKILL_ITEMS = etree.XPath(f".//li[{_has_class('job-details-skill-match-status-list__skill')}]")
+_SKILL_NAME = etree.XPath(f"(.//span[{_has_class('job-details-skill-match-status-list__skill-name')}])[1]")
+
+# Fallback selectors, only run when the ones before them find nothing
+_ORG_NAME_LINK = etree.XPath(f"(//a[{_has_class('topcard__org-name-link')}])[1]")
+_TITLE_HEADING = etree.XPath(f"(//*[self::h1 or self::h2][{_has_class('top-card-layout__title')}])[1]")
+_TITLE_HEADING_LINK = etree.XPath(f"(//a[.//*[{_has_class('top-card-layout__title')}]])[1]")
+_FLAVOR_TEXT = etree.XPath(f"(//span[{_has_class('topcard__flavor')}][not(.//a)])[1]")
+_POSTED_NEW = etree.XPath(f"(//span[{_has_class('posted-time-ago__text--new')}])[1]")
+_DESCRIPTION_TEXT = etree.XPath(f"(//div[{_has_class('description__text')}])[1]")
+_APPLICANTS_FIGCAPTION = etree.XPath(f"(//figcaption[{_has_class('num-applicants__caption')}])[1]")
+_CRITERIA_ITEMS = etree.XPath(f"//li[{_has_class('description__job-criteria-item')}]")
+
+# lxml parsers must not be shared between threads
+_local = threading.local()
+
+
+def _parse_html(content):
+    parser = getattr(_local, 'parser', None)
+    if parser is None:
+        parser = _local.parser = etree.HTMLParser(encoding='utf-8', remove_comments=True)
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return etree.fromstring(content, parser)
+
+
+def _text(element):
+    return ''.join(element.itertext()).strip()
+
+
+def _class_names(element):
+    return (element.get('class') or '').split()
+
+
+def _first_text(xpath, element):
+    found = xpath(element)
+    return (_text(found[0]) or None) if found else None
+
+
+def parse_job_cards(content):
+    """Extract the summary cards (ID, title, company, location, listed date) from one listing page."""
+    root = _parse_html(content)
+    if root is None:
+        return []
+    cards = []
+    for card in _JOB_CARDS(root):
+        parts = card.get('data-entity-urn').split(':')
+        if len(parts) <= 3:
+            continue
+        listed = _CARD_DATE(card)
+        cards.append({
+            'job_id': parts[3],
+            'job_title': _first_text(_CARD_TITLE, card),
+            'company': _first_text(_CARD_COMPANY, card),
+            'location': _first_text(_CARD_LOCATION, card),
+            'listed_date': (listed[0].get('datetime') or _text(listed[0])) if listed else None,
+        })
+    return cards
+
+
+class _PostingPage:
+    """A parsed posting page and the lookups its field selectors share."""
+
+    def __init__(self, root, job):
+        self.root = root
+        self.job = job
+        self._criteria = {}
+        # Only the first node of each class counts, mirroring BeautifulSoup.find
+        self.nodes = {}
+        if root is not None:
+            for element in _DETAIL_NODES(root):
+                wanted = _DETAIL_CLASSES[element.tag]
+                for name in _class_names(element):
+                    if name in wanted:
+                        self.nodes.setdefault(name, element)
+
+    def first(self, xpath):
+        found = xpath(self.root) if self.root is not None else ()
+        return found[0] if found else None
+
+    def criteria(self, source):
+        """{field: value} from the criteria list items, parsed once per source."""
+        if source not in self._criteria:
+            if source == 'criteria_list':
+                criteria_list = self.nodes.get('description__job-criteria-list')
+                items = _CRITERIA(criteria_list) if criteria_list is not None else ()
+            else:
+                items = _CRITERIA_ITEMS(self.root) if self.root is not None else ()
+            values = {}
+            for item in items:
+                header = _FIRST_H3(item)
+                value = _FIRST_SPAN(item)
+                if header and value:
+                    header_text = _text(header[0]).lower()
+                    for field, label in _CRITERIA_LABELS:
+                        if label in header_text:
+                            values.setdefault(field, _text(value[0]))
+                            break
+            self._criteria[source] = values
+        return self._criteria[source]
+
+
+_CRITERIA_LABELS = (
+    ('level', 'seniority'), ('employment_type', 'employment type'),
+    ('industry', 'industry'), ('job_function', 'job function'),
+)
+
+
+def _node_text(name):
+    def extract(page):
+        element = page.nodes.get(name)
+        return _text(element) if element is not None else None
+    return extract
+
+
+def _xpath_text(xpath):
+    def extract(page):
+        element = page.first(xpath)
+        return _text(element) if element is not None else None
+    return extract
+
+
+def _xpath_href(xpath):
+    def extract(page):
+        element = page.first(xpath)
+        return (element.get('href') or '').strip() if element is not None else None
+    return extract
+
+
+def _first_link(name):
+    """First <a> inside the first node of class `name`."""
+    def find(page):
+        element = page.nodes.get(name)
+        links = _FIRST_LINK(element) if element is not None else ()
+        return links[0] if links else None
+    return find
+
+
+_company_link = _first_link('top-card-layout__card')
+_title_link = _first_link('top-card-layout__entity-info')
+
+
+def _company_logo_alt(page):
+    link = _company_link(page)
+    images = _FIRST_IMG(link) if link is not None else ()
+    return (images[0].get('alt') or '').strip() if images else None
+
+
+def _href(find):
+    def extract(page):
+        link = find(page)
+        return (link.get('href') or '').strip() if link is not None else None
+    return extract
+
+
+def _link_text(find):
+    def extract(page):
+        link = find(page)
+        return _text(link) if link is not None else None
+    return extract
+
+
+def _criterion(field, source):
+    return lambda page: page.criteria(source).get(field)
+
+
+def _salary_in_description(page):
+    match = find_salary(page.job.job_description)
+    return match.group(0).strip() if match else None
+
+
+def _skills_section(page):
+    section = page.nodes.get('skills-section')
+    if section is None:
+        return None
+    return [_text(name[0]) for name in map(_SKILL_NAME, _SKILL_ITEMS(section)) if name]
+
+
+def _skills_in_description(page):
+    description = page.job.job_description
+    return get_skill_matcher().find(description) if description else None
+
+
+def _criteria_selectors(field):
+    return (('criteria_list', _criterion(field, 'criteria_list')),
+            ('criteria_items', _criterion(field, 'criteria_items')))
+
+
+# Ordered fallback selectors per JobRecord field: the first one that finds a
+# non-empty value wins. When LinkedIn changes its markup, add the new
+# selector at the front and keep the old ones behind it. Fields are
+# extracted in this order, so salary and skills can read the description
+FIELD_SELECTORS = {
+    'company': (('logo_alt', _company_logo_alt),
+                ('org_name_link', _xpath_text(_ORG_NAME_LINK))),
+    'company_url': (('logo_link', _href(_company_link)),
+                    ('org_name_link', _xpath_href(_ORG_NAME_LINK))),
+    'job_title': (('entity_info_link', _link_text(_title_link)),
+                  ('title_heading', _xpath_text(_TITLE_HEADING))),
+    'job_url': (('entity_info_link', _href(_title_link)),
+                ('title_heading_link', _xpath_href(_TITLE_HEADING_LINK))),
+    'location': (('flavor_bullet', _node_text('topcard__flavor--bullet')),
+                 ('flavor_text', _xpath_text(_FLAVOR_TEXT))),
+    'posted_date': (('posted_time_ago', _node_text('posted-time-ago__text')),
+                    ('posted_time_ago_new', _xpath_text(_POSTED_NEW))),
+    'job_description': (('show_more_markup', _node_text('show-more-less-html__markup')),
+                        ('description_text', _xpath_text(_DESCRIPTION_TEXT))),
+    'applicant_count': (('caption_span', _node_text('num-applicants__caption')),
+                        ('caption_figure', _xpath_text(_APPLICANTS_FIGCAPTION))),
+    'level': _criteria_selectors('level'),
+    'employment_type': _criteria_selectors('employment_type'),
+    'industry': _criteria_selectors('industry'),
+    'job_function': _criteria_selectors('job_function'),
+    'salary': (('compensation', _node_text('compensation__salary')),
+               ('description_pattern', _salary_in_description)),
+    'skills': (('skills_section', _skills_section),
+               ('description_matcher', _skills_in_description)),
+}
+
+# Outcomes recorded for a field no selector matched
+MISSING = 'missing'
+ERROR = 'error'
+
+
+def parse_job_details(content, job_id=None, sources=None):
+    """Extract all fields of a job posting page (bytes or str) with FIELD_SELECTORS.
+
+    A selector that raises only costs its own field. When `sources` is a
+    dict, it receives {field: name of the matching selector, MISSING or
+    ERROR} for jobApp.fieldstats.
+    """
+    job = JobRecord(job_id)
+    page = _PostingPage(_parse_html(content), job)
+
+    for field, selectors in FIELD_SELECTORS.items():
+        outcome = MISSING
+        for name, extract in selectors:
+            try:
+                value = extract(page)
+            except Exception:
+                logger.warning("Selector %s for %s failed on job %s", name, field, job_id, exc_info=True)
+                outcome = ERROR
+                continue
+            if value:
+                setattr(job, field, intern_value(value) if field in JobRecord.CATEGORICAL_FIELDS else value)
+                outcome = name
+                break
+        if sources is not None:
+            sources[field] = outcome
+
+    salary_match = find_salary(job.salary) if job.salary else None
+    if salary_match:
+        for key, value in normalize_salary(salary_match).items():
+            setattr(job, key, intern_value(value))
+
+    return job
@@ -0,0 +1,206 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from .metrics import LIMITER_BACKOFFS, LIMITER_CONCURRENCY, LIMITER_RATE
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class _LocalState:
+    """Pacing state shared by the threads of this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = {}
+
+    @contextmanager
+    def locked(self):
+        with self._lock:
+            yield self._state
+
+
+class _FileState:
+    """Pacing state kept in a JSON file, shared by every process that opens it.
+
+    Each update holds an exclusive flock on the file, so gunicorn workers on
+    one host pace against a single budget.
+    """
+
+    def __init__(self, path):
+        if fcntl is None:
+            raise RuntimeError("A shared rate limit state file needs fcntl (Unix only)")
+        self.path = path
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def locked(self):
+        # flock does not exclude threads sharing a process, hence the thread lock
+        with self._lock, open(self.path, 'a+', encoding='utf-8') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or '{}')
+                except ValueError:
+                    state = {}
+                yield state
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class _Outcome:
+    throttled = False
+    failed = False
+
+
+class AdaptiveRateLimiter:
+    """Token-bucket pacing per endpoint class, with AIMD rate and concurrency control.
+
+    Every clean response below `latency_target` adds `increase / rate`
+    requests per second, so the rate grows by about `increase` each second.
+    It also widens the concurrency window by 1/window. A 429 or 999 response,
+    a failed request, an empty listing page or a slow response multiplies
+    both by `decrease`.
+    Cuts happen at most once per `cooldown` seconds, so a burst of bad
+    responses counts as one signal.
+
+    The rate is shared through `state_file` when one is given. The
+    concurrency window is always per process. A rate of 0 disables pacing.
+    """
+
+    def __init__(self, requests_per_second, min_rate, max_rate, burst=1, increase=0.5, decrease=0.5,
+                 latency_target=2.0, max_concurrency=8, cooldown=1.0, state_file=None):
+        self.initial_rate = requests_per_second
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.max_concurrency = max_concurrency
+        self.cooldown = cooldown
+        self._state = _FileState(state_file) if state_file else _LocalState()
+        self._windows = {}  # endpoint -> [concurrency window, requests in flight]
+        self._condition = threading.Condition()
+
+    def _entry(self, state, endpoint):
+        return state.setdefault(endpoint, {'rate': self.initial_rate, 'next_slot': 0.0, 'last_cut': 0.0})
+
+    def _window(self, endpoint):
+        return self._windows.setdefault(endpoint, [float(self.max_concurrency), 0])
+
+    def acquire(self, endpoint):
+        """Block until a request to `endpoint` may start; pair with release()."""
+        if not self.initial_rate:
+            return
+        with self._condition:
+            window = self._window(endpoint)
+            while window[1] >= max(1, int(window[0])):
+                self._condition.wait()
+            window[1] += 1
+
+        with self._state.locked() as state:
+            entry = self._entry(state, endpoint)
+            interval = 1.0 / entry['rate']
+            # Idle time banks up to `burst` requests that may go out back to back
+            slot = max(entry['next_slot'], time.time() - (self.burst - 1) * interval)
+            entry['next_slot'] = slot + interval
+        delay = slot - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    @contextmanager
+    def slot(self, endpoint):
+        """Hold a request slot for the duration of the block.
+
+        Set `throttled` on the yielded object when the response asks us to slow
+        down and `failed` when the request failed; an exception leaving the
+        block counts as a failure. The time spent in the block is judged
+        against the latency target.
+        """
+        self.acquire(endpoint)
+        outcome = _Outcome()
+        started = time.monotonic()
+        try:
+            yield outcome
+        except BaseException:
+            outcome.failed = True
+            raise
+        finally:
+            self.release(endpoint, time.monotonic() - started, outcome.throttled, outcome.failed)
+
+    def release(self, endpoint, latency, throttled=False, failed=False):
+        """Report how a request started by acquire() went; only clean responses grow the rate."""
+        if not self.initial_rate:
+            return
+        with self._condition:
+            self._window(endpoint)[1] -= 1
+            self._condition.notify_all()
+        if throttled:
+            self.backoff(endpoint, 'throttled')
+        elif failed:
+            self.backoff(endpoint, 'error')
+        elif latency > self.latency_target:
+            self.backoff(endpoint, 'slow')
+        else:
+            self._grow(endpoint)
+
+    def backoff(self, endpoint, signal):
+        """Cut the rate and concurrency of `endpoint` after a throttling signal."""
+        if not self.initial_rate:
+            return
+        with self._state.locked() as state:
+            entry = self._entry(state, endpoint)
+            now = time.time()
+            if now - entry['last_cut'] < self.cooldown:
+                return
+            entry['last_cut'] = now
+            entry['rate'] = max(self.min_rate, entry['rate'] * self.decrease)
+            rate = entry['rate']
+        with self._condition:
+            window = self._window(endpoint)
+            window[0] = max(1.0, window[0] * self.decrease)
+            concurrency = window[0]
+        LIMITER_BACKOFFS.inc(endpoint, signal)
+        self._publish(endpoint, rate, concurrency)
+
+    def _grow(self, endpoint):
+        with self._state.locked() as state:
+            entry = self._entry(state, endpoint)
+            entry['rate'] = min(self.max_rate, entry['rate'] + self.increase / entry['rate'])
+            rate = entry['rate']
+        with self._condition:
+            window = self._window(endpoint)
+            window[0] = min(float(self.max_concurrency), window[0] + 1.0 / window[0])
+            concurrency = window[0]
+            self._condition.notify_all()
+        self._publish(endpoint, rate, concurrency)
+
+    def _publish(self, endpoint, rate, concurrency):
+        LIMITER_RATE.set(rate, endpoint)
+        LIMITER_CONCURRENCY.set(int(concurrency), endpoint)
+
+
+# Shared by every worker thread so each endpoint's budget holds process-wide,
+# or host-wide with LINKEDIN_RATE_LIMIT_STATE_FILE
+linkedin_limiter = AdaptiveRateLimiter(
+    settings.LINKEDIN_REQUESTS_PER_SECOND,
+    min_rate=settings.LINKEDIN_MIN_REQUESTS_PER_SECOND,
+    max_rate=settings.LINKEDIN_MAX_REQUESTS_PER_SECOND,
+    burst=settings.LINKEDIN_RATE_BURST,
+    increase=settings.LINKEDIN_RATE_INCREASE,
+    decrease=settings.LINKEDIN_RATE_DECREASE,
+    latency_target=settings.LINKEDIN_LATENCY_TARGET,
+    max_concurrency=settings.LINKEDIN_MAX_WORKERS,
+    state_file=settings.LINKEDIN_RATE_LIMIT_STATE_FILE,
+)
@@ -0,0 +1,148 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+
+class RawResponseStore:
+    """Compressed posting HTML on local disk, content-addressed and indexed by job ID.
+
+    Bodies live once per distinct content under blobs/<sha[:2]>/<sha>.html.gz.
+    Each job ID has a small JSON record under jobs/<id[-2:]>/<id[-4:-2]>/<id>.json
+    with the body's hash, the URL and the ETag/Last-Modified validators it
+    was served with.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _record_path(self, job_id):
+        job_id = str(job_id)
+        # The low digits of LinkedIn IDs are evenly spread, unlike the high ones
+        return self.root / 'jobs' / job_id[-2:] / (job_id[-4:-2] or '_') / f'{job_id}.json'
+
+    def _blob_path(self, digest):
+        return self.root / 'blobs' / digest[:2] / f'{digest}.html.gz'
+
+    def _write_atomic(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def get(self, job_id):
+        """Return the stored record for `job_id`, or None."""
+        try:
+            with open(self._record_path(job_id), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def read(self, record):
+        """Return the decompressed body a record points to, or None if it is gone."""
+        try:
+            with gzip.open(self._blob_path(record['sha256']), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, job_id, content, url=None, etag=None, last_modified=None):
+        """Store a posting body and its validators; returns the new record."""
+        digest = hashlib.sha256(content).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not blob_path.exists():
+            self._write_atomic(blob_path, gzip.compress(content, compresslevel=6, mtime=0))
+        record = {
+            'job_id': str(job_id),
+            'sha256': digest,
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': timezone.now().isoformat(),
+        }
+        self._write_atomic(self._record_path(job_id), json.dumps(record).encode('utf-8'))
+        return record
+
+    def touch(self, job_id, record):
+        """Record that a stored body was revalidated (HTTP 304) just now."""
+        record = dict(record, fetched_at=timezone.now().isoformat())
+        self._write_atomic(self._record_path(job_id), json.dumps(record).encode('utf-8'))
+        return record
+
+    def records(self):
+        """Yield every stored record, in no particular order."""
+        for _, record in self._record_files():
+            yield record
+
+    def _record_files(self):
+        for path in (self.root / 'jobs').glob('*/*/*.json'):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    yield path, json.load(f)
+            except (OSError, ValueError):
+                logger.warning("Skipping unreadable raw store record %s", path)
+
+    def prune(self, max_age):
+        """Delete records not fetched within `max_age` seconds, then the bodies no record uses.
+
+        Returns (records deleted, bodies deleted).
+        """
+        cutoff = timezone.now() - timedelta(seconds=max_age)
+        kept = set()
+        records_deleted = 0
+        for path, record in self._record_files():
+            fetched_at = parse_datetime(record.get('fetched_at') or '')
+            if fetched_at is not None and fetched_at >= cutoff:
+                kept.add(record.get('sha256'))
+                continue
+            path.unlink(missing_ok=True)
+            records_deleted += 1
+
+        blobs_deleted = 0
+        for path in (self.root / 'blobs').glob('*/*.html.gz'):
+            # A body written after the scan above has no record in `kept` yet
+            if path.name[:-len('.html.gz')] not in kept and path.stat().st_mtime < cutoff.timestamp():
+                path.unlink(missing_ok=True)
+                blobs_deleted += 1
+        return records_deleted, blobs_deleted
+
+
+def conditional_headers(headers, record):
+    """Add If-None-Match/If-Modified-Since for a stored response to `headers`."""
+    if not record:
+        return headers
+    headers = dict(headers)
+    if record.get('etag'):
+        headers['If-None-Match'] = record['etag']
+    if record.get('last_modified'):
+        headers['If-Modified-Since'] = record['last_modified']
+    return headers
+
+
+_store = None
+
+
+def get_raw_store():
+    """Return the store under LINKEDIN_RAW_STORE_DIR, or None when it is disabled."""
+    global _store
+    root = settings.LINKEDIN_RAW_STORE_DIR
+    if not root:
+        return None
+    if _store is None or _store.root != Path(root):
+        _store = RawResponseStore(root)
+    return _store
@@ -0,0 +1,98 @@
+import json
+from sys import intern
+
+
+class JobRecord:
+    """One parsed job posting with a fixed set of fields.
+
+    Every record has the same attributes whether or not the page had them,
+    and `__slots__` keeps each one to a few hundred bytes. Categorical
+    fields repeat across thousands of postings, so their strings are
+    interned and shared.
+    """
+
+    FIELDS = (
+        'job_id', 'company', 'company_url', 'job_title', 'job_url', 'location',
+        'posted_date', 'job_description', 'applicant_count', 'level',
+        'employment_type', 'industry', 'job_function', 'salary', 'salary_min',
+        'salary_max', 'salary_currency', 'salary_period', 'skills', 'duplicate_of',
+    )
+    CATEGORICAL_FIELDS = ('level', 'employment_type', 'job_function', 'industry', 'salary_currency', 'salary_period')
+
+    __slots__ = FIELDS
+
+    def __init__(self, job_id=None, company=None, company_url=None, job_title=None, job_url=None,
+                 location=None, posted_date=None, job_description=None, applicant_count=None,
+                 level=None, employment_type=None, industry=None, job_function=None, salary=None,
+                 salary_min=None, salary_max=None, salary_currency=None, salary_period=None, skills=None,
+                 duplicate_of=None):
+        self.job_id = job_id
+        self.company = company
+        self.company_url = company_url
+        self.job_title = job_title
+        self.job_url = job_url
+        self.location = location
+        self.posted_date = posted_date
+        self.job_description = job_description
+        self.applicant_count = applicant_count
+        self.level = intern_value(level)
+        self.employment_type = intern_value(employment_type)
+        self.industry = intern_value(industry)
+        self.job_function = intern_value(job_function)
+        self.salary = salary
+        self.salary_min = salary_min
+        self.salary_max = salary_max
+        self.salary_currency = intern_value(salary_currency)
+        self.salary_period = intern_value(salary_period)
+        self.skills = skills if skills is not None else []
+        # Job ID of an earlier posting with a near-identical description (jobApp.dedup)
+        self.duplicate_of = duplicate_of
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a job dict, ignoring keys outside the schema."""
+        return cls(**{field: data[field] for field in cls.FIELDS if field in data})
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def copy(self, **changes):
+        """Return a new record with the same values, except for `changes`."""
+        record = JobRecord.__new__(JobRecord)
+        for field in self.FIELDS:
+            setattr(record, field, changes[field] if field in changes else getattr(self, field))
+        return record
+
+    def to_row(self):
+        """Values in FIELDS order, flattened for tabular formats (skills joined)."""
+        return [flatten_value(getattr(self, field)) for field in self.FIELDS]
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    def __eq__(self, other):
+        if not isinstance(other, JobRecord):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.FIELDS)
+
+    def __repr__(self):
+        return f"<JobRecord {self.job_id}: {self.job_title!r} at {self.company!r}>"
+
+
+SKILLS_SEPARATOR = '; '
+
+
+def intern_value(value):
+    return intern(value) if isinstance(value, str) else value
+
+
+def flatten_value(value):
+    """Render one cell for tabular formats; lists such as skills become one string."""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return SKILLS_SEPARATOR.join(str(item) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return str(value)
+
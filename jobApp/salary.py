@@ -0,0 +1,97 @@
+import re
+import threading
+
+CURRENCY_SYMBOLS = {
+    '$': 'USD', 'us$': 'USD', 'ca$': 'CAD', 'c$': 'CAD', 'a$': 'AUD', 'au$': 'AUD',
+    '€': 'EUR', '£': 'GBP', '₹': 'INR', '¥': 'JPY',
+}
+CURRENCY_CODES = ['USD', 'EUR', 'GBP', 'INR', 'CAD', 'AUD', 'CHF', 'JPY', 'SGD', 'NZD', 'SEK', 'NOK', 'DKK', 'PLN']
+
+PERIODS = {
+    'yr': 'year', 'year': 'year', 'annum': 'year', 'annually': 'year', 'yearly': 'year', 'annual': 'year',
+    'mo': 'month', 'month': 'month', 'monthly': 'month',
+    'wk': 'week', 'week': 'week', 'weekly': 'week',
+    'day': 'day', 'daily': 'day',
+    'hr': 'hour', 'hour': 'hour', 'hourly': 'hour',
+}
+
+MULTIPLIERS = {'k': 1000, 'm': 1000000, 'million': 1000000}
+
+_CURRENCY = (
+    r'(?:(?:us|ca|au|c|a)?\$|[€£₹¥]|\b(?:' + '|'.join(CURRENCY_CODES) + r')\b\s?)'
+)
+# Thousands separators also cover Indian lakh grouping (12,00,000)
+_AMOUNT = r'(\d{1,3}(?:,\d{2,3})+(?:\.\d+)?|\d+(?:\.\d+)?)(?:\s?(k|m|million)\b)?'
+_PERIOD = (
+    r'(?:\s*(?:/|per\s+|an?\s+)(yr|year|annum|mo|month|wk|week|day|hr|hour)\b'
+    r'|\s+(annually|yearly|annual|monthly|weekly|daily|hourly)\b)?'
+)
+
+_pattern = None
+_pattern_lock = threading.Lock()
+
+
+def get_salary_pattern():
+    """Return the salary regex, compiling it on first use.
+
+    The case-insensitive Unicode pattern takes tens of milliseconds to
+    compile, which would otherwise land on every cold start.
+    """
+    global _pattern
+    if _pattern is None:
+        with _pattern_lock:
+            if _pattern is None:
+                # currency amount [period] [- [currency] amount [period]]
+                _pattern = re.compile(
+                    r'(' + _CURRENCY + r')\s?' + _AMOUNT + _PERIOD
+                    + r'(?:\s*(?:-|–|—|to)\s*' + _CURRENCY + r'?\s?' + _AMOUNT + _PERIOD + r')?',
+                    re.IGNORECASE,
+                )
+    return _pattern
+
+
+def _amount(number, suffix):
+    value = float(number.replace(',', ''))
+    return value * MULTIPLIERS[suffix.lower()] if suffix else value
+
+
+# Cheap scan for where a salary could start; most descriptions have none
+_CURRENCY_SYMBOL = re.compile(r'[$€£₹¥]')
+
+
+def find_salary(text):
+    """Return the first salary mention in `text` as a match object, or None."""
+    if not text:
+        return None
+    symbol = _CURRENCY_SYMBOL.search(text)
+    start = symbol.start() if symbol else len(text)
+    for code in CURRENCY_CODES:
+        position = text.find(code, 0, start)
+        if position != -1:
+            start = position
+    if start == len(text):
+        return None
+    # Step back over prefixes such as "CA$" before running the full pattern
+    return get_salary_pattern().search(text, max(0, start - 2))
+
+
+def normalize_salary(match):
+    """Turn a find_salary match into numeric min/max plus currency and period codes."""
+    symbol, low, low_suffix, period_a, period_b, high, high_suffix, period_c, period_d = match.groups()
+    symbol = symbol.strip().lower()
+    currency = CURRENCY_SYMBOLS.get(symbol, symbol.upper())
+    period = period_a or period_b or period_c or period_d
+    salary_min = _amount(low, low_suffix)
+    salary_max = _amount(high, high_suffix) if high else salary_min
+    return {
+        'salary_min': min(salary_min, salary_max),
+        'salary_max': max(salary_min, salary_max),
+        'salary_currency': currency,
+        'salary_period': PERIODS[period.lower()] if period else None,
+    }
+
+
+def parse_salary(text):
+    """Normalize the first salary range in `text`; None when there is none."""
+    match = find_salary(text)
+    return normalize_salary(match) if match else None
@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import SavedSearchJob
+from .scraper import (
+    DEFAULT_HEADERS, RESULTS_CEILING, SearchProgress, create_linkedin_url, fetch_job_details,
+    iter_job_card_pages, job_matches, matching_card_filter,
+)
+
+FULL = 'full'
+DELTA = 'delta'
+REFRESH_MODES = (FULL, DELTA)
+
+
+def crawl_new_cards(search, known_ids, mode, headers, progress):
+    """Page through the newest-first listing and collect unseen cards.
+
+    Returns (seen_ids, candidate_ids): every ID on the crawled pages and the
+    new ones that passed the card pre-filter. `job_limit` counts filtered
+    cards, known or new, as a normal search does. A delta crawl also stops
+    at the first page holding nothing but known IDs, since everything past
+    it was posted earlier and has been seen already.
+    """
+    base_url = create_linkedin_url(search.keywords, search.location, recent_first=True)
+    card_filter = matching_card_filter(search.keywords, search.location)
+    seen_ids = []
+    candidate_ids = []
+    filtered = 0
+    for cards in iter_job_card_pages(base_url, headers, RESULTS_CEILING, progress):
+        for card in cards:
+            seen_ids.append(card['job_id'])
+            if not card_filter(card):
+                continue
+            filtered += 1
+            if card['job_id'] not in known_ids:
+                candidate_ids.append(card['job_id'])
+            if filtered >= search.job_limit:
+                return seen_ids, candidate_ids
+        if mode == DELTA and all(card['job_id'] in known_ids for card in cards):
+            break
+    return seen_ids, candidate_ids
+
+
+def refresh_saved_search(search, mode=None, headers=DEFAULT_HEADERS):
+    """Re-run a SavedSearch and return the jobs added and removed since last time.
+
+    The first refresh of a search is always a full crawl. Later ones default
+    to delta mode, which fetches details only for postings it has not seen.
+    A full crawl reports every previously matched job missing from the
+    crawled window as removed. A delta crawl cannot tell, so it removes jobs
+    not seen for LINKEDIN_SAVED_SEARCH_EXPIRY seconds instead.
+
+    Raises LinkedInFetchError if a listing page cannot be fetched; the saved
+    state is left untouched in that case.
+    """
+    if mode is None or search.last_crawled_at is None:
+        mode = DELTA if search.last_crawled_at else FULL
+    now = timezone.now()
+    progress = SearchProgress()
+    known = dict(search.seen_jobs.values_list('job_id', 'matched'))
+
+    seen_ids, candidate_ids = crawl_new_cards(search, known, mode, headers, progress)
+    details = fetch_job_details(candidate_ids, headers)
+    added = [
+        job_data for job_data in details
+        if job_matches(job_data, search.keywords, search.location)
+    ]
+    added_ids = {job.job_id for job in added}
+    # Postings whose details failed to load stay unknown so the next refresh retries them
+    failed_ids = {job_id for job_id, job_data in zip(candidate_ids, details) if job_data is None}
+
+    stale = search.seen_jobs.all()
+    if mode == FULL:
+        stale = stale.exclude(job_id__in=seen_ids)
+    else:
+        cutoff = now - timedelta(seconds=settings.LINKEDIN_SAVED_SEARCH_EXPIRY)
+        stale = stale.filter(last_seen__lt=cutoff).exclude(job_id__in=seen_ids)
+
+    with transaction.atomic():
+        removed = list(stale.filter(matched=True).values_list('job_id', flat=True))
+        stale.delete()
+        SavedSearchJob.objects.bulk_create(
+            [
+                SavedSearchJob(
+                    search=search, job_id=job_id, first_seen=now, last_seen=now,
+                    matched=known.get(job_id, job_id in added_ids),
+                )
+                for job_id in dict.fromkeys(seen_ids) if job_id not in failed_ids
+            ],
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['search', 'job_id'],
+            update_fields=['last_seen'],
+        )
+        search.last_crawled_at = now
+        search.save(update_fields=['last_crawled_at'])
+
+    return {
+        'mode': mode,
+        'pages_fetched': progress.pages_fetched,
+        'details_fetched': len(candidate_ids),
+        'added': added,
+        'removed': removed,
+    }
@@ -0,0 +1,444 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
+from urllib.parse import quote
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+from .client import LinkedInFetchError, fetch
+from .metrics import CACHE_LOOKUPS, PARSE_FAILURES, PHASE_SECONDS
+from .models import JobListing
+from .parsepool import parse_page
+from .ratelimit import linkedin_limiter
+from .rawstore import conditional_headers, get_raw_store
+from .shards import split_shard
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 25
+
+# The guest search API stops returning cards past this offset
+RESULTS_CEILING = 1000
+
+# Statuses the guest search API answers once the offset runs past the result set
+END_OF_RESULTS_STATUSES = {400, 404}
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+class SearchProgress:
+    """Counters updated by a running search so its progress can be reported."""
+
+    def __init__(self):
+        self.pages_fetched = 0
+        self.details_parsed = 0
+        self.matches = 0
+
+def create_linkedin_url(keywords, location, recent_first=False):
+    """Create LinkedIn search URL with encoded parameters.
+
+    `recent_first` sorts by posting date instead of relevance, which lets
+    incremental crawls stop at the first page of already-known jobs.
+    """
+    encoded_keywords = quote(keywords)
+    encoded_location = quote(location)
+    sort = '&sortBy=DD' if recent_first else ''
+    return f'{settings.LINKEDIN_BASE_URL}/jobs-guest/jobs/api/seeMoreJobPostings/search?keywords={encoded_keywords}&location={encoded_location}{sort}&start={{}}'
+
+def iter_job_card_pages(base_url, headers, job_limit=100, progress=None, card_filter=None):
+    """Yield listing cards one page at a time, prefetching the next page.
+
+    With a `card_filter`, only cards it accepts are yielded and counted
+    towards `job_limit`, so the pager keeps going until that many candidates
+    are found or the results run out.
+
+    Raises LinkedInFetchError if a listing page cannot be fetched, rather than
+    ending the search early with silently truncated results.
+    """
+    # Deferred so that starting the app does not load lxml
+    from .parsers import parse_job_cards
+
+    collected = 0
+    page = 0
+    prefetcher = ThreadPoolExecutor(max_workers=1)
+    next_page = prefetcher.submit(fetch, base_url.format(0), headers=headers)
+
+    try:
+        while next_page is not None and collected < job_limit:
+            res = next_page.result()
+            next_page = None
+            if res.status_code in END_OF_RESULTS_STATUSES:
+                break
+            if res.status_code != 200:
+                raise LinkedInFetchError(f"Listing page {page + 1} returned HTTP {res.status_code}")
+
+            # Download the following page while this one is parsed and consumed,
+            # unless this page alone is certain to complete the search
+            if card_filter is not None or collected + PAGE_SIZE < job_limit:
+                next_page = prefetcher.submit(fetch, base_url.format((page + 1) * PAGE_SIZE), headers=headers)
+
+            with PHASE_SECONDS.time('parse'):
+                cards = parse_job_cards(res.content)
+            if not cards:
+                # Past the results the API answers 4xx, so an empty 200 is a soft block
+                linkedin_limiter.backoff('listing', 'empty_page')
+                break
+
+            logger.debug("Found %d jobs on page %d", len(cards), page + 1)
+            if progress is not None:
+                progress.pages_fetched += 1
+            if card_filter is not None:
+                with PHASE_SECONDS.time('filter'):
+                    cards = [card for card in cards if card_filter(card)]
+            cards = cards[:job_limit - collected]
+            collected += len(cards)
+            page += 1
+            yield cards
+    finally:
+        if next_page is not None:
+            next_page.cancel()
+        prefetcher.shutdown(wait=False)
+
+def reached_ceiling(progress):
+    """Whether a query paged as far as the guest API goes, so more results may exist."""
+    return progress.pages_fetched * PAGE_SIZE >= RESULTS_CEILING
+
+_SHARD_DONE = object()
+
+def put_until_stopped(items, item, stop):
+    """Put `item` on the bounded queue `items`, waiting for room until `stop` is set.
+
+    Returns False when the consumer went away first, instead of blocking forever.
+    """
+    while not stop.is_set():
+        try:
+            items.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def iter_shard_pages(shards, headers, job_limit, card_filter=None):
+    """Page through several queries concurrently, yielding card pages as they arrive.
+
+    `shards` is a list of (base_url, splittable) pairs. A splittable query
+    that reaches RESULTS_CEILING is split further with split_shard and its
+    sub-queries are queued too. Pages are not deduplicated here.
+    """
+    pages = queue.Queue(maxsize=settings.LINKEDIN_SHARD_WORKERS * 2)
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=settings.LINKEDIN_SHARD_WORKERS, thread_name_prefix='shard')
+    outstanding_lock = threading.Lock()
+    outstanding = 0
+
+    def submit(base_url, splittable):
+        nonlocal outstanding
+        # Counted before the parent shard reports done, so the total never dips to zero early
+        with outstanding_lock:
+            outstanding += 1
+        executor.submit(crawl, base_url, splittable)
+
+    def crawl(base_url, splittable):
+        shard_progress = SearchProgress()
+        try:
+            with closing(iter_job_card_pages(base_url, headers, job_limit, shard_progress, card_filter)) as shard_pages:
+                for cards in shard_pages:
+                    if not put_until_stopped(pages, cards, stop):
+                        return
+            if splittable and reached_ceiling(shard_progress) and not stop.is_set():
+                for sub_url in split_shard(base_url):
+                    submit(sub_url, True)
+        except Exception as e:
+            put_until_stopped(pages, e, stop)
+        finally:
+            put_until_stopped(pages, _SHARD_DONE, stop)
+
+    for base_url, splittable in shards:
+        submit(base_url, splittable)
+    try:
+        while True:
+            with outstanding_lock:
+                if not outstanding:
+                    break
+            item = pages.get()
+            if item is _SHARD_DONE:
+                with outstanding_lock:
+                    outstanding -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def iter_search_card_pages(base_url, headers, job_limit=100, progress=None, card_filter=None):
+    """Yield listing cards page by page like iter_job_card_pages, without stopping at RESULTS_CEILING.
+
+    The query is paged as usual first. If it reaches the ceiling before
+    `job_limit` cards are found, it is split into facet sub-queries (see
+    jobApp.shards) paged LINKEDIN_SHARD_WORKERS at a time, and those that
+    reach the ceiling as well are split again. A `job_limit` above the
+    ceiling cannot be met by one query, so the sub-queries start right
+    away, next to the plain one. Each job ID is yielded once.
+    """
+    if not settings.LINKEDIN_SHARD_WORKERS:
+        yield from iter_job_card_pages(base_url, headers, job_limit, progress, card_filter)
+        return
+
+    seen = set()
+    collected = 0
+
+    def take(cards):
+        nonlocal collected
+        fresh = []
+        for card in cards:
+            if card['job_id'] not in seen:
+                seen.add(card['job_id'])
+                fresh.append(card)
+        fresh = fresh[:job_limit - collected]
+        collected += len(fresh)
+        if progress is not None:
+            progress.pages_fetched += 1
+        return fresh
+
+    if job_limit > RESULTS_CEILING:
+        shards = [(base_url, False)] + [(sub_url, True) for sub_url in split_shard(base_url)]
+    else:
+        # Most searches end within the plain query; page it here without extra threads
+        query_progress = SearchProgress()
+        with closing(iter_job_card_pages(base_url, headers, job_limit, query_progress, card_filter)) as pages:
+            for cards in pages:
+                yield take(cards)
+                if collected >= job_limit:
+                    return
+        if not reached_ceiling(query_progress):
+            return
+        shards = [(sub_url, True) for sub_url in split_shard(base_url)]
+    if not shards:
+        return
+
+    logger.info("Search reached %d results; crawling %d sub-queries", RESULTS_CEILING, len(shards))
+    with closing(iter_shard_pages(shards, headers, job_limit, card_filter)) as pages:
+        for cards in pages:
+            yield take(cards)
+            if collected >= job_limit:
+                return
+
+def get_job_ids(base_url, headers, job_limit=100, card_filter=None):
+    """Collect the listing cards (ID, title, company, location, listed date) from search results."""
+    cards = []
+    for page_cards in iter_search_card_pages(base_url, headers, job_limit, card_filter=card_filter):
+        cards.extend(page_cards)
+    return cards[:job_limit]
+
+def get_job_details(job_id, headers, on_attempt=None):
+    """Extract all available details for a single job posting.
+
+    With the raw response store enabled, the request is made conditional on
+    the stored copy, a 304 is answered from it, and new bodies are stored.
+    `on_attempt` is passed on to every fetch.
+    """
+    job_url = f'{settings.LINKEDIN_BASE_URL}/jobs-guest/jobs/api/jobPosting/{job_id}'
+    raw_store = get_raw_store()
+    record = raw_store.get(job_id) if raw_store else None
+    
+    try:
+        resp = fetch(job_url, headers=conditional_headers(headers, record), on_attempt=on_attempt)
+        content = None
+        if resp.status_code == 304 and record:
+            content = raw_store.read(record)
+            if content is None:
+                # The stored body went missing; fetch it again unconditionally
+                resp = fetch(job_url, headers=headers, on_attempt=on_attempt)
+            else:
+                save_raw_response(raw_store, job_id, record=record)
+        if resp.status_code == 200:
+            content = resp.content
+            if raw_store:
+                save_raw_response(
+                    raw_store, job_id, content=content, url=job_url,
+                    etag=resp.headers.get('ETag'), last_modified=resp.headers.get('Last-Modified'),
+                )
+        elif content is None:
+            PARSE_FAILURES.inc('http_status')
+            logger.warning("Job ID %s returned HTTP %s", job_id, resp.status_code)
+            return None
+        # Parse the raw bytes; lxml decodes while building the tree
+        with PHASE_SECONDS.time('parse'):
+            return parse_page(content, job_id)
+    except LinkedInFetchError as e:
+        PARSE_FAILURES.inc('fetch_error')
+        logger.warning("Error fetching job ID %s: %s", job_id, e)
+        return None
+    except Exception:
+        # A failing field selector only loses its own field inside the
+        # parser, so this is left for unexpected errors around it
+        PARSE_FAILURES.inc('parse_error')
+        logger.exception("Error processing job ID %s", job_id)
+        return None
+
+def save_raw_response(raw_store, job_id, content=None, record=None, **metadata):
+    """Store a fetched body (or mark a stored one revalidated); disk errors only cost the copy."""
+    try:
+        if record is not None:
+            raw_store.touch(job_id, record)
+        else:
+            raw_store.put(job_id, content, **metadata)
+    except OSError as e:
+        logger.warning("Raw response store write failed for job ID %s: %s", job_id, e)
+
+def fetch_job_details(job_ids, headers, max_workers=None):
+    """Fetch details for many jobs concurrently, returning them in input order.
+
+    Jobs in the JobListing cache are not fetched again, and fetched ones are
+    added to it.
+    """
+    cached = load_cached_details(job_ids)
+    missing = [job_id for job_id in job_ids if job_id not in cached]
+    if max_workers is None:
+        max_workers = settings.LINKEDIN_MAX_WORKERS
+    max_workers = max(1, min(max_workers, len(missing) or 1))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # executor.map preserves the order of job_ids regardless of completion order
+        fetched = dict(zip(missing, executor.map(lambda job_id: get_job_details(job_id, headers), missing)))
+    store_job_details([job_data for job_data in fetched.values() if job_data])
+    return [cached[job_id] if job_id in cached else fetched[job_id] for job_id in job_ids]
+
+def load_cached_details(job_ids):
+    """Look up fresh cached details, treating an unavailable database as a miss."""
+    try:
+        cached = JobListing.cached_details(job_ids)
+    except DatabaseError as e:
+        logger.warning("Job cache lookup failed: %s", e)
+        cached = {}
+    CACHE_LOOKUPS.inc('job_listing', 'hit', amount=len(cached))
+    CACHE_LOOKUPS.inc('job_listing', 'miss', amount=len(job_ids) - len(cached))
+    return cached
+
+def store_job_details(jobs):
+    """Write fetched details to the cache; failures only cost future cache hits."""
+    try:
+        JobListing.store_details(jobs)
+    except DatabaseError as e:
+        logger.warning("Job cache write failed: %s", e)
+
+_PIPELINE_DONE = object()
+
+def search_job_details(base_url, headers, job_limit=100, max_workers=None, progress=None, card_filter=None):
+    """Fetch job details while the listing pager is still running.
+
+    A producer thread pages through the search results and submits every ID
+    to the detail workers as soon as its page is parsed. Cards rejected by
+    `card_filter` are dropped before any detail request is made. IDs found in the
+    JobListing cache skip the network entirely. The bounded queue of pending
+    futures applies backpressure to the pager, and results are yielded in
+    listing order.
+    """
+    if max_workers is None:
+        max_workers = settings.LINKEDIN_MAX_WORKERS
+    pending = queue.Queue(maxsize=settings.LINKEDIN_PIPELINE_DEPTH)
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def produce():
+        try:
+            for cards in iter_search_card_pages(base_url, headers, job_limit, progress, card_filter):
+                page_ids = [card['job_id'] for card in cards]
+                cached = load_cached_details(page_ids)
+                for job_id in page_ids:
+                    if stop.is_set():
+                        return
+                    if job_id in cached:
+                        future = Future()
+                        future.set_result(cached[job_id])
+                        item = (future, True)
+                    else:
+                        item = (executor.submit(get_job_details, job_id, headers), False)
+                    if not put_until_stopped(pending, item, stop):
+                        return
+        except Exception as e:
+            put_until_stopped(pending, e, stop)
+        finally:
+            # The cache lookups opened a connection owned by this thread
+            connections.close_all()
+        put_until_stopped(pending, _PIPELINE_DONE, stop)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    fetched = []
+    try:
+        while True:
+            item = pending.get()
+            if item is _PIPELINE_DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            future, from_cache = item
+            job_data = future.result()
+            if job_data and not from_cache:
+                fetched.append(job_data)
+                if len(fetched) >= settings.LINKEDIN_CACHE_WRITE_BATCH:
+                    store_job_details(fetched)
+                    fetched = []
+            yield job_data
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        store_job_details(fetched)
+
+def job_matches(job, keywords, location):
+    """Check whether a JobRecord's title and location match the search terms."""
+    if not (job and job.job_title and job.location):
+        return False
+    return terms_match(job.job_title, job.location, keywords, location)
+
+def terms_match(job_title, job_location, keywords, location):
+    """Check a title and location against the search terms."""
+    # Split keywords and location into words for more flexible matching
+    keyword_terms = set(keywords.lower().split())
+    location_terms = set(location.lower().split())
+    
+    job_title_lower = job_title.lower()
+    job_location_lower = job_location.lower()
+    
+    # Check if any of the keyword terms match in the job title
+    title_matches = any(term in job_title_lower for term in keyword_terms)
+    
+    # Check if any of the location terms match in the job location
+    location_matches = any(term in job_location_lower for term in location_terms)
+    
+    return title_matches and location_matches
+
+def card_may_match(card, keywords, location):
+    """Pre-filter a listing card; cards missing a title or location are kept."""
+    if not (card.get('job_title') and card.get('location')):
+        return True
+    return terms_match(card['job_title'], card['location'], keywords, location)
+
+def matching_card_filter(keywords, location):
+    """Build the card_filter that skips detail fetches for jobs that cannot match."""
+    return lambda card: card_may_match(card, keywords, location)
+
+def iter_matching_jobs(base_url, headers, job_limit, keywords, location):
+    """Yield the jobs that match the search terms as soon as they are fetched.
+
+    `job_limit` counts listing cards that pass the match, not raw IDs.
+    """
+    card_filter = matching_card_filter(keywords, location)
+    jobs = search_job_details(base_url, headers, job_limit, card_filter=card_filter)
+    processed = matched = 0
+    for job_data in jobs:
+        processed += 1
+        with PHASE_SECONDS.time('filter'):
+            is_match = job_matches(job_data, keywords, location)
+        if is_match:
+            matched += 1
+            yield job_data
+    logger.info("Search for %r in %r: %d jobs processed, %d matched", keywords, location, processed, matched)
@@ -0,0 +1,34 @@
+from django.conf import settings
+from rest_framework import serializers
+
+from .models import SavedSearch, SearchTask
+
+
+class SearchTaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SearchTask
+        fields = [
+            'id', 'keywords', 'location', 'job_limit', 'duplicates', 'status',
+            'pages_fetched', 'details_parsed', 'matches', 'error',
+            'attempts', 'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SavedSearch
+        fields = ['id', 'keywords', 'location', 'job_limit', 'created_at', 'last_crawled_at']
+        read_only_fields = ['id', 'created_at', 'last_crawled_at']
+
+
+class BatchQuerySerializer(serializers.Serializer):
+    keywords = serializers.CharField(max_length=255)
+    location = serializers.CharField(max_length=255)
+    job_limit = serializers.IntegerField(min_value=1, max_value=3000, default=100)
+
+
+class BatchSearchSerializer(serializers.Serializer):
+    queries = serializers.ListField(
+        child=BatchQuerySerializer(), min_length=1, max_length=settings.LINKEDIN_BATCH_MAX_QUERIES
+    )
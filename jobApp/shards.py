@@ -0,0 +1,51 @@
+"""Splitting one search into sub-queries that each fit under RESULTS_CEILING.
+
+The guest search API stops returning cards after about 1000 offsets, so a
+large search is re-issued with filters whose values partition its
+results, and each part is paged separately.
+"""
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
+
+from django.conf import settings
+
+# Guest search filters whose values split the results into disjoint sets,
+# in the order they are applied. The posted-date filter (f_TPR) is missing
+# on purpose: it only selects "the last N seconds", so its windows overlap
+SHARD_FACETS = (
+    ('f_E', ('1', '2', '3', '4', '5', '6')),        # internship, entry, associate, mid-senior, director, executive
+    ('f_JT', ('F', 'P', 'C', 'T', 'I', 'V', 'O')),  # full-time, part-time, contract, temporary, internship, volunteer, other
+    ('f_WT', ('1', '2', '3')),                      # on-site, remote, hybrid
+)
+
+
+def _query(base_url):
+    parts = urlsplit(base_url)
+    return parts, [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != 'start']
+
+
+def shard_url(base_url, **params):
+    """Return `base_url` with query parameters replaced or added, keeping its start={} slot last."""
+    parts, query = _query(base_url)
+    query = [(key, value) for key, value in query if key not in params] + list(params.items())
+    return urlunsplit(parts._replace(query=urlencode(query, quote_via=quote) + '&start={}'))
+
+
+def split_shard(base_url):
+    """Return sub-query URLs that together cover `base_url`, or [] when it cannot be split further.
+
+    Each call applies the next facet of SHARD_FACETS the URL does not use
+    yet. Once they are all used, the location is replaced by its entries
+    in LINKEDIN_SHARD_LOCATIONS, which may themselves have entries.
+    """
+    _, query = _query(base_url)
+    used = {key for key, _ in query}
+    for facet, values in SHARD_FACETS:
+        if facet not in used:
+            return [shard_url(base_url, **{facet: value}) for value in values]
+
+    location = dict(query).get('location', '')
+    sub_locations = settings.LINKEDIN_SHARD_LOCATIONS.get(location.lower(), ())
+    return [
+        shard_url(base_url, location=sub_location)
+        for sub_location in sub_locations if sub_location.lower() != location.lower()
+    ]
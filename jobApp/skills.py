@@ -0,0 +1,78 @@
+import json
+import re
+import threading
+from pathlib import Path
+
+DEFAULT_TAXONOMY = Path(__file__).resolve().parent / 'data' / 'skills.json'
+
+# Skill names such as "c++", "c#" and ".net" end or start in symbols, so plain
+# \b does not work; instead a match may not touch a word character or +/#
+_BEFORE = r'(?<![\w+#])'
+_AFTER = r'(?![\w+#])'
+
+
+def _trie_pattern(node):
+    """Render a character trie as a regex that never backtracks across siblings."""
+    end = '' in node
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    if len(branches) == 1 and not end:
+        return branches[0]
+    body = '(?:' + '|'.join(branches) + ')'
+    return body + '?' if end else body
+
+
+def compile_terms(terms):
+    """Compile skill terms into one regex matching the longest term at each position."""
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = True
+    return re.compile(_BEFORE + '(' + _trie_pattern(trie) + ')' + _AFTER)
+
+
+class SkillMatcher:
+    """Finds taxonomy skills in free text with a single regex pass.
+
+    The taxonomy maps each canonical skill name to its lowercase synonyms.
+    Matching is case-insensitive and respects word boundaries, so "java"
+    does not match inside "javascript".
+    """
+
+    def __init__(self, taxonomy):
+        self.canonical = {}
+        for name, synonyms in taxonomy.items():
+            for term in synonyms:
+                self.canonical[term.lower()] = name
+        self.pattern = compile_terms(self.canonical)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_TAXONOMY):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def find(self, text):
+        """Return canonical skill names in order of first mention, without repeats."""
+        if not text:
+            return []
+        found = {}
+        for match in self.pattern.finditer(text.lower()):
+            found.setdefault(self.canonical[match.group(1)], None)
+        return list(found)
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher():
+    """Return the matcher for the bundled taxonomy, compiling it on first use."""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = SkillMatcher.from_file()
+    return _matcher
@@ -0,0 +1,63 @@
+"""Cold-start measurement for the serverless deploy.
+
+A Vercel lambda imports job/wsgi.py on its first request and then routes
+that request, so the time from a fresh interpreter to a resolved
+/search/ is what a user waits for before any LinkedIn work starts.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+
+# Loaded only by the code paths that need them, never at startup
+DEFERRED_MODULES = (
+    'lxml',                        # parsers, on the first scraped page
+    'jobApp.parsers',
+    'concurrent.futures.process',  # parsepool, in 'process' parse mode only
+    'pyarrow',                     # exporters, for Parquet downloads only
+    'numpy',
+)
+
+_STARTUP = """
+import json, sys
+from job.wsgi import application
+from django.urls import resolve
+resolve(sys.argv[1])
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def run_cold_start(path='/search/', importtime=False):
+    """Load the WSGI app and resolve `path` in a fresh interpreter.
+
+    Returns {'seconds', 'modules', 'imports'}: the wall time of the whole
+    process, every module it ended up with, and with `importtime` the
+    rows of `python -X importtime` as (self_us, cumulative_us, module).
+    The -X importtime bookkeeping itself adds a little to `seconds`.
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', _STARTUP, path]
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'job.settings'))
+
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+    seconds = time.perf_counter() - start
+    if result.returncode:
+        raise RuntimeError(f"Cold start failed:\n{result.stderr}")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        imports.append((int(self_us), int(cumulative_us), module.strip()))
+    return {
+        'seconds': seconds,
+        'modules': json.loads(result.stdout.splitlines()[-1]),
+        'imports': imports,
+    }
@@ -0,0 +1,163 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .dedup import COLLAPSE, OFF, DuplicateDetector
+from .models import SearchResult, SearchTask
+from .scraper import (
+    DEFAULT_HEADERS, SearchProgress, create_linkedin_url, job_matches, matching_card_filter, search_job_details,
+)
+
+# Seconds between progress writes (and heartbeats) while a search is running
+PROGRESS_INTERVAL = 1.0
+
+
+class TaskSuperseded(Exception):
+    """The running task was requeued or failed by recover_stale_tasks."""
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the in-process pool that runs background searches."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.LINKEDIN_SEARCH_WORKERS,
+                    thread_name_prefix='search-task',
+                )
+    return _executor
+
+
+def enqueue_search(task):
+    """Schedule a pending SearchTask once the transaction creating it commits.
+
+    With LINKEDIN_SEARCH_RUN_IN_PROCESS disabled the task just waits in the
+    database for `manage.py run_search_worker` to claim it.
+    """
+    if settings.LINKEDIN_SEARCH_RUN_IN_PROCESS:
+        transaction.on_commit(lambda: get_executor().submit(run_search_task, task.pk))
+
+
+def claim_task(task_id):
+    """Atomically move a task from pending to running; False if someone else did."""
+    now = timezone.now()
+    return SearchTask.objects.filter(pk=task_id, status=SearchTask.PENDING).update(
+        status=SearchTask.RUNNING, started_at=now, heartbeat_at=now, attempts=F('attempts') + 1
+    ) == 1
+
+
+def run_search_task(task_id):
+    """Scrape a claimed SearchTask, storing matches and progress as it goes."""
+    try:
+        if not claim_task(task_id):
+            return
+        task = SearchTask.objects.get(pk=task_id)
+        progress = SearchProgress()
+        results = []
+        position = 0
+        last_flush = time.monotonic()
+
+        # Every write is conditional on this run still owning the task
+        this_run = SearchTask.objects.filter(pk=task.pk, status=SearchTask.RUNNING, attempts=task.attempts)
+
+        def flush():
+            with transaction.atomic():
+                if not this_run.update(
+                    pages_fetched=progress.pages_fetched, details_parsed=progress.details_parsed,
+                    matches=progress.matches, heartbeat_at=timezone.now(),
+                ):
+                    raise TaskSuperseded
+                SearchResult.objects.bulk_create(results)
+            results.clear()
+
+        base_url = create_linkedin_url(task.keywords, task.location)
+        card_filter = matching_card_filter(task.keywords, task.location)
+        duplicates = task.duplicates
+        detector = DuplicateDetector() if duplicates != OFF else None
+        try:
+            jobs = search_job_details(
+                base_url, DEFAULT_HEADERS, task.job_limit, progress=progress, card_filter=card_filter
+            )
+            for job_data in jobs:
+                progress.details_parsed += 1
+                if job_matches(job_data, task.keywords, task.location):
+                    progress.matches += 1
+                    if detector is not None:
+                        detector.mark([job_data])
+                    if duplicates != COLLAPSE or detector.keep(job_data):
+                        results.append(SearchResult(task=task, position=position, data=job_data.to_dict()))
+                        position += 1
+                if time.monotonic() - last_flush >= PROGRESS_INTERVAL:
+                    flush()
+                    last_flush = time.monotonic()
+            flush()
+            outcome = {'status': SearchTask.SUCCEEDED}
+        except TaskSuperseded:
+            return
+        except Exception as e:
+            outcome = {'status': SearchTask.FAILED, 'error': str(e)}
+
+        this_run.update(finished_at=timezone.now(), **outcome)
+    finally:
+        # Worker threads own their database connections
+        connections.close_all()
+
+
+def pending_task_ids(limit):
+    """Oldest pending tasks first."""
+    return list(
+        SearchTask.objects.filter(status=SearchTask.PENDING)
+        .order_by('created_at')
+        .values_list('pk', flat=True)[:limit]
+    )
+
+
+def recover_stale_tasks(tasks=None):
+    """Requeue running tasks whose heartbeat stopped, e.g. because their worker was restarted.
+
+    A task that already ran LINKEDIN_SEARCH_MAX_ATTEMPTS times is failed
+    instead. Returns the IDs of the requeued tasks.
+    """
+    tasks = SearchTask.objects.all() if tasks is None else tasks
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=settings.LINKEDIN_SEARCH_HEARTBEAT_TIMEOUT)
+    stale = tasks.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status=SearchTask.RUNNING,
+    )
+    requeued = []
+    for task in stale:
+        with transaction.atomic():
+            # Left alone if its run wrote a heartbeat since it was read
+            still_stale = SearchTask.objects.filter(
+                pk=task.pk, status=SearchTask.RUNNING, attempts=task.attempts, heartbeat_at=task.heartbeat_at,
+            )
+            if task.attempts >= settings.LINKEDIN_SEARCH_MAX_ATTEMPTS:
+                still_stale.update(
+                    status=SearchTask.FAILED, finished_at=now,
+                    error=f"Worker stopped responding {task.attempts} times",
+                )
+            elif still_stale.update(
+                status=SearchTask.PENDING, started_at=None, heartbeat_at=None,
+                pages_fetched=0, details_parsed=0, matches=0,
+            ):
+                task.results.all().delete()
+                requeued.append(task.pk)
+    return requeued
+
+
+def recover_task(task_id):
+    """recover_stale_tasks for one task, rescheduled in this process when searches run here."""
+    for requeued_id in recover_stale_tasks(SearchTask.objects.filter(pk=task_id)):
+        if settings.LINKEDIN_SEARCH_RUN_IN_PROCESS:
+            transaction.on_commit(lambda task_id=requeued_id: get_executor().submit(run_search_task, task_id))
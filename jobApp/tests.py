@@ -1,3 +1,1011 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import closing
+from datetime import timedelta
+from email.utils import formatdate
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+from django.conf import settings
+from django.core.management import call_command
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from lxml import etree
+
+from benchmarks.fixture_server import FIRST_JOB_ID, FixtureSite
+
+from .client import LinkedInFetchError, backoff_delay, fetch, parse_retry_after
+from .coalesce import SearchResultCache
+from .dedup import ANNOTATE, COLLAPSE, OFF, iter_deduplicated, minhash_signature
+from .exporters import EXPORT_FIELDS, EXPORT_FORMATS, parquet_available
+from .hot_searches import RequestBudget, due_searches, min_heat, record_search_request, refresh_hot_searches
+from .listings import filter_listings
+from .models import HotSearch, JobListing, SavedSearch, SearchTask
+from .parsers import ERROR, FIELD_SELECTORS, MISSING, parse_job_details
+from .ratelimit import AdaptiveRateLimiter
+from .rawstore import get_raw_store
+from .records import JobRecord
+from .salary import find_salary, parse_salary
+from .saved_searches import refresh_saved_search
+from .scraper import get_job_details, iter_job_card_pages, iter_shard_pages
+from .skills import SkillMatcher, get_skill_matcher
+from .startup import DEFERRED_MODULES, run_cold_start
+from .tasks import run_search_task
+
+FIXTURES = Path(settings.BASE_DIR) / 'benchmarks' / 'fixtures'
+DESCRIPTIONS = FIXTURES / 'descriptions.jsonl'
+
+
+class ListingSite(FixtureSite):
+    """The fixture site serving a given newest-first list of job positions, for every query."""
+
+    def __init__(self, positions, **kwargs):
+        super().__init__(**kwargs)
+        self.positions = list(positions)
+
+    def matching_jobs(self, query):
+        return self.positions
+
+
+def fixture_fetch(site):
+    """A stand-in for client.fetch answering from `site` without a server."""
+    def fetch(url, headers=None, on_attempt=None):
+        if on_attempt is not None:
+            on_attempt()
+        parts = urlsplit(url)
+        status, response_headers, body, _ = site.respond(parts.path, parse_qs(parts.query))
+        return SimpleNamespace(status_code=status, headers=response_headers, content=body)
+    return fetch
+
+
+def fixture_session(site):
+    """A stand-in for the shared requests session answering from `site`; `urls` lists the requests sent."""
+    session = SimpleNamespace(urls=[])
+
+    def get(url, headers=None, timeout=None):
+        session.urls.append(url)
+        parts = urlsplit(url)
+        status, response_headers, body, _ = site.respond(parts.path, parse_qs(parts.query))
+        return SimpleNamespace(status_code=status, headers=response_headers, content=body, close=lambda: None)
+
+    session.get = get
+    return session
+
+
+def job_id(position):
+    return str(FIRST_JOB_ID + position)
+
+
+@override_settings(LINKEDIN_SEARCH_RUN_IN_PROCESS=False)
+class BackgroundSearchTests(TransactionTestCase):
+    def setUp(self):
+        patch = mock.patch('jobApp.scraper.fetch', fixture_fetch(ListingSite(range(60))))
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_task_reports_progress_and_results(self):
+        response = self.client.post(
+            '/search/', {'keywords': 'python', 'location': 'germany', 'async': True},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status'], SearchTask.PENDING)
+
+        run_search_task(response.json()['task_id'])
+
+        task = self.client.get(response.json()['status_url']).json()
+        self.assertEqual(task['status'], SearchTask.SUCCEEDED)
+        self.assertEqual(task['pages_fetched'], 3)
+        # Cards that cannot match are dropped before their postings are fetched
+        self.assertTrue(0 < task['details_parsed'] < 60)
+        self.assertGreater(task['matches'], 0)
+
+        results = self.client.get(response.json()['results_url']).json()
+        self.assertEqual(results['count'], task['matches'])
+        self.assertTrue(all('python' in job['job_title'].lower() for job in results['results']))
+
+    def test_claimed_task_is_not_run_twice(self):
+        task = SearchTask.objects.create(keywords='python', location='germany', job_limit=10)
+        run_search_task(task.pk)
+        finished_at = SearchTask.objects.get(pk=task.pk).finished_at
+
+        run_search_task(task.pk)
+        self.assertEqual(SearchTask.objects.get(pk=task.pk).finished_at, finished_at)
+
+    def test_duplicates_mode_is_kept_with_the_task(self):
+        response = self.client.post(
+            '/search/', {'keywords': 'python', 'location': 'germany', 'async': True, 'duplicates': COLLAPSE},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(SearchTask.objects.get(pk=response.json()['task_id']).duplicates, COLLAPSE)
+
+
+class SearchResultCacheTests(SimpleTestCase):
+    def test_concurrent_callers_share_one_computation(self):
+        cache = SearchResultCache(ttl=60, max_jobs=100)
+        calls = []
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return ['job']
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute('key', compute)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(cache.get('key'), ['job'])
+
+    def test_errors_reach_waiters_and_are_not_cached(self):
+        cache = SearchResultCache(ttl=60, max_jobs=100)
+
+        def compute():
+            raise LinkedInFetchError('down')
+
+        with self.assertRaises(LinkedInFetchError):
+            cache.get_or_compute('key', compute)
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(cache.get_or_compute('key', lambda: ['job']), ['job'])
+
+    def test_evicts_least_recently_used_beyond_max_jobs(self):
+        cache = SearchResultCache(ttl=60, max_jobs=3)
+        cache.get_or_compute('a', lambda: ['a1', 'a2'])
+        cache.get_or_compute('b', lambda: ['b1'])
+        cache.get('a')
+        cache.get_or_compute('c', lambda: ['c1'])
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), ['a1', 'a2'])
+        self.assertEqual(cache.get('c'), ['c1'])
+
+    def test_oversized_and_expired_results_are_not_served(self):
+        cache = SearchResultCache(ttl=60, max_jobs=2)
+        cache.get_or_compute('big', lambda: ['1', '2', '3'])
+        self.assertIsNone(cache.get('big'))
+
+        cache.get_or_compute('key', lambda: ['job'])
+        later = time.monotonic() + 61
+        with mock.patch('jobApp.coalesce.time.monotonic', return_value=later):
+            self.assertIsNone(cache.get('key'))
+
+    def test_derived_variants_are_kept_with_their_result(self):
+        cache = SearchResultCache(ttl=60, max_jobs=3)
+        jobs = cache.get_or_compute('key', lambda: ['1', '2'])
+        calls = []
+
+        def compute(jobs):
+            calls.append(1)
+            return jobs[:1]
+
+        self.assertEqual(cache.derive('key', jobs, 'collapse', compute), ['1'])
+        self.assertEqual(cache.derive('key', jobs, 'collapse', compute), ['1'])
+        self.assertEqual(len(calls), 1)
+
+        # Variants count towards max_jobs and leave with their result
+        cache.get_or_compute('other', lambda: ['3'])
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(cache.derive('key', jobs, 'collapse', compute), ['1'])
+        self.assertEqual(len(calls), 2)
+
+
+class SavedSearchRefreshTests(TestCase):
+    def setUp(self):
+        # Posting pages rotate by job ID; one in three has no location and never matches
+        self.site = ListingSite(range(60))
+        patch = mock.patch('jobApp.scraper.fetch', fixture_fetch(self.site))
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.search = SavedSearch.objects.create(keywords='python', location='germany', job_limit=3000)
+
+    def refresh(self, mode=None):
+        result = refresh_saved_search(self.search, mode)
+        result['added'] = {job.job_id for job in result['added']}
+        return result
+
+    def test_delta_refresh_stops_at_a_page_of_known_jobs(self):
+        first = self.refresh()
+        self.assertEqual((first['mode'], first['pages_fetched']), ('full', 3))
+        self.assertTrue(first['added'])
+
+        unchanged = self.refresh()
+        self.assertEqual(unchanged['mode'], 'delta')
+        self.assertEqual((unchanged['pages_fetched'], unchanged['details_fetched']), (1, 0))
+        self.assertEqual((unchanged['added'], unchanged['removed']), (set(), []))
+
+        new = {job_id(position) for position in range(100, 110)}
+        self.site.positions = list(range(100, 110)) + self.site.positions
+        delta = self.refresh()
+        self.assertEqual(delta['pages_fetched'], 2)
+        self.assertTrue(delta['added'])
+        self.assertLessEqual(delta['added'], new)
+
+    def test_full_refresh_reports_missing_jobs_as_removed(self):
+        added = self.refresh()['added']
+        self.site.positions = list(range(10, 60))
+        result = self.refresh('full')
+        gone = {job_id(position) for position in range(10)}
+        self.assertTrue(added & gone)
+        self.assertEqual(set(result['removed']), added & gone)
+        self.assertEqual(result['details_fetched'], 0)
+
+    def test_delta_refresh_removes_jobs_only_once_expired(self):
+        added = self.refresh()['added']
+        self.site.positions = list(range(10, 60))
+        self.assertEqual(self.refresh()['removed'], [])
+
+        expired = timezone.now() - timedelta(seconds=settings.LINKEDIN_SAVED_SEARCH_EXPIRY + 1)
+        self.search.seen_jobs.update(last_seen=expired)
+        result = self.refresh()
+        # The delta crawl stops after its first page, so only that page still counts as seen
+        still_seen = {job_id(position) for position in range(10, 35)}
+        self.assertEqual(result['pages_fetched'], 1)
+        self.assertEqual(set(result['removed']), added - still_seen)
+
+
+class AdaptiveRateLimiterTests(SimpleTestCase):
+    def make_limiter(self, **kwargs):
+        options = {'min_rate': 1, 'max_rate': 1000, 'latency_target': 1.0, 'max_concurrency': 4, 'cooldown': 0}
+        options.update(kwargs)
+        return AdaptiveRateLimiter(100, **options)
+
+    def rate(self, limiter, endpoint='listing'):
+        with limiter._state.locked() as state:
+            return limiter._entry(state, endpoint)['rate']
+
+    def test_clean_responses_grow_the_rate(self):
+        limiter = self.make_limiter()
+        for _ in range(3):
+            with limiter.slot('listing'):
+                pass
+        self.assertAlmostEqual(self.rate(limiter), 100 + 3 * 0.5 / 100, places=3)
+
+    def test_throttled_and_slow_responses_cut_the_rate(self):
+        limiter = self.make_limiter()
+        with limiter.slot('listing') as slot:
+            slot.throttled = True
+        self.assertEqual(self.rate(limiter), 50)
+
+        limiter.acquire('listing')
+        limiter.release('listing', latency=5.0)
+        self.assertEqual(self.rate(limiter), 25)
+        self.assertEqual(limiter._window('listing'), [1.0, 0])
+
+    def test_failed_requests_never_count_as_clean(self):
+        limiter = self.make_limiter()
+        with self.assertRaises(ConnectionError):
+            with limiter.slot('listing'):
+                raise ConnectionError()
+        self.assertEqual(self.rate(limiter), 50)
+
+        with limiter.slot('listing') as slot:
+            slot.failed = True
+        self.assertEqual(self.rate(limiter), 25)
+
+    def test_cuts_within_cooldown_count_once(self):
+        limiter = self.make_limiter(cooldown=60)
+        for _ in range(3):
+            limiter.backoff('listing', 'throttled')
+        self.assertEqual(self.rate(limiter), 50)
+        self.assertEqual(self.rate(limiter, 'posting'), 100)
+
+    def test_rate_stays_within_bounds(self):
+        limiter = self.make_limiter(min_rate=40, max_rate=100.01)
+        for _ in range(5):
+            limiter.backoff('listing', 'throttled')
+        self.assertEqual(self.rate(limiter), 40)
+        for _ in range(5):
+            with limiter.slot('posting'):
+                pass
+        self.assertEqual(self.rate(limiter, 'posting'), 100.01)
+
+
+class ColdStartTests(SimpleTestCase):
+    # Wall-clock timing depends on the host, so it only runs when asked for
+    @skipUnless(os.environ.get('RUN_TIMING_TESTS'), "set RUN_TIMING_TESTS=1 to check the cold start budget")
+    def test_cold_start_within_budget(self):
+        # Best of three, so one slow process spawn does not fail the build
+        seconds = min(run_cold_start()['seconds'] for _ in range(3))
+        self.assertLessEqual(
+            seconds, settings.COLD_START_BUDGET,
+            f"Cold start took {seconds:.2f}s; run `manage.py profile_imports` to see why",
+        )
+
+    def test_heavy_modules_deferred(self):
+        modules = set(run_cold_start()['modules'])
+        self.assertEqual([module for module in DEFERRED_MODULES if module in modules], [])
+
+
+@override_settings(LINKEDIN_SHARD_WORKERS=4)
+class ShardPagesTests(SimpleTestCase):
+    url = settings.LINKEDIN_BASE_URL + '/jobs-guest/jobs/api/seeMoreJobPostings/search?keywords=python&start={}'
+
+    def setUp(self):
+        # 1200 jobs and 100 results per query: the experience level and job
+        # type facets are both needed to get every sub-query under the ceiling
+        self.site = FixtureSite(jobs=1200, ceiling=100)
+        patches = [
+            mock.patch('jobApp.scraper.fetch', fixture_fetch(self.site)),
+            mock.patch('jobApp.scraper.RESULTS_CEILING', self.site.ceiling),
+        ]
+        for patch in patches:
+            patch.start()
+            # Stopped after the crawl threads, so none of them reaches the network
+            self.addCleanup(patch.stop)
+        self.addCleanup(self.wait_for_shard_threads)
+
+    def wait_for_shard_threads(self):
+        deadline = time.monotonic() + 5
+        while any(thread.name.startswith('shard') for thread in threading.enumerate()):
+            self.assertLess(time.monotonic(), deadline, "Shard threads still running after the crawl ended")
+            time.sleep(0.01)
+
+    def crawl(self, shards):
+        with closing(iter_shard_pages(shards, {}, 10000)) as pages:
+            return [card['job_id'] for cards in pages for card in cards]
+
+    def test_query_at_ceiling_is_split_until_all_results_are_found(self):
+        found = self.crawl([(self.url, True)])
+        self.assertEqual(set(found), {job_id(position) for position in range(1200)})
+
+    def test_unsplittable_query_stops_at_ceiling(self):
+        found = self.crawl([(self.url, False)])
+        self.assertEqual(found, [job_id(position) for position in range(100)])
+
+    def test_consumer_leaving_early_stops_the_crawl(self):
+        pages = iter_shard_pages([(self.url, True)], {}, 10000)
+        self.assertEqual(len(next(pages)), 25)
+        pages.close()
+        self.wait_for_shard_threads()
+
+    def test_fetch_errors_are_raised(self):
+        with mock.patch('jobApp.scraper.fetch', side_effect=LinkedInFetchError('down')):
+            with self.assertRaises(LinkedInFetchError):
+                self.crawl([(self.url, True)])
+            self.wait_for_shard_threads()
+
+
+def fixture_records(*descriptions, **kwargs):
+    return [
+        JobRecord(job_id=str(index), job_description=description, **kwargs)
+        for index, description in enumerate(descriptions, 1)
+    ]
+
+
+class NearDuplicateTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with open(DESCRIPTIONS) as f:
+            cls.descriptions = [json.loads(line)['job_description'] for line in f]
+
+    def search_results(self):
+        first, second = self.descriptions[:2]
+        words = first.split()
+        words[len(words) // 2] = 'banana'
+        # 1 and 2 are reposts of one role, 3 is a lightly edited copy of it
+        return fixture_records(first, first, ' '.join(words), second, None)
+
+    def deduplicate(self, jobs, mode):
+        return list(iter_deduplicated(jobs, mode, chunk_size=2, use_history=False))
+
+    def test_annotate_points_duplicates_at_the_first_posting(self):
+        jobs = self.deduplicate(self.search_results(), ANNOTATE)
+        self.assertEqual([job.duplicate_of for job in jobs], [None, '1', '1', None, None])
+
+    def test_collapse_keeps_the_first_posting_of_each_group(self):
+        jobs = self.deduplicate(self.search_results(), COLLAPSE)
+        self.assertEqual([job.job_id for job in jobs], ['1', '4', '5'])
+
+    def test_oldest_stored_posting_starts_the_group(self):
+        # The search stores its postings before they are deduplicated, so the
+        # history holds this search's postings as well as the newer repost 300
+        first, second = self.descriptions[:2]
+        stored = [
+            JobRecord(job_id=job_id, job_title='Python Developer', job_description=description)
+            for job_id, description in (('200', first), ('100', first), ('300', first), ('400', second))
+        ]
+        JobListing.store_details(stored)
+        search = [job.copy() for job in stored if job.job_id != '300']
+
+        jobs = list(iter_deduplicated(search, ANNOTATE, chunk_size=2))
+        self.assertEqual([job.duplicate_of for job in jobs], ['100', None, None])
+        self.assertEqual([job.duplicate_of for job in iter_deduplicated(search[1:2], ANNOTATE)], [None])
+
+        jobs = list(iter_deduplicated(search, COLLAPSE, chunk_size=2))
+        self.assertEqual([job.job_id for job in jobs], ['200', '400'])
+
+    def test_stored_signatures_are_reused(self):
+        first, second = self.descriptions[:2]
+        stored = fixture_records(first, second)
+        JobListing.store_details(stored)
+        search = [job.copy() for job in stored] + fixture_records(None, None, first)[2:]
+
+        with mock.patch('jobApp.dedup.minhash_signature', wraps=minhash_signature) as sign:
+            jobs = list(iter_deduplicated(search, ANNOTATE))
+        self.assertEqual([job.duplicate_of for job in jobs], [None, None, '1'])
+        # Only the posting that was never stored is hashed
+        self.assertEqual(sign.call_count, 1)
+
+    def test_stream_batches_wait_at_most_max_delay(self):
+        jobs = iter(self.search_results())
+        # Read once when a chunk starts and once per record
+        ticks = iter([0, 0, 0.1, 1, 1.1, 1.2, 1.3])
+        chunks = []
+
+        def mark(detector_self, chunk):
+            chunks.append([job.job_id for job in chunk])
+            return chunk
+
+        clock = SimpleNamespace(monotonic=lambda: next(ticks))
+        with mock.patch('jobApp.dedup.time', clock), \
+                mock.patch('jobApp.dedup.DuplicateDetector.mark', mark):
+            list(iter_deduplicated(jobs, ANNOTATE, use_history=False, max_delay=0.5))
+        self.assertEqual(chunks, [['1', '2', '3'], ['4', '5']])
+
+    def test_shared_records_are_not_modified(self):
+        # Cached search results are shared between requests
+        shared = self.search_results()
+        annotated = self.deduplicate(shared, ANNOTATE)
+        self.assertEqual(annotated[1].duplicate_of, '1')
+        self.assertEqual([job.duplicate_of for job in shared], [None] * 5)
+
+        shared[2].duplicate_of = '1'
+        plain = self.deduplicate(shared, OFF)
+        self.assertEqual([job.duplicate_of for job in plain], [None] * 5)
+        self.assertEqual(shared[2].duplicate_of, '1')
+
+
+def posting_page(name, renames=()):
+    """A fixture posting page with class names changed, given as (tag, old, new) with new '' to remove."""
+    root = etree.HTML((FIXTURES / f'job_posting_{name}.html').read_bytes(), etree.HTMLParser(encoding='utf-8'))
+    for tag, old, new in renames:
+        for element in root.iter(tag):
+            names = (element.get('class') or '').split()
+            if old in names:
+                element.set('class', ' '.join(new if name == old else name for name in names if name != old or new))
+    return etree.tostring(root, method='html', encoding='utf-8')
+
+
+class ParseJobDetailsTests(SimpleTestCase):
+    def parse(self, content):
+        sources = {}
+        return parse_job_details(content, '1', sources), sources
+
+    def test_fixture_pages_use_the_primary_selectors(self):
+        job, sources = self.parse(posting_page('skills'))
+        self.assertEqual(job.company, 'Acme Analytics')
+        self.assertEqual(job.job_title, 'Senior Python Developer')
+        self.assertEqual(job.location, 'Berlin, Berlin, Germany')
+        self.assertEqual(job.applicant_count, '87 applicants')
+        self.assertEqual(job.level, 'Mid-Senior level')
+        self.assertEqual((job.salary_min, job.salary_max, job.salary_currency, job.salary_period),
+                         (70000, 90000, 'EUR', 'year'))
+        self.assertEqual(job.skills, ['Python', 'Django', 'PostgreSQL', 'Amazon Web Services (AWS)'])
+        for field in ('company', 'company_url', 'job_title', 'job_url', 'location', 'posted_date',
+                      'job_description', 'applicant_count', 'level', 'employment_type', 'job_function',
+                      'salary', 'skills'):
+            self.assertEqual(sources[field], FIELD_SELECTORS[field][0][0], field)
+
+        # Without a compensation block or skills section, both come from the description
+        job, sources = self.parse(posting_page('description'))
+        self.assertEqual((job.salary_min, job.salary_max, job.salary_currency), (120000, 150000, 'USD'))
+        self.assertIn('Kubernetes', job.skills)
+        self.assertEqual((sources['salary'], sources['skills']), ('description_pattern', 'description_matcher'))
+
+        job, sources = self.parse(posting_page('sparse'))
+        self.assertEqual((job.job_title, job.job_url), ('Data Engineer', 'https://de.linkedin.com/jobs/view/4100015838'))
+        self.assertEqual((job.company, sources['company']), (None, MISSING))
+        self.assertEqual(sources['job_description'], MISSING)
+
+    def test_each_fallback_takes_over_from_its_primary_selector(self):
+        # The salary fallback is covered by the description page, whose text names one
+        cases = [
+            ([('div', 'top-card-layout__card', '')],
+             {'company': ('org_name_link', 'Acme Analytics'),
+              'company_url': ('org_name_link', 'https://www.linkedin.com/company/acme-analytics?trk=public_jobs_topcard-org-name')}),
+            ([('div', 'top-card-layout__entity-info', '')],
+             {'job_title': ('title_heading', 'Senior Python Developer'),
+              'job_url': ('title_heading_link', 'https://de.linkedin.com/jobs/view/senior-python-developer-at-acme-analytics-4100000000?trk=public_jobs_topcard-title')}),
+            ([('span', 'topcard__flavor--bullet', '')],
+             {'location': ('flavor_text', 'Berlin, Berlin, Germany')}),
+            ([('span', 'posted-time-ago__text', 'posted-time-ago__text--new')],
+             {'posted_date': ('posted_time_ago_new', '2 weeks ago')}),
+            ([('span', 'num-applicants__caption', '')],
+             {'applicant_count': ('caption_figure', 'Over 200 applicants')}),
+            ([('ul', 'description__job-criteria-list', '')],
+             {'level': ('criteria_items', 'Mid-Senior level'), 'employment_type': ('criteria_items', 'Full-time')}),
+            ([('section', 'skills-section', '')],
+             {'skills': ('description_matcher', None)}),
+        ]
+        for renames, expected in cases:
+            with self.subTest(renames=renames):
+                job, sources = self.parse(posting_page('skills', renames))
+                for field, (source, value) in expected.items():
+                    self.assertEqual(sources[field], source, field)
+                    if value is not None:
+                        self.assertEqual(getattr(job, field), value, field)
+
+        job, sources = self.parse(posting_page('skills', [('div', 'show-more-less-html__markup', '')]))
+        self.assertEqual(sources['job_description'], 'description_text')
+        self.assertTrue(job.job_description.startswith('About the role'))
+
+    def test_a_failing_selector_only_costs_its_field(self):
+        def broken(page):
+            raise ValueError('markup changed')
+
+        selectors = {
+            'company': (('broken', broken),) + FIELD_SELECTORS['company'],
+            'location': (('broken', broken),),
+        }
+        with mock.patch.dict(FIELD_SELECTORS, selectors), self.assertLogs('jobApp.parsers', 'WARNING'):
+            job, sources = self.parse(posting_page('skills'))
+        self.assertEqual((job.company, sources['company']), ('Acme Analytics', 'logo_alt'))
+        self.assertEqual((job.location, sources['location']), (None, ERROR))
+        self.assertEqual(sources['job_title'], 'entity_info_link')
+
+
+class SalaryTests(SimpleTestCase):
+    def test_salaries_are_normalized(self):
+        cases = [
+            ('$120,000 - $150,000 per year', (120000, 150000, 'USD', 'year')),
+            ('€70,000.00/yr - €90,000.00/yr', (70000, 90000, 'EUR', 'year')),
+            ('CA$90,000 - CA$110,000 a year', (90000, 110000, 'CAD', 'year')),
+            ('₹12,00,000 - ₹18,00,000 per annum', (1200000, 1800000, 'INR', 'year')),
+            ('CHF 100,000 yearly', (100000, 100000, 'CHF', 'year')),
+            ('$80k-$100k', (80000, 100000, 'USD', None)),
+            ('USD 50K to 60K annually', (50000, 60000, 'USD', 'year')),
+            ('up to $1.2M', (1200000, 1200000, 'USD', None)),
+            ('£45 per hour', (45, 45, 'GBP', 'hour')),
+            ('$40/hr - $55/hr', (40, 55, 'USD', 'hour')),
+            ('$6,000 monthly', (6000, 6000, 'USD', 'month')),
+            ('$150,000 - $120,000', (120000, 150000, 'USD', None)),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                salary = parse_salary(text)
+                self.assertEqual(
+                    (salary['salary_min'], salary['salary_max'], salary['salary_currency'], salary['salary_period']),
+                    expected,
+                )
+
+    def test_descriptions_without_a_salary(self):
+        for text in (None, '', 'Competitive salary and equity', '401(k) matching and a USB-C laptop',
+                     'A team of 50 engineers in 3 offices'):
+            with self.subTest(text=text):
+                self.assertIsNone(find_salary(text))
+                self.assertIsNone(parse_salary(text))
+
+    def test_first_salary_in_a_description_is_found(self):
+        text = 'We pay £55,000 - £65,000 per year, plus a $2,000 learning budget.'
+        self.assertEqual(find_salary(text).group(0).strip(), '£55,000 - £65,000 per year')
+
+
+class SkillMatcherTests(SimpleTestCase):
+    matcher = SkillMatcher({
+        'Java': ['java'],
+        'JavaScript': ['javascript', 'js'],
+        'C': ['c'],
+        'C++': ['c++', 'cpp'],
+        '.NET': ['.net', 'dotnet'],
+        'Amazon Web Services (AWS)': ['amazon web services', 'aws'],
+    })
+
+    def test_aliases_and_word_boundaries(self):
+        cases = [
+            ('Java and JavaScript', ['Java', 'JavaScript']),
+            ('JavaScript only', ['JavaScript']),
+            ('Node.js and JS', ['JavaScript']),
+            ('jsonschema', []),
+            ('Modern C, not C++', ['C', 'C++']),
+            ('CPP and C#', ['C++']),
+            ('DotNet or .NET', ['.NET']),
+            ('Amazon Web Services (AWS) and more AWS', ['Amazon Web Services (AWS)']),
+            ('awsome', []),
+            ('', []),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(self.matcher.find(text), expected)
+
+    def test_bundled_taxonomy(self):
+        self.assertEqual(
+            get_skill_matcher().find('Kafka on k8s, golang and C sharp'),
+            ['Apache Kafka', 'Kubernetes', 'Go', 'C#'],
+        )
+
+
+class HotSearchTests(TestCase):
+    def record(self, keywords, at, times=1, location='Berlin'):
+        with mock.patch('jobApp.hot_searches.timezone.now', return_value=at):
+            for _ in range(times):
+                record_search_request(keywords, location, 25)
+
+    def test_repeated_requests_raise_heat_and_old_heat_decays(self):
+        now = timezone.now()
+        half_life = timedelta(seconds=settings.LINKEDIN_HOT_SEARCH_HALF_LIFE)
+        self.record('Python  Developer', now, times=3)
+        self.record('go developer', now - 2 * half_life, times=3)
+        self.record('rust developer', now)
+
+        heat = dict(HotSearch.objects.values_list('keywords', 'request_heat'))
+        self.assertEqual(set(heat), {'python developer', 'go developer', 'rust developer'})
+        # Three requests now count three times one; three made two half-lives ago count 3/4 of one
+        self.assertAlmostEqual(heat['python developer'] - heat['rust developer'], math.log2(3))
+        self.assertAlmostEqual(heat['go developer'] - heat['rust developer'], math.log2(3 / 4))
+        self.assertGreaterEqual(heat['python developer'], min_heat(now))
+        self.assertLess(heat['go developer'], min_heat(now))
+
+    def test_due_searches_hottest_first(self):
+        now = timezone.now()
+        self.record('warm', now, times=3)
+        self.record('hot', now, times=9)
+        self.record('hottest but not due', now, times=20)
+        self.record('cooled off', now - timedelta(days=2), times=20)
+        HotSearch.objects.filter(keywords='hottest but not due').update(next_refresh_at=now + timedelta(minutes=5))
+        HotSearch.objects.filter(keywords__in=['warm', 'cooled off']).update(next_refresh_at=now - timedelta(minutes=5))
+
+        self.assertEqual([search.keywords for search in due_searches(now)], ['hot', 'warm'])
+        # A search that cooled off leaves the refresh schedule
+        self.assertIsNone(HotSearch.objects.get(keywords='cooled off').next_refresh_at)
+
+    def test_budget_refuses_pages_it_cannot_pay_for(self):
+        clock = SimpleNamespace(monotonic=lambda: 0)
+        with mock.patch('jobApp.hot_searches.time', clock):
+            budget = RequestBudget(per_hour=60)
+            budget.spend(40)
+        self.record('python', timezone.now(), times=3)
+
+        with mock.patch('jobApp.hot_searches.time', clock), mock.patch('jobApp.hot_searches.fetch') as fetch:
+            self.assertEqual(refresh_hot_searches(budget, {}), 0)
+            fetch.assert_not_called()
+            self.assertEqual(budget.available, 20)
+
+            # Tokens come back at per_hour, up to an hour's worth
+            clock.monotonic = lambda: 1800
+            self.assertEqual(budget.available, 50)
+            clock.monotonic = lambda: 7200
+            self.assertEqual(budget.available, 60)
+
+    def test_every_attempt_is_charged(self):
+        self.record('python', timezone.now(), times=3, location='germany')
+        session = fixture_session(ListingSite(range(60), throttle_rate=0.3, seed=1))
+        clock = SimpleNamespace(monotonic=lambda: 0)
+        with mock.patch('jobApp.client.get_session', return_value=session), \
+                mock.patch('jobApp.client.linkedin_limiter', AdaptiveRateLimiter(0, 0, 0)), \
+                mock.patch('jobApp.client.backoff_delay', return_value=0), \
+                mock.patch('jobApp.hot_searches.time', clock):
+            budget = RequestBudget(per_hour=1000)
+            self.assertGreater(refresh_hot_searches(budget, {}), 0)
+            # Throttled requests were retried, and each retry was paid for
+            self.assertGreater(len(session.urls), len(set(session.urls)))
+            self.assertEqual(budget.available, 1000 - len(session.urls))
+
+
+class JobCardPagesTests(SimpleTestCase):
+    url = ShardPagesTests.url
+
+    def crawl(self, second_page_status):
+        site_fetch = fixture_fetch(ListingSite(range(60)))
+
+        def fetch(url, headers=None, on_attempt=None):
+            if second_page_status is not None and url == self.url.format(25):
+                return SimpleNamespace(status_code=second_page_status, headers={}, content=b'')
+            return site_fetch(url, headers)
+
+        with mock.patch('jobApp.scraper.fetch', fetch):
+            return [card['job_id'] for cards in iter_job_card_pages(self.url, {}, 100) for card in cards]
+
+    def test_results_end_at_400_or_404(self):
+        self.assertEqual(self.crawl(None), [job_id(position) for position in range(60)])
+        for status in (400, 404):
+            with self.subTest(status=status):
+                self.assertEqual(self.crawl(status), [job_id(position) for position in range(25)])
+
+    def test_other_statuses_are_errors_not_truncated_results(self):
+        for status in (302, 403, 410, 503):
+            with self.subTest(status=status), self.assertRaises(LinkedInFetchError):
+                self.crawl(status)
+
+
+@override_settings(LINKEDIN_MAX_RETRIES=4, LINKEDIN_BACKOFF_BASE=0.5, LINKEDIN_BACKOFF_MAX=30)
+class ClientRetryTests(SimpleTestCase):
+    posting_url = settings.LINKEDIN_BASE_URL + '/jobs-guest/jobs/api/jobPosting/{}'
+
+    def serve(self, site):
+        """Send fetch's requests to `site` without pacing; returns the session and the list of backoff sleeps."""
+        session = fixture_session(site)
+        sleeps = []
+        for patch in (
+            mock.patch('jobApp.client.get_session', return_value=session),
+            mock.patch('jobApp.client.linkedin_limiter', AdaptiveRateLimiter(0, 0, 0)),
+            mock.patch('jobApp.client.time', SimpleNamespace(sleep=sleeps.append, time=time.time)),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+        return session, sleeps
+
+    def test_throttling_and_errors_are_retried(self):
+        session, sleeps = self.serve(FixtureSite(throttle_rate=0.2, error_rate=0.2, seed=3))
+        urls = [self.posting_url.format(FIRST_JOB_ID + i) for i in range(30)]
+
+        self.assertEqual([fetch(url).status_code for url in urls], [200] * 30)
+        self.assertEqual(list(dict.fromkeys(session.urls)), urls)
+        self.assertGreater(len(session.urls), len(urls))
+        self.assertEqual(len(sleeps), len(session.urls) - len(urls))
+        self.assertTrue(all(0 <= delay <= 0.5 * 2 ** 3 for delay in sleeps))
+
+    def test_retry_after_replaces_the_backoff(self):
+        # The fixture site answers 429 with Retry-After: 0
+        session, sleeps = self.serve(FixtureSite(throttle_rate=1.0))
+        with self.assertRaises(LinkedInFetchError):
+            fetch(self.posting_url.format(FIRST_JOB_ID))
+        self.assertEqual(len(session.urls), 5)
+        self.assertEqual(sleeps, [0.0] * 4)
+
+    def test_backoff_grows_exponentially_without_retry_after(self):
+        session, sleeps = self.serve(FixtureSite(error_rate=1.0))
+        with mock.patch('jobApp.client.random.uniform', side_effect=lambda low, high: high), \
+                self.assertRaises(LinkedInFetchError):
+            fetch(self.posting_url.format(FIRST_JOB_ID))
+        self.assertEqual(sleeps, [0.5, 1.0, 2.0, 4.0])
+
+    def test_other_statuses_are_returned_without_retrying(self):
+        session, sleeps = self.serve(FixtureSite())
+        self.assertEqual(fetch(self.posting_url.format('missing')).status_code, 404)
+        self.assertEqual((len(session.urls), sleeps), (1, []))
+
+    def test_retry_after_values(self):
+        self.assertEqual(parse_retry_after('12'), 12.0)
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertIsNone(parse_retry_after(None))
+        self.assertAlmostEqual(parse_retry_after(formatdate(time.time() + 60, usegmt=True)), 60, delta=2)
+        self.assertEqual(parse_retry_after(formatdate(time.time() - 60, usegmt=True)), 0.0)
+        # A long Retry-After is capped like the backoff
+        self.assertEqual(backoff_delay(0, 3600), 30)
+
+
+@mock.patch('jobApp.exporters.CHUNK_ROWS', 2)
+class ExportTests(SimpleTestCase):
+    jobs = [
+        JobRecord(
+            job_id='1', job_title='Python Developer, "Platform"', company='Acme\nAnalytics', location='Zürich',
+            salary='CHF 100,000 - 120,000 a year', salary_min=100000.0, salary_max=120000.0, salary_currency='CHF',
+            salary_period='year', skills=['Python', 'C++'],
+        ),
+        JobRecord(job_id='2', job_title='Data Engineer', duplicate_of='1'),
+        JobRecord(job_id='3', job_title='Go Developer', salary_min=55.5, salary_max=70.0, salary_period='hour'),
+        JobRecord(job_id='4'),
+        JobRecord(job_id='5', job_title='Backend Engineer', skills=['Django']),
+    ]
+
+    def export(self, file_format):
+        iter_chunks = EXPORT_FORMATS[file_format][0]
+        chunks = list(iter_chunks(iter(self.jobs)))
+        return b''.join(chunk.encode('utf-8') if isinstance(chunk, str) else chunk for chunk in chunks)
+
+    def expected_rows(self):
+        return [[value or '' for value in job.to_row()] for job in self.jobs]
+
+    def test_csv_round_trip(self):
+        rows = list(csv.reader(io.StringIO(self.export('csv').decode('utf-8'))))
+        self.assertEqual(rows, [EXPORT_FIELDS] + self.expected_rows())
+
+    def test_csv_gzip_round_trip(self):
+        self.assertEqual(gzip.decompress(self.export('csv.gz')), self.export('csv'))
+
+    def test_ndjson_round_trip(self):
+        lines = self.export('ndjson').decode('utf-8').splitlines()
+        self.assertEqual([JobRecord.from_dict(json.loads(line)) for line in lines], self.jobs)
+
+    @skipUnless(parquet_available(), "pyarrow is not installed")
+    def test_parquet_round_trip(self):
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(io.BytesIO(self.export('parquet')))
+        self.assertEqual(table.column_names, EXPORT_FIELDS)
+        self.assertEqual(str(table.schema.field('salary_min').type), 'double')
+        self.assertEqual(str(table.schema.field('job_title').type), 'string')
+        rows = table.to_pylist()
+        self.assertEqual([row['salary_min'] for row in rows], [100000.0, None, 55.5, None, None])
+        self.assertEqual([row['salary_max'] for row in rows], [120000.0, None, 70.0, None, None])
+        self.assertEqual(rows[0]['skills'], 'Python; C++')
+        self.assertEqual(
+            [[row[field] for field in EXPORT_FIELDS if field not in ('salary_min', 'salary_max')] for row in rows],
+            [[value for field, value in zip(EXPORT_FIELDS, job.to_row()) if field not in ('salary_min', 'salary_max')]
+             for job in self.jobs],
+        )
+
+
+class ListingQueryTests(TestCase):
+    def setUp(self):
+        JobListing.store_details([
+            JobRecord(job_id='1', job_title='Python Developer', company='Acme', location='Berlin',
+                      level='Mid-Senior level', employment_type='Full-time', posted_date='1 day ago',
+                      job_description='Django services on Kubernetes'),
+            JobRecord(job_id='2', job_title='Senior Python Engineer', company='Globex', location='Berlin',
+                      level='Mid-Senior level', employment_type='Contract', posted_date='3 weeks ago',
+                      job_description='Data pipelines with Kafka'),
+            JobRecord(job_id='3', job_title='Go Developer', company='Acme', location='Munich',
+                      level='Entry level', employment_type='Full-time', posted_date='2 days ago',
+                      job_description='Kubernetes operators'),
+        ])
+
+    def search(self, query):
+        return [listing.job_id for listing in filter_listings(QueryDict(query))]
+
+    def test_full_text_search_follows_inserts_updates_and_deletes(self):
+        self.assertEqual(self.search('q=kubernetes'), ['1', '3'])
+        self.assertEqual(self.search('q=python+kafka'), ['2'])
+
+        JobListing.store_details([JobRecord(job_id='1', job_title='Python Developer', job_description='Flask on Nomad')])
+        JobListing.objects.filter(job_id='3').update(job_title='Rust Developer')
+        self.assertEqual(self.search('q=kubernetes'), ['3'])
+        self.assertEqual(self.search('q=nomad'), ['1'])
+        self.assertEqual(self.search('q=rust'), ['3'])
+        self.assertEqual(self.search('q=go'), [])
+
+        JobListing.objects.filter(job_id='3').delete()
+        self.assertEqual(self.search('q=kubernetes'), [])
+
+    def test_query_syntax_in_user_input_is_matched_as_words(self):
+        # "OR" is a word to find, not an operator
+        self.assertEqual(self.search('q=python+OR+go'), [])
+        self.assertEqual(self.search('q=%22Python%22+(developer*'), ['1'])
+        self.assertEqual(self.search('q=***'), ['1', '3', '2'])
+
+    def test_facet_filters_and_counts(self):
+        self.assertEqual(self.search('company=Acme&company=Globex&location=Berlin'), ['1', '2'])
+        self.assertEqual(self.search('q=developer&employment_type=Full-time&level=Entry+level'), ['3'])
+        after = (timezone.now() - timedelta(days=7)).date().isoformat()
+        self.assertEqual(self.search(f'posted_after={after}'), ['1', '3'])
+
+        response = self.client.get('/jobs/', {'q': 'kubernetes'})
+        self.assertEqual([job['job_id'] for job in response.json()['results']], ['1', '3'])
+        facets = response.json()['facets']
+        self.assertEqual(facets['company'], [{'value': 'Acme', 'count': 2}])
+        self.assertEqual(facets['location'], [{'value': 'Berlin', 'count': 1}, {'value': 'Munich', 'count': 1}])
+
+        self.assertEqual(self.client.get('/jobs/', {'posted_after': 'last week'}).status_code, 400)
+
+
+class RawStoreTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        patch = override_settings(LINKEDIN_RAW_STORE_DIR=directory.name)
+        patch.enable()
+        self.addCleanup(patch.disable)
+        self.store = get_raw_store()
+        self.page = (FIXTURES / 'job_posting_skills.html').read_bytes()
+
+    def test_not_modified_reuses_the_stored_page(self):
+        requests = []
+
+        def fetch(url, headers=None, on_attempt=None):
+            requests.append(headers)
+            if headers.get('If-None-Match') == '"v1"':
+                return SimpleNamespace(status_code=304, headers={}, content=b'')
+            return SimpleNamespace(status_code=200, headers={'ETag': '"v1"'}, content=self.page)
+
+        with mock.patch('jobApp.scraper.fetch', fetch):
+            first = get_job_details('42', {})
+            stored = self.store.get('42')
+            with mock.patch('jobApp.rawstore.timezone.now', return_value=timezone.now() + timedelta(hours=1)):
+                second = get_job_details('42', {})
+
+        self.assertEqual([headers.get('If-None-Match') for headers in requests], [None, '"v1"'])
+        self.assertEqual(stored['etag'], '"v1"')
+        self.assertEqual(second, first)
+        self.assertEqual(second.job_title, 'Senior Python Developer')
+        # The 304 counts as a fresh fetch of the same body
+        self.assertEqual(self.store.get('42')['sha256'], stored['sha256'])
+        self.assertGreater(self.store.get('42')['fetched_at'], stored['fetched_at'])
+
+    def test_reparse_updates_listings_from_stored_pages(self):
+        JobListing.store_details([JobRecord(job_id='42', job_title='Old title'), JobRecord(job_id='43')])
+        self.store.put('42', self.page)
+
+        out, err = io.StringIO(), io.StringIO()
+        call_command('reparse_raw_responses', '42', '43', stdout=out, stderr=err)
+
+        listing = JobListing.objects.get(job_id='42')
+        self.assertEqual((listing.job_title, listing.company), ('Senior Python Developer', 'Acme Analytics'))
+        self.assertEqual(listing.skills, ['Python', 'Django', 'PostgreSQL', 'Amazon Web Services (AWS)'])
+        self.assertIn('Re-parsed 1 stored postings', out.getvalue())
+        self.assertIn('1 postings had no stored page', err.getvalue())
+
+    def test_prune_keeps_pages_fetched_within_the_window(self):
+        old = timezone.now() - timedelta(days=2)
+        with mock.patch('jobApp.rawstore.timezone.now', return_value=old):
+            self.store.put('1', b'<html>expired</html>')
+            self.store.put('2', b'<html>shared</html>')
+        self.store.put('3', b'<html>shared</html>')
+        self.store.put('4', b'<html>fresh</html>')
+        for path in (self.store.root / 'blobs').glob('*/*.html.gz'):
+            os.utime(path, (old.timestamp(), old.timestamp()))
+
+        out = io.StringIO()
+        call_command('prune_raw_responses', max_age=24 * 60 * 60, stdout=out)
+
+        self.assertIn('Deleted 2 job records and 1 stored pages', out.getvalue())
+        self.assertEqual(sorted(record['job_id'] for record in self.store.records()), ['3', '4'])
+        # The body job 2 shared with job 3 stays
+        self.assertEqual(self.store.read(self.store.get('3')), b'<html>shared</html>')
+        self.assertEqual(self.store.read(self.store.get('4')), b'<html>fresh</html>')
+
+
+class BatchSearchTests(TransactionTestCase):
+    def setUp(self):
+        site_fetch = fixture_fetch(ListingSite(range(60)))
+        self.postings = []
+
+        def fetch(url, headers=None, on_attempt=None):
+            if '/jobPosting/' in url:
+                self.postings.append(url.rsplit('/', 1)[1])
+            return site_fetch(url, headers)
+
+        for patch in (
+            mock.patch('jobApp.scraper.fetch', fetch),
+            mock.patch('jobApp.batch.search_cache', SearchResultCache(ttl=60, max_jobs=1000)),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def batch(self, *queries):
+        response = self.client.post('/search/batch/', {'queries': [
+            {'keywords': keywords, 'location': 'germany', 'job_limit': job_limit} for keywords, job_limit in queries
+        ]}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_overlapping_queries_fetch_each_posting_once(self):
+        data = self.batch(('python', 10), ('developer', 10), ('python developer', 5))
+        results = [{job['job_id']: job for job in result['jobs']} for result in data['results']]
+
+        self.assertEqual(data['listed_jobs'], 25)
+        self.assertLess(data['unique_jobs'], data['listed_jobs'])
+        self.assertEqual(sorted(self.postings), sorted(set(self.postings)))
+        self.assertEqual(data['fetched_jobs'], len(self.postings))
+        self.assertEqual(data['fetched_jobs'], data['unique_jobs'])
+        # A posting listed by several queries is fetched once and reported to each
+        shared = set(results[0]) & set(results[1]) & set(results[2])
+        self.assertTrue(shared)
+        for job_id in shared:
+            self.assertEqual(results[0][job_id], results[1][job_id])
+            self.assertEqual(results[0][job_id], results[2][job_id])
+        self.assertEqual([result['count'] for result in data['results']], [len(jobs) for jobs in results])
+
+    def test_stored_postings_are_not_fetched_again(self):
+        first = self.batch(('python', 10), ('developer', 10))
+        self.postings.clear()
+        second = self.batch(('python', 10), ('developer', 10))
+
+        self.assertEqual(self.postings, [])
+        self.assertEqual((second['unique_jobs'], second['fetched_jobs']), (first['unique_jobs'], 0))
+        self.assertEqual(
+            [[job['job_id'] for job in result['jobs']] for result in second['results']],
+            [[job['job_id'] for job in result['jobs']] for result in first['results']],
+        )
@@ -1,7 +1,19 @@
 from django.urls import path
-from .views import JobSearchView, DownloadCSVView
+from .views import (
+    JobSearchView, BatchSearchView, DownloadCSVView, SearchTaskView, SearchTaskResultsView, JobListingQueryView,
+    SavedSearchListView, SavedSearchView, SavedSearchRefreshView, MetricsView, ParseStatsView,
+)
 
 urlpatterns = [
     path('search/', JobSearchView.as_view(), name='job-search'),
+    path('search/batch/', BatchSearchView.as_view(), name='batch-search'),
+    path('search/<uuid:task_id>/', SearchTaskView.as_view(), name='search-task'),
+    path('search/<uuid:task_id>/results/', SearchTaskResultsView.as_view(), name='search-task-results'),
+    path('jobs/', JobListingQueryView.as_view(), name='job-listings'),
+    path('saved-searches/', SavedSearchListView.as_view(), name='saved-search-list'),
+    path('saved-searches/<int:search_id>/', SavedSearchView.as_view(), name='saved-search'),
+    path('saved-searches/<int:search_id>/refresh/', SavedSearchRefreshView.as_view(), name='saved-search-refresh'),
     path('download-csv/', DownloadCSVView.as_view(), name='download-csv'),
-]
\ No newline at end of file
+    path('metrics', MetricsView.as_view(), name='metrics'),
+    path('parse-stats/', ParseStatsView.as_view(), name='parse-stats'),
+]
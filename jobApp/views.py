@@ -1,178 +1,81 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-import pandas as pd
-from django.http import HttpResponse
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
 import json
-import re
-import requests
-from bs4 import BeautifulSoup
 import math
-from urllib.parse import quote
-
-def create_linkedin_url(keywords, location):
-    """Create LinkedIn search URL with encoded parameters."""
-    encoded_keywords = quote(keywords)
-    encoded_location = quote(location)
-    return f'https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search?keywords={encoded_keywords}&location={encoded_location}&start={{}}'
-
-def get_job_ids(base_url, headers, job_limit=100):
-    """Collect job IDs from search results."""
-    job_ids = []
-    page = 0
-    
-    while len(job_ids) < job_limit:
-        try:
-            res = requests.get(base_url.format(page * 25), headers=headers)
-            soup = BeautifulSoup(res.text, 'html.parser')
-            jobs_on_page = soup.find_all("li")
-            
-            if not jobs_on_page:
-                break
-                
-            print(f"Found {len(jobs_on_page)} jobs on page {page+1}")
-            
-            for job in jobs_on_page:
-                if len(job_ids) >= job_limit:
-                    break
-                    
-                try:
-                    base_card = job.find("div", {"class": "base-card"})
-                    if base_card and base_card.get('data-entity-urn'):
-                        jobid = base_card.get('data-entity-urn').split(":")[3]
-                        job_ids.append(jobid)
-                except Exception as e:
-                    print(f"Error processing job: {e}")
-                    continue
-            
-            page += 1
-            
-        except Exception as e:
-            print(f"Error fetching page {page+1}: {e}")
-            break
-            
-    return job_ids[:job_limit]
-
-def get_job_details(job_id, headers):
-    """Extract all available details for a single job posting."""
-    job_url = f'https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/{job_id}'
-    job_data = {
-        'company': None,
-        'company_url': None,
-        'job_title': None,
-        'job_url': None,
-        'location': None,
-        'posted_date': None,
-        'job_description': None,
-        'applicant_count': None,
-        'level': None,
-        'employment_type': None,
-        'job_function': None,
-        'salary': None,
-        'skills': []  # New field for skills
-    }
-    
-    try:
-        resp = requests.get(job_url, headers=headers)
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        
-        # Company name and URL
-        company_card = soup.find("div", {"class": "top-card-layout__card"})
-        if company_card:
-            company_link = company_card.find("a")
-            if company_link:
-                if company_link.find("img"):
-                    job_data["company"] = company_link.find("img").get("alt", "").strip()
-                job_data["company_url"] = company_link.get("href", "").strip()
-
-        # Job title and URL
-        title_section = soup.find("div", {"class": "top-card-layout__entity-info"})
-        if title_section:
-            title_link = title_section.find("a")
-            if title_link:
-                job_data["job_title"] = title_link.text.strip()
-                job_data["job_url"] = title_link.get("href", "").strip()
-
-        # Location
-        location_elem = soup.find("span", {"class": "topcard__flavor--bullet"})
-        if location_elem:
-            job_data["location"] = location_elem.text.strip()
-
-        # Posted date
-        posted_elem = soup.find("span", {"class": "posted-time-ago__text"})
-        if posted_elem:
-            job_data["posted_date"] = posted_elem.text.strip()
-
-        # Job description
-        desc_elem = soup.find("div", {"class": "show-more-less-html__markup"})
-        if desc_elem:
-            job_data["job_description"] = desc_elem.text.strip()
-
-        # Applicant count
-        applicant_elem = soup.find("span", {"class": "num-applicants__caption"})
-        if applicant_elem:
-            job_data["applicant_count"] = applicant_elem.text.strip()
-
-        # Job criteria (level, type, industry, function)
-        criteria_list = soup.find("ul", {"class": "description__job-criteria-list"})
-        if criteria_list:
-            criteria_items = criteria_list.find_all("li")
-            for item in criteria_items:
-                header = item.find("h3")
-                value = item.find("span")
-                if header and value:
-                    header_text = header.text.strip().lower()
-                    if "seniority" in header_text:
-                        job_data["level"] = value.text.strip()
-                    elif "employment type" in header_text:
-                        job_data["employment_type"] = value.text.strip()
-                    elif "industry" in header_text:
-                        job_data["industry"] = value.text.strip()
-                    elif "job function" in header_text:
-                        job_data["job_function"] = value.text.strip()
-
-        # Salary
-        salary_elem = soup.find("span", {"class": "compensation__salary"})
-        if salary_elem:
-            job_data["salary"] = salary_elem.text.strip()
-        elif job_data.get("job_description"):
-            description_text = job_data["job_description"].lower()
-            salary_pattern = r'\$[\d,]+(?:\.\d+)?(?:\s*-\s*\$[\d,]+(?:\.\d+)?)?(?:\s*(?:per year|annually|yearly))?'
-            match = re.search(salary_pattern, description_text)
-            if match:
-                job_data["salary"] = match.group(0)
-
-        # Skills
-        skills_section = soup.find("section", {"class": "skills-section"})
-        if skills_section:
-            print(f"Found skills section for job ID {job_id}")
-            skills_items = skills_section.find_all("li", {"class": "job-details-skill-match-status-list__skill"})
-            for skill_item in skills_items:
-                skill_name = skill_item.find("span", {"class": "job-details-skill-match-status-list__skill-name"})
-                if skill_name:
-                    job_data["skills"].append(skill_name.text.strip())
-        else:
-            print(f"No skills section found for job ID {job_id}. Checking job description for skills.")
-            # Fallback: Try to extract skills from the job description
-            if job_data.get("job_description"):
-                description_text = job_data["job_description"].lower()
-                # Example: Look for common skill keywords in the description
-                common_skills = ["python", "java", "javascript", "sql", "aws", "machine learning", "data analysis"]
-                for skill in common_skills:
-                    if skill in description_text:
-                        job_data["skills"].append(skill)
-
-    except Exception as e:
-        print(f"Error processing job ID {job_id}: {e}")
-        return None
-
-    return job_data
+import uuid
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+from .batch import BatchSearch
+from .client import LinkedInFetchError
+from .coalesce import search_cache, search_key
+from .dedup import COLLAPSE, DUPLICATE_MODES, iter_deduplicated
+from .exporters import CHUNK_ROWS, EXPORT_FORMATS, parquet_available
+from .fieldstats import get_field_stats
+from .hot_searches import record_search_request, stored_search_results
+from .listings import facet_counts, filter_listings
+from .metrics import PHASE_SECONDS, registry, timed_iter
+from .models import SavedSearch, SearchTask
+from .records import JobRecord
+from .scraper import DEFAULT_HEADERS, create_linkedin_url, iter_matching_jobs
+from .saved_searches import REFRESH_MODES, refresh_saved_search
+from .serializers import BatchSearchSerializer, SavedSearchSerializer, SearchTaskSerializer
+from .tasks import enqueue_search, recover_task
+
+STREAM_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream',
+}
+
+def record_default(obj):
+    """json.dumps default that writes JobRecords as plain objects."""
+    if isinstance(obj, JobRecord):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def encode_ndjson(event, data):
+    """Encode one stream record as a line of newline-delimited JSON."""
+    return json.dumps({"event": event, "data": data}, default=record_default) + "\n"
+
+def encode_sse(event, data):
+    """Encode one stream record as a Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=record_default)}\n\n"
+
+class RecordJSONEncoder(JSONEncoder):
+    """DRF's encoder, plus JobRecords written straight from their slots."""
+
+    def default(self, obj):
+        if isinstance(obj, JobRecord):
+            return obj.to_dict()
+        return super().default(obj)
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSON renderer that records its rendering time as the serialize phase."""
+
+    encoder_class = RecordJSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with PHASE_SECONDS.time('serialize'):
+            return super().render(data, accepted_media_type, renderer_context)
+
 
 class JobSearchView(APIView):
+    renderer_classes = [TimedJSONRenderer, BrowsableAPIRenderer]
+
     def post(self, request):
         keywords = request.data.get('keywords', '').strip()
         location = request.data.get('location', '').strip()
         job_limit = int(request.data.get('job_limit', 100))
+        stream_format = request.query_params.get('stream') or request.data.get('stream')
+        run_async = str(request.query_params.get('async') or request.data.get('async', '')).lower() in ('1', 'true')
+        duplicates = (
+            request.query_params.get('duplicates') or request.data.get('duplicates') or settings.LINKEDIN_DUPLICATE_MODE
+        )
         
         if not keywords or not location:
             return Response(
@@ -186,34 +89,62 @@ class JobSearchView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
+        if stream_format and stream_format not in STREAM_CONTENT_TYPES:
+            return Response(
+                {"error": f"stream must be one of: {', '.join(STREAM_CONTENT_TYPES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if duplicates not in DUPLICATE_MODES:
+            return Response(
+                {"error": f"duplicates must be one of: {', '.join(DUPLICATE_MODES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        record_search_request(keywords, location, job_limit)
+        if run_async:
+            return self.start_background_search(request, keywords, location, job_limit, duplicates)
+
+        headers = DEFAULT_HEADERS
         
         base_url = create_linkedin_url(keywords, location)
-        job_ids = get_job_ids(base_url, headers, job_limit)
-        
-        jobs_data = []
-        for i, job_id in enumerate(job_ids, 1):
-            print(f"\rProcessing job {i}/{len(job_ids)}", end="")
-            job_data = get_job_details(job_id, headers)
-            
-            if job_data and job_data.get('job_title') and job_data.get('location'):
-                # Split keywords and location into words for more flexible matching
-                keyword_terms = set(keywords.lower().split())
-                location_terms = set(location.lower().split())
-                
-                job_title_lower = job_data['job_title'].lower()
-                job_location_lower = job_data['location'].lower()
-                
-                # Check if any of the keyword terms match in the job title
-                title_matches = any(term in job_title_lower for term in keyword_terms)
-                
-                # Check if any of the location terms match in the job location
-                location_matches = any(term in job_location_lower for term in location_terms)
-                
-                if title_matches and location_matches:
-                    jobs_data.append(job_data)
+        cache_key = search_key(keywords, location, job_limit)
+
+        def search():
+            # Searches kept fresh by `manage.py refresh_hot_searches` are answered from the database
+            stored = stored_search_results(keywords, location, job_limit)
+            if stored is not None:
+                return stored
+            return list(iter_matching_jobs(base_url, headers, job_limit, keywords, location))
+
+        def deduplicate(jobs):
+            # The cached records are shared between requests; iter_deduplicated annotates copies
+            return list(iter_deduplicated(jobs, duplicates))
+
+        if stream_format:
+            cached_jobs = search_cache.get(cache_key)
+            if cached_jobs is not None:
+                jobs = iter(search_cache.derive(cache_key, cached_jobs, duplicates, deduplicate))
+            else:
+                stored = stored_search_results(keywords, location, job_limit)
+                if stored is not None:
+                    jobs = iter_deduplicated(stored, duplicates)
+                else:
+                    # Short batches so that each job is still sent soon after it is found
+                    jobs = iter_deduplicated(
+                        iter_matching_jobs(base_url, headers, job_limit, keywords, location),
+                        duplicates, max_delay=settings.LINKEDIN_STREAM_DUPLICATE_DELAY,
+                    )
+            return self.stream_matching_jobs(jobs, keywords, location, stream_format)
+
+        try:
+            # Identical concurrent searches share one scrape and its cached result
+            jobs_data = search_cache.get_or_compute(cache_key, search)
+        except LinkedInFetchError as e:
+            return Response(
+                {"error": f"LinkedIn search failed: {e}"},
+                status=status.HTTP_502_BAD_GATEWAY
+            )
 
         if not jobs_data:
             return Response({
@@ -221,23 +152,222 @@ class JobSearchView(APIView):
                 "jobs": []
             })
 
+        # Each duplicates mode is worked out once per cached result
+        found = len(jobs_data)
+        jobs_data = search_cache.derive(cache_key, jobs_data, duplicates, deduplicate)
+        message = f"Found {found} matching jobs"
+        if duplicates == COLLAPSE and found > len(jobs_data):
+            message += f", {found - len(jobs_data)} near-duplicates collapsed"
         return Response({
-            "message": f"Found {len(jobs_data)} matching jobs",
+            "message": message,
             "jobs": jobs_data
         })
+
+    def start_background_search(self, request, keywords, location, job_limit, duplicates):
+        """Queue the search and answer immediately with where to poll for it."""
+        task = SearchTask.objects.create(
+            keywords=keywords, location=location, job_limit=job_limit, duplicates=duplicates
+        )
+        enqueue_search(task)
+        return Response({
+            "task_id": str(task.pk),
+            "status": task.status,
+            "status_url": request.build_absolute_uri(reverse('search-task', args=[task.pk])),
+            "results_url": request.build_absolute_uri(reverse('search-task-results', args=[task.pk])),
+        }, status=status.HTTP_202_ACCEPTED)
+
+    def stream_matching_jobs(self, jobs, keywords, location, stream_format):
+        """Stream each matching job as it is found, followed by a summary record."""
+        encode = encode_sse if stream_format == 'sse' else encode_ndjson
+
+        def events():
+            count = 0
+            try:
+                for job_data in jobs:
+                    count += 1
+                    with PHASE_SECONDS.time('serialize'):
+                        record = encode('job', job_data)
+                    yield record
+            except LinkedInFetchError as e:
+                yield encode('error', {"error": f"LinkedIn search failed: {e}"})
+            message = f"Found {count} matching jobs" if count else f"No jobs found for {keywords} in {location}"
+            yield encode('summary', {"message": message, "count": count})
+
+        response = StreamingHttpResponse(events(), content_type=STREAM_CONTENT_TYPES[stream_format])
+        response['Cache-Control'] = 'no-cache'
+        # Stop reverse proxies from buffering the stream until it completes
+        response['X-Accel-Buffering'] = 'no'
+        return response
     
     
+class BatchSearchView(APIView):
+    renderer_classes = [TimedJSONRenderer, BrowsableAPIRenderer]
+
+    def post(self, request):
+        """Run many searches at once; postings listed by several of them are fetched once."""
+        serializer = BatchSearchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        queries = [
+            dict(query, keywords=query['keywords'].strip(), location=query['location'].strip())
+            for query in serializer.validated_data['queries']
+        ]
+        batch = BatchSearch(queries, DEFAULT_HEADERS)
+        results = batch.run()
+        for result in results:
+            result['count'] = len(result['jobs'])
+
+        return Response({
+            "message": f"Found {sum(result['count'] for result in results)} matching jobs for {len(results)} queries",
+            "listed_jobs": batch.listed_jobs,
+            "unique_jobs": batch.unique_jobs,
+            "fetched_jobs": batch.fetched_jobs,
+            "results": results,
+        })
+
+
+class SearchTaskView(APIView):
+    def get(self, request, task_id):
+        # A task whose worker died would otherwise report "running" forever
+        recover_task(task_id)
+        task = get_object_or_404(SearchTask, pk=task_id)
+        return Response(SearchTaskSerializer(task).data)
+
+
+class SearchResultPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class SearchTaskResultsView(APIView):
+    def get(self, request, task_id):
+        task = get_object_or_404(SearchTask, pk=task_id)
+        paginator = SearchResultPagination()
+        page = paginator.paginate_queryset(task.results.all(), request, view=self)
+        response = paginator.get_paginated_response([result.data for result in page])
+        # Results of a running task are partial; tell the client to keep polling
+        response.data['status'] = task.status
+        return response
+
+
+class JobListingQueryView(APIView):
+    def get(self, request):
+        """Query postings already collected, with facet counts, without contacting LinkedIn."""
+        try:
+            listings = filter_listings(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = SearchResultPagination()
+        page = paginator.paginate_queryset(listings, request, view=self)
+        response = paginator.get_paginated_response([
+            {**listing.to_record().to_dict(), 'posted_at': listing.posted_at} for listing in page
+        ])
+        response.data['facets'] = facet_counts(listings)
+        return response
+
+
+class SavedSearchListView(APIView):
+    def get(self, request):
+        return Response(SavedSearchSerializer(SavedSearch.objects.all(), many=True).data)
+
+    def post(self, request):
+        serializer = SavedSearchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class SavedSearchView(APIView):
+    def get(self, request, search_id):
+        search = get_object_or_404(SavedSearch, pk=search_id)
+        return Response(SavedSearchSerializer(search).data)
+
+    def delete(self, request, search_id):
+        get_object_or_404(SavedSearch, pk=search_id).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class SavedSearchRefreshView(APIView):
+    renderer_classes = [TimedJSONRenderer, BrowsableAPIRenderer]
+
+    def post(self, request, search_id):
+        """Re-run a saved search and answer with the jobs added and removed since its last run."""
+        search = get_object_or_404(SavedSearch, pk=search_id)
+        mode = request.query_params.get('mode') or request.data.get('mode')
+        if mode and mode not in REFRESH_MODES:
+            return Response(
+                {"error": f"mode must be one of: {', '.join(REFRESH_MODES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            diff = refresh_saved_search(search, mode)
+        except LinkedInFetchError as e:
+            return Response(
+                {"error": f"LinkedIn search failed: {e}"},
+                status=status.HTTP_502_BAD_GATEWAY
+            )
+
+        return Response({
+            "message": f"{len(diff['added'])} new and {len(diff['removed'])} removed jobs",
+            "search": SavedSearchSerializer(search).data,
+            **diff,
+        })
+
+
 class DownloadCSVView(APIView):
     def post(self, request):
         jobs_data = request.data
-        if not jobs_data or not isinstance(jobs_data, list):
+        if not jobs_data or not isinstance(jobs_data, list) or not all(isinstance(job, dict) for job in jobs_data):
             return Response(
                 {"error": "Invalid data format"}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        df = pd.DataFrame(jobs_data)
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="jobs_data.csv"'
-        df.to_csv(path_or_buf=response, index=False)
-        return response
\ No newline at end of file
+        return self.export(map(JobRecord.from_dict, jobs_data), request.query_params.get('file_format', 'csv'))
+
+    def get(self, request):
+        """Export the stored results of a background search without re-uploading them."""
+        try:
+            task_id = uuid.UUID(request.query_params.get('task_id', ''))
+        except ValueError:
+            return Response(
+                {"error": "A valid task_id is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        task = get_object_or_404(SearchTask, pk=task_id)
+        jobs_data = map(JobRecord.from_dict, task.results.values_list('data', flat=True).iterator(chunk_size=CHUNK_ROWS))
+        return self.export(jobs_data, request.query_params.get('file_format', 'csv'))
+
+    def export(self, jobs_data, file_format):
+        """Stream the jobs in the requested format without building the file in memory."""
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"file_format must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if file_format == 'parquet' and not parquet_available():
+            return Response(
+                {"error": "Parquet export requires the pyarrow package"},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+
+        generate, content_type, extension = EXPORT_FORMATS[file_format]
+        response = StreamingHttpResponse(timed_iter(generate(jobs_data), 'serialize'), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="jobs_data.{extension}"'
+        return response
+
+
+class MetricsView(APIView):
+    def get(self, request):
+        """Expose this process's counters and histograms for Prometheus to scrape."""
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class ParseStatsView(APIView):
+    def get(self, request):
+        """Report how often each posting field was found, and by which selector, in this process."""
+        return Response(get_field_stats().snapshot())